@@ -1,9 +1,12 @@
 from django.contrib import admin
 from django.contrib.auth.models import User
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
 from .models import (
     UserProfile, ChatSession, ChatMessage, WeatherAlert,
-    AlertDelivery, SystemLog
+    AlertDelivery, SystemLog, ActivitySamplingRate, LogArchive
 )
+from .services.log_search_service import matching_ids_sql
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
@@ -60,8 +63,35 @@ class SystemLogAdmin(admin.ModelAdmin):
         return f"{obj.message[:100]}..." if len(obj.message) > 100 else obj.message
     message_preview.short_description = 'Message Preview'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Match message through the full-text index instead of an icontains scan
+        matching = matching_ids_sql('system', search_term) if search_term else None
+        if matching is None:
+            return super().get_search_results(request, queryset, search_term)
+        sql, params = matching
+        return queryset.filter(Q(id__in=RawSQL(sql, params)) | Q(module__iexact=search_term)), False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(ActivitySamplingRate)
+class ActivitySamplingRateAdmin(admin.ModelAdmin):
+    list_display = ['activity_type', 'sample_rate', 'updated_at']
+    list_editable = ['sample_rate']
+    ordering = ['activity_type']
+    readonly_fields = ['updated_at']
+
+@admin.register(LogArchive)
+class LogArchiveAdmin(admin.ModelAdmin):
+    list_display = ['log_type', 'month', 'row_count', 'first_timestamp', 'last_timestamp', 'path']
+    list_filter = ['log_type', 'month']
+    ordering = ['-last_timestamp']
+
     def has_add_permission(self, request):
         return False
 
     def has_change_permission(self, request, obj=None):
-        return False
\ No newline at end of file
+        return False
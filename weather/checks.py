@@ -0,0 +1,20 @@
+"""
+System Checks
+"""
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from .utils.shared_cache import is_shared_cache
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """Upstream rate limits and circuit breakers need a cache shared by all workers"""
+    if is_shared_cache():
+        return []
+    return [Warning(
+        f"CACHE_BACKEND {settings.CACHES['default']['BACKEND']} is not shared between processes",
+        hint="Each worker then has its own upstream rate limit buckets and circuit breakers, and "
+             "`manage.py warm_weather_cache` refuses to run. Use the default database cache or Redis.",
+        id='weather.W001',
+    )]
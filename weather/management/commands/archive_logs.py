@@ -0,0 +1,42 @@
+"""
+Move ActivityLog and SystemLog rows past the retention window
+into compressed monthly NDJSON archive files
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...services.log_archive_service import archive_logs
+
+
+class Command(BaseCommand):
+    help = 'Archive log rows older than the retention window to gzipped NDJSON files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Keep this many days in the hot tables (default: settings.LOG_RETENTION_DAYS)'
+        )
+        parser.add_argument('--type', choices=['activity', 'system', 'all'], default='all', help='Log type to archive')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be archived')
+
+    def handle(self, *args, **options):
+        days = options['days'] or getattr(settings, 'LOG_RETENTION_DAYS', 90)
+        cutoff = timezone.now() - timedelta(days=days)
+        log_types = ['activity', 'system'] if options['type'] == 'all' else [options['type']]
+
+        for log_type in log_types:
+            result = archive_logs(
+                log_type,
+                cutoff,
+                chunk_size=options['chunk_size'],
+                dry_run=options['dry_run']
+            )
+            if options['dry_run']:
+                self.stdout.write(f"{log_type}: {result['rows']} rows older than {cutoff:%Y-%m-%d} would be archived")
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"{log_type}: archived {result['rows']} rows into {result['files']} file(s)"
+                ))
@@ -0,0 +1,58 @@
+"""
+Export logs, admin chat history or user weather alerts as CSV/NDJSON
+Rows are streamed from the database, so memory use does not grow with the export
+"""
+import sys
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ...services.log_export_service import EXPORT_FORMATS, EXPORT_SOURCES, export_stream
+
+
+class Command(BaseCommand):
+    help = 'Stream an export of activity/system logs, admin chat history or user weather alerts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=list(EXPORT_SOURCES), default='activity', help='What to export')
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv', help='Output format')
+        parser.add_argument('--columns', default='', help='Comma separated columns (default: the standard set)')
+        parser.add_argument('--days', type=int, default=None, help='Only the last N days (default: everything)')
+        parser.add_argument('--activity', default='all', help='Activity type, log level or alert type')
+        parser.add_argument('--user', default='all', help='User id')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+        parser.add_argument('--output', '-o', default='-', help='Output file (default: stdout)')
+
+    def handle(self, *args, **options):
+        start = timezone.now() - timedelta(days=options['days']) if options['days'] else None
+
+        try:
+            stream = export_stream(
+                options['type'],
+                options['format'],
+                columns=options['columns'].split(','),
+                compress=options['gzip'],
+                activity=options['activity'],
+                user=options['user'],
+                start=start
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        to_stdout = options['output'] == '-'
+        if to_stdout:
+            out = sys.stdout.buffer if options['gzip'] else sys.stdout
+        elif options['gzip']:
+            out = open(options['output'], 'wb')
+        else:
+            out = open(options['output'], 'w', encoding='utf-8', newline='')
+
+        try:
+            for chunk in stream:
+                out.write(chunk)
+        finally:
+            if not to_stdout:
+                out.close()
+
+        if not to_stdout:
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['type']} export to {options['output']}"))
@@ -0,0 +1,16 @@
+"""
+Rebuild the admin map cluster pyramid from UserLocation
+Run after changing MAP_MAX_CLUSTER_ZOOM, bulk location imports, or
+promoting users to superuser
+"""
+from django.core.management.base import BaseCommand
+
+from ...services.location_cluster_service import rebuild_clusters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the user location cluster cells for the admin map'
+
+    def handle(self, *args, **options):
+        written = rebuild_clusters()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} cluster cell(s)"))
@@ -0,0 +1,31 @@
+"""
+Rebuild hourly/daily log rollups from raw ActivityLog and SystemLog rows
+Run once to backfill, or periodically to repair buckets
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...services.log_rollup_service import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute activity and system log rollups for the last N days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=1, help='Number of days to rebuild (default: 1)')
+
+    def handle(self, *args, **options):
+        end = timezone.now()
+        start = end - timedelta(days=options['days'])
+
+        written = rebuild_rollups(start, end)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt rollups for the last {options['days']} day(s): "
+            f"{written['activity']} activity rows, {written['system']} system log rows"
+        ))
+        for log_type, boundary in written['clipped'].items():
+            self.stdout.write(self.style.WARNING(
+                f"Kept {log_type} rollups before {boundary:%Y-%m-%d}: their raw rows are archived"
+            ))
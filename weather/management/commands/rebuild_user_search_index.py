@@ -0,0 +1,18 @@
+"""
+Rebuild the user search index from the user and location tables
+Run after bulk imports or raw SQL updates that bypass model signals
+"""
+from django.core.management.base import BaseCommand
+
+from ...services.user_search_service import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Recompute the search text for every user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Entries written per query')
+
+    def handle(self, *args, **options):
+        written = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {written} user(s)"))
@@ -0,0 +1,22 @@
+"""
+Rebuild the columnar weather history files from the observation table
+Run after enabling WEATHER_SERIES_STORE = 'columnar', or to repair a cell
+"""
+from django.core.management.base import BaseCommand
+
+from ...services.series_store_service import get_series_dir, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rewrite per-cell weather series files from stored observations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cell', action='append', dest='cells',
+                            help='Weather cell to rebuild (repeatable, default: all)')
+
+    def handle(self, *args, **options):
+        written = rebuild(options['cells'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {written['cells']} cell(s), {written['rows']} observations, in {get_series_dir()}"
+        ))
@@ -0,0 +1,22 @@
+"""
+Recompute per-cell weather statistics and normals from stored observations
+Run once to backfill, or to repair a cell
+"""
+from django.core.management.base import BaseCommand
+
+from ...services.climatology_service import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute running weather statistics per cell from the observation table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cell', action='append', dest='cells',
+                            help='Weather cell to rebuild (repeatable, default: all)')
+
+    def handle(self, *args, **options):
+        totals = rebuild_stats(options['cells'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt statistics for {totals['cells']} cell(s) from {totals['observations']} observations"
+        ))
@@ -0,0 +1,48 @@
+"""
+Keep weather, forecast and air quality cached for every cell with users,
+refreshing entries before they expire within an upstream call budget
+"""
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services.weather_warmer_service import WARM_KINDS, warm_once
+from ...utils.shared_cache import is_shared_cache
+
+
+class Command(BaseCommand):
+    help = 'Warm the shared weather cache for all saved user locations (runs continuously unless --once)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run a single pass and exit')
+        parser.add_argument('--interval', type=int, default=60, help='Seconds between passes')
+        parser.add_argument(
+            '--calls-per-minute', type=int, default=None,
+            help='Upstream call budget (default: settings.WEATHER_WARM_CALLS_PER_MINUTE)'
+        )
+        parser.add_argument('--kind', action='append', choices=WARM_KINDS, help='Only warm this kind (repeatable)')
+
+    def handle(self, *args, **options):
+        if not is_shared_cache():
+            # Entries warmed into this process's own cache would never reach the web workers
+            raise CommandError(
+                f"CACHE_BACKEND {settings.CACHES['default']['BACKEND']} is not shared with the web workers; "
+                "use the database cache (the default) or Redis"
+            )
+        calls_per_minute = options['calls_per_minute'] or getattr(settings, 'WEATHER_WARM_CALLS_PER_MINUTE', 30)
+        interval = max(options['interval'], 1)
+        budget = max(int(calls_per_minute * interval / 60), 1)
+        kinds = options['kind'] or WARM_KINDS
+
+        while True:
+            started = time.monotonic()
+            stats = warm_once(budget, kinds)
+            self.stdout.write(self.style.SUCCESS(
+                f"{stats['cells']} cells, coverage {stats['coverage']:.1%} "
+                f"(users {stats['user_coverage']:.1%}), fetched {stats['fetched']}/{stats['attempted']}, "
+                f"backlog {stats['backlog']}, max lag {stats['max_lag_seconds']}s, "
+                f"geocoded {stats['geocoded']} ({stats['geocode_deferred']} deferred)"
+            ))
+            if options['once']:
+                return
+            time.sleep(max(interval - (time.monotonic() - started), 0))
@@ -2,7 +2,8 @@
 Custom Django Middleware for Weather Application
 """
 from django.conf import settings
-from .models import ActivityLog
+from .services.activity_log_service import log_activity
+from .services.presence_service import touch
 import requests
 import logging
 
@@ -63,6 +64,28 @@ class WeatherDataMiddleware:
         return response
 
 
+class UserPresenceMiddleware:
+    """
+    Middleware to keep UserPresence.last_seen_at fresh
+    Writes at most once per PRESENCE_TOUCH_INTERVAL_MINUTES per user
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        # The user may have logged out during the request
+        if request.user.is_authenticated and not request.path.startswith(('/static/', '/media/')):
+            try:
+                touch(request.user)
+            except Exception as e:
+                logger.error(f"Failed to update user presence: {e}")
+
+        return response
+
+
 class ActivityLoggingMiddleware:
     """
     Middleware to automatically log user activities in real-time
@@ -146,10 +169,10 @@ class ActivityLoggingMiddleware:
             metadata['method'] = request.method
             metadata['endpoint'] = request.path
 
-        # Log the activity if we determined one
+        # Log the activity if we determined one (high-volume types are sampled)
         if activity_type and description:
             try:
-                ActivityLog.objects.create(
+                log_activity(
                     user=request.user,
                     activity_type=activity_type,
                     description=description,
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0008_userweatheralert'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivitySamplingRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activity_type', models.CharField(choices=[('login', 'User Login'), ('logout', 'User Logout'), ('signup', 'User Signup'), ('chat', 'Chat Message'), ('weather_query', 'Weather Query'), ('alert_view', 'Alert Viewed'), ('settings_change', 'Settings Changed'), ('map_view', 'Map Viewed'), ('api_call', 'API Call'), ('error', 'Error Occurred')], max_length=20, unique=True)),
+                ('sample_rate', models.FloatField(default=1.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'activity_sampling_rates',
+                'ordering': ['activity_type'],
+            },
+        ),
+        migrations.AddField(
+            model_name='activitylog',
+            name='weight',
+            field=models.FloatField(default=1.0),
+        ),
+    ]
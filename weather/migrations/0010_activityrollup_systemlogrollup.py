@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0009_activitylog_weight_activitysamplingrate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SystemLogRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily')], max_length=4)),
+                ('bucket_start', models.DateTimeField()),
+                ('level', models.CharField(choices=[('info', 'Info'), ('warning', 'Warning'), ('error', 'Error'), ('critical', 'Critical')], max_length=10)),
+                ('event_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'system_log_rollups',
+                'indexes': [models.Index(fields=['granularity', 'bucket_start'], name='system_log__granula_09d50f_idx')],
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'bucket_start', 'level'), name='unique_system_log_rollup_bucket')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ActivityRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily')], max_length=4)),
+                ('bucket_start', models.DateTimeField()),
+                ('activity_type', models.CharField(max_length=20)),
+                ('event_count', models.FloatField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'activity_rollups',
+                'indexes': [models.Index(fields=['granularity', 'bucket_start'], name='activity_ro_granula_a2a8cc_idx')],
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'bucket_start', 'activity_type', 'user'), name='unique_activity_rollup_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0010_activityrollup_systemlogrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('log_type', models.CharField(choices=[('activity', 'Activity Logs'), ('system', 'System Logs')], max_length=10)),
+                ('month', models.DateField()),
+                ('first_timestamp', models.DateTimeField()),
+                ('last_timestamp', models.DateTimeField()),
+                ('first_id', models.BigIntegerField()),
+                ('last_id', models.BigIntegerField()),
+                ('row_count', models.IntegerField()),
+                ('path', models.CharField(max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'log_archives',
+                'ordering': ['-last_timestamp'],
+                'indexes': [models.Index(fields=['log_type', 'first_timestamp', 'last_timestamp'], name='log_archive_log_typ_0b8c5e_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_presence(apps, schema_editor):
+    """Seed presence from each user's latest login/logout and profile activity"""
+    ActivityLog = apps.get_model('weather', 'ActivityLog')
+    UserPresence = apps.get_model('weather', 'UserPresence')
+    UserProfile = apps.get_model('weather', 'UserProfile')
+
+    last_events = ActivityLog.objects.filter(activity_type__in=['login', 'logout']).values('user_id').annotate(
+        last_login=models.Max('timestamp', filter=models.Q(activity_type='login')),
+        last_logout=models.Max('timestamp', filter=models.Q(activity_type='logout')),
+    )
+    last_active = dict(UserProfile.objects.values_list('user_id', 'last_active'))
+
+    presence = []
+    for row in last_events.iterator():
+        login, logout = row['last_login'], row['last_logout']
+        seen = [ts for ts in (login, logout, last_active.get(row['user_id'])) if ts]
+        presence.append(UserPresence(
+            user_id=row['user_id'],
+            state='online' if login and (not logout or login > logout) else 'offline',
+            last_login_at=login,
+            last_logout_at=logout,
+            last_seen_at=max(seen) if seen else None,
+        ))
+    UserPresence.objects.bulk_create(presence, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0011_logarchive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserPresence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(choices=[('online', 'Online'), ('offline', 'Offline')], default='offline', max_length=10)),
+                ('last_login_at', models.DateTimeField(blank=True, null=True)),
+                ('last_seen_at', models.DateTimeField(blank=True, null=True)),
+                ('last_logout_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='presence', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'user_presence',
+                'indexes': [models.Index(fields=['state', '-last_seen_at'], name='user_presen_state_0e9956_idx'), models.Index(fields=['-last_seen_at'], name='user_presen_last_se_731eb8_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_presence, migrations.RunPython.noop),
+    ]
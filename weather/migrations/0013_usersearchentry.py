@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+SQLITE_FTS = [
+    # External-content FTS5 table over user_search_index; user_id is the rowid
+    """CREATE VIRTUAL TABLE user_search_fts USING fts5(
+        document, content='user_search_index', content_rowid='user_id', prefix='2 3'
+    )""",
+    """CREATE TRIGGER user_search_index_ai AFTER INSERT ON user_search_index BEGIN
+        INSERT INTO user_search_fts(rowid, document) VALUES (new.user_id, new.document);
+    END""",
+    """CREATE TRIGGER user_search_index_ad AFTER DELETE ON user_search_index BEGIN
+        INSERT INTO user_search_fts(user_search_fts, rowid, document) VALUES ('delete', old.user_id, old.document);
+    END""",
+    """CREATE TRIGGER user_search_index_au AFTER UPDATE ON user_search_index BEGIN
+        INSERT INTO user_search_fts(user_search_fts, rowid, document) VALUES ('delete', old.user_id, old.document);
+        INSERT INTO user_search_fts(rowid, document) VALUES (new.user_id, new.document);
+    END""",
+]
+
+SQLITE_FTS_DROP = [
+    'DROP TRIGGER IF EXISTS user_search_index_au',
+    'DROP TRIGGER IF EXISTS user_search_index_ad',
+    'DROP TRIGGER IF EXISTS user_search_index_ai',
+    'DROP TABLE IF EXISTS user_search_fts',
+]
+
+POSTGRES_TRGM = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX user_search_index_document_trgm ON user_search_index USING gin (document gin_trgm_ops)',
+]
+
+POSTGRES_TRGM_DROP = [
+    'DROP INDEX IF EXISTS user_search_index_document_trgm',
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    """Add the backend specific index, then fill the table"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_TRGM)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_FTS)
+
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserLocation = apps.get_model('weather', 'UserLocation')
+    UserSearchEntry = apps.get_model('weather', 'UserSearchEntry')
+
+    location_names = dict(UserLocation.objects.values_list('user_id', 'location_name'))
+    entries = []
+    for user in User.objects.only('id', 'username', 'email', 'first_name', 'last_name').iterator():
+        parts = [user.username, user.email, user.first_name, user.last_name, location_names.get(user.id)]
+        entries.append(UserSearchEntry(user_id=user.id, document=' '.join(' '.join(filter(None, parts)).lower().split())))
+    UserSearchEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_TRGM_DROP)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_FTS_DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0012_userpresence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchEntry',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_entry', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('document', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'user_search_index',
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:00
+
+from django.db import migrations
+
+
+# (table, text columns, FTS5 table) - mirrors log_search_service.SEARCH_SOURCES
+SEARCH_TABLES = [
+    ('activity_logs', ['description'], 'activity_logs_fts'),
+    ('system_logs', ['message'], 'system_logs_fts'),
+    ('admin_chat_history', ['message', 'response'], 'admin_chat_history_fts'),
+]
+
+
+def _tsvector(columns):
+    text = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+    return f"to_tsvector('english', {text})"
+
+
+def _sqlite_statements(table, columns, fts):
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', content_rowid='id', "
+        f"tokenize='porter unicode61')",
+        f"CREATE TRIGGER {table}_fts_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER {table}_fts_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER {table}_fts_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        # Index the rows that already exist
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, columns, fts in SEARCH_TABLES:
+        if vendor == 'postgresql':
+            schema_editor.execute(f"CREATE INDEX {table}_fts_gin ON {table} USING gin (({_tsvector(columns)}))")
+        elif vendor == 'sqlite':
+            for statement in _sqlite_statements(table, columns, fts):
+                schema_editor.execute(statement)
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, columns, fts in SEARCH_TABLES:
+        if vendor == 'postgresql':
+            schema_editor.execute(f"DROP INDEX IF EXISTS {table}_fts_gin")
+        elif vendor == 'sqlite':
+            for suffix in ('au', 'ad', 'ai'):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+            schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0013_usersearchentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
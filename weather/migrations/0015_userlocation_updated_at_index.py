@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0014_log_fulltext_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userlocation',
+            index=models.Index(fields=['updated_at'], name='user_locati_updated_0cdf1e_idx'),
+        ),
+    ]
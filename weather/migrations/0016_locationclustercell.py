@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:09
+
+from collections import defaultdict
+from django.db import migrations, models
+
+
+def backfill_clusters(apps, schema_editor):
+    """Build the initial pyramid from existing non-admin locations"""
+    from weather.services.location_cluster_service import cell_for, max_cluster_zoom
+
+    UserLocation = apps.get_model('weather', 'UserLocation')
+    LocationClusterCell = apps.get_model('weather', 'LocationClusterCell')
+
+    cells = defaultdict(lambda: [0, 0.0, 0.0])
+    for lat, lon in UserLocation.objects.filter(user__is_superuser=False).values_list('latitude', 'longitude'):
+        lat, lon = float(lat), float(lon)
+        for zoom in range(max_cluster_zoom() + 1):
+            cell = cells[(zoom, *cell_for(lat, lon, zoom))]
+            cell[0] += 1
+            cell[1] += lat
+            cell[2] += lon
+
+    LocationClusterCell.objects.bulk_create([
+        LocationClusterCell(zoom=zoom, cell_x=x, cell_y=y, count=count, lat_sum=lat_sum, lon_sum=lon_sum)
+        for (zoom, x, y), (count, lat_sum, lon_sum) in cells.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0015_userlocation_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationClusterCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zoom', models.PositiveSmallIntegerField()),
+                ('cell_x', models.IntegerField()),
+                ('cell_y', models.IntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('lat_sum', models.FloatField(default=0)),
+                ('lon_sum', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'location_cluster_cells',
+                'constraints': [models.UniqueConstraint(fields=('zoom', 'cell_x', 'cell_y'), name='unique_location_cluster_cell')],
+            },
+        ),
+        migrations.RunPython(backfill_clusters, migrations.RunPython.noop),
+    ]
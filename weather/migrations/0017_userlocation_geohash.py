@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_geohash(apps, schema_editor):
+    from weather.utils.geohash import encode
+
+    UserLocation = apps.get_model('weather', 'UserLocation')
+    locations = list(UserLocation.objects.only('id', 'latitude', 'longitude'))
+    for location in locations:
+        location.geohash = encode(float(location.latitude), float(location.longitude))
+    UserLocation.objects.bulk_update(locations, ['geohash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0016_locationclustercell'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userlocation',
+            name='geohash',
+            field=models.CharField(blank=True, default='', max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='userlocation',
+            index=models.Index(fields=['geohash'], name='user_locati_geohash_98af21_idx'),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
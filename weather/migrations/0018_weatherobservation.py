@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:00
+
+from django.db import migrations, models
+
+
+def create_time_index(apps, schema_editor):
+    # Rows arrive in time order, so a BRIN index covers whole-table time ranges
+    # (retention, backfills) at a tiny fraction of a B-tree's size
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX weather_observations_time_brin ON weather_observations "
+            "USING brin (observed_at) WITH (pages_per_range = 32)"
+        )
+    else:
+        schema_editor.execute(
+            "CREATE INDEX weather_observations_time_idx ON weather_observations (observed_at)"
+        )
+
+
+def drop_time_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS weather_observations_time_brin")
+    else:
+        schema_editor.execute("DROP INDEX IF EXISTS weather_observations_time_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0017_userlocation_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherObservation',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('cell', models.CharField(max_length=12)),
+                ('observed_at', models.DateTimeField()),
+                ('temperature', models.SmallIntegerField(null=True)),
+                ('feels_like', models.SmallIntegerField(null=True)),
+                ('humidity', models.PositiveSmallIntegerField(null=True)),
+                ('pressure', models.PositiveSmallIntegerField(null=True)),
+                ('wind_speed', models.PositiveSmallIntegerField(null=True)),
+                ('wind_direction', models.PositiveSmallIntegerField(null=True)),
+                ('cloud_cover', models.PositiveSmallIntegerField(null=True)),
+                ('visibility', models.PositiveSmallIntegerField(null=True)),
+                ('precipitation', models.PositiveSmallIntegerField(null=True)),
+                ('condition_code', models.PositiveSmallIntegerField(null=True)),
+            ],
+            options={
+                'db_table': 'weather_observations',
+                'constraints': [models.UniqueConstraint(fields=('cell', 'observed_at'), name='unique_weather_observation')],
+            },
+        ),
+        migrations.RunPython(create_time_index, drop_time_index),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0018_weatherobservation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherCellStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cell', models.CharField(max_length=12)),
+                ('field', models.CharField(max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('mean', models.FloatField(default=0.0)),
+                ('m2', models.FloatField(default=0.0)),
+                ('min_value', models.FloatField(null=True)),
+                ('max_value', models.FloatField(null=True)),
+                ('last_value', models.FloatField(null=True)),
+                ('last_observed_at', models.DateTimeField(null=True)),
+                ('hourly', models.JSONField(default=list)),
+                ('monthly', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'weather_cell_stats',
+                'constraints': [models.UniqueConstraint(fields=('cell', 'field'), name='unique_weather_cell_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0020_create_cache_table'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activitylog',
+            name='activity_type',
+            field=models.CharField(choices=[('login', 'User Login'), ('logout', 'User Logout'), ('signup', 'User Signup'), ('chat', 'Chat Message'), ('weather_query', 'Weather Query'), ('alert_view', 'Alert Viewed'), ('settings_change', 'Settings Changed'), ('map_view', 'Map Viewed'), ('api_call', 'API Call'), ('error', 'Error Occurred'), ('data_export', 'Data Export')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='activitysamplingrate',
+            name='activity_type',
+            field=models.CharField(choices=[('login', 'User Login'), ('logout', 'User Logout'), ('signup', 'User Signup'), ('chat', 'Chat Message'), ('weather_query', 'Weather Query'), ('alert_view', 'Alert Viewed'), ('settings_change', 'Settings Changed'), ('map_view', 'Map Viewed'), ('api_call', 'API Call'), ('error', 'Error Occurred'), ('data_export', 'Data Export')], max_length=20, unique=True),
+        ),
+    ]
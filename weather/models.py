@@ -1,3 +1,5 @@
+from datetime import timedelta
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -58,9 +60,48 @@ class UserProfile(models.Model):
         return self.user_type == 'user'
 
     def update_last_active(self):
-        """Update the last active timestamp"""
-        self.last_active = timezone.now()
+        """
+        Update the last active timestamp, at most once per PRESENCE_TOUCH_INTERVAL_MINUTES
+
+        Returns:
+            bool: True if the timestamp was written
+        """
+        now = timezone.now()
+        interval = timedelta(minutes=getattr(settings, 'PRESENCE_TOUCH_INTERVAL_MINUTES', 5))
+        if self.last_active and now - self.last_active < interval:
+            return False
+
+        self.last_active = now
         self.save(update_fields=['last_active'])
+        return True
+
+
+class UserPresence(models.Model):
+    """
+    Current presence of a user, kept up to date by the auth views and middleware
+    Lets "who is active" be answered with an indexed lookup instead of log scans
+    """
+
+    STATES = (
+        ('online', 'Online'),
+        ('offline', 'Offline'),
+    )
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='presence')
+    state = models.CharField(max_length=10, choices=STATES, default='offline')
+    last_login_at = models.DateTimeField(null=True, blank=True)
+    last_seen_at = models.DateTimeField(null=True, blank=True)
+    last_logout_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'user_presence'
+        indexes = [
+            models.Index(fields=['state', '-last_seen_at']),
+            models.Index(fields=['-last_seen_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} ({self.state})"
 
 
 class ChatSession(models.Model):
@@ -229,6 +270,7 @@ class ActivityLog(models.Model):
         ('map_view', 'Map Viewed'),
         ('api_call', 'API Call'),
         ('error', 'Error Occurred'),
+        ('data_export', 'Data Export'),
     )
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='activity_logs')
@@ -241,6 +283,9 @@ class ActivityLog(models.Model):
     # Additional context
     metadata = models.JSONField(null=True, blank=True)
 
+    # Number of events this row stands for (1 / sample rate at write time)
+    weight = models.FloatField(default=1.0)
+
     class Meta:
         db_table = 'activity_logs'
         ordering = ['-timestamp']
@@ -254,20 +299,256 @@ class ActivityLog(models.Model):
         return f"{self.user.email} - {self.get_activity_type_display()} at {self.timestamp}"
 
 
+class ActivitySamplingRate(models.Model):
+    """
+    Runtime override of the sampling rate for a high-volume activity type
+    """
+    activity_type = models.CharField(max_length=20, choices=ActivityLog.ACTIVITY_TYPES, unique=True)
+    sample_rate = models.FloatField(default=1.0)  # 0.0 (drop all) to 1.0 (log all)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'activity_sampling_rates'
+        ordering = ['activity_type']
+
+    def __str__(self):
+        return f"{self.get_activity_type_display()}: {self.sample_rate:.0%}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from .services.activity_log_service import clear_sample_rate_cache
+        clear_sample_rate_cache()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from .services.activity_log_service import clear_sample_rate_cache
+        clear_sample_rate_cache()
+        return result
+
+
+class ActivityRollup(models.Model):
+    """
+    Pre-aggregated activity counts per time bucket, activity type and user
+    Maintained incrementally by the activity log writer
+    """
+
+    GRANULARITIES = (
+        ('hour', 'Hourly'),
+        ('day', 'Daily'),
+    )
+
+    granularity = models.CharField(max_length=4, choices=GRANULARITIES)
+    bucket_start = models.DateTimeField()
+    activity_type = models.CharField(max_length=20)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='activity_rollups')
+    event_count = models.FloatField(default=0)  # Sum of ActivityLog.weight
+
+    class Meta:
+        db_table = 'activity_rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'bucket_start', 'activity_type', 'user'],
+                name='unique_activity_rollup_bucket'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['granularity', 'bucket_start']),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket_start} {self.activity_type}: {self.event_count}"
+
+
+class SystemLogRollup(models.Model):
+    """
+    Pre-aggregated system log counts per time bucket and level
+    """
+    granularity = models.CharField(max_length=4, choices=ActivityRollup.GRANULARITIES)
+    bucket_start = models.DateTimeField()
+    level = models.CharField(max_length=10, choices=SystemLog.LOG_LEVELS)
+    event_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'system_log_rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'bucket_start', 'level'],
+                name='unique_system_log_rollup_bucket'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['granularity', 'bucket_start']),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket_start} {self.level}: {self.event_count}"
+
+
+class LogArchive(models.Model):
+    """
+    Manifest entry for one compressed NDJSON file of archived log rows
+    Files are grouped by month so each month behaves like a cold partition
+    """
+
+    LOG_TYPES = (
+        ('activity', 'Activity Logs'),
+        ('system', 'System Logs'),
+    )
+
+    log_type = models.CharField(max_length=10, choices=LOG_TYPES)
+    month = models.DateField()  # First day of the month the rows belong to
+    first_timestamp = models.DateTimeField()
+    last_timestamp = models.DateTimeField()
+    first_id = models.BigIntegerField()
+    last_id = models.BigIntegerField()
+    row_count = models.IntegerField()
+    path = models.CharField(max_length=500)  # Relative to settings.LOG_ARCHIVE_DIR
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'log_archives'
+        ordering = ['-last_timestamp']
+        indexes = [
+            models.Index(fields=['log_type', 'first_timestamp', 'last_timestamp']),
+        ]
+
+    def __str__(self):
+        return f"{self.log_type} {self.month:%Y-%m}: {self.row_count} rows"
+
+
 class UserLocation(models.Model):
     """Track user location for display on admin map"""
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='current_location')
     latitude = models.DecimalField(max_digits=9, decimal_places=6)
     longitude = models.DecimalField(max_digits=9, decimal_places=6)
     location_name = models.CharField(max_length=200, blank=True, null=True)
+    # Geohash of the position; prefix ranges on this index back spatial queries
+    geohash = models.CharField(max_length=12, blank=True, default='')
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'user_locations'
+        indexes = [
+            models.Index(fields=['updated_at']),  # updated_since polling on the admin map
+            models.Index(fields=['geohash']),
+        ]
 
     def __str__(self):
         return f"{self.user.email} at ({self.latitude}, {self.longitude})"
 
+    def save(self, *args, **kwargs):
+        from .utils.geohash import encode
+        self.geohash = encode(float(self.latitude), float(self.longitude))
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+
+
+class LocationClusterCell(models.Model):
+    """
+    One grid cell of the admin map cluster pyramid
+
+    Holds the number of non-admin users in the cell and the sums of their
+    coordinates (centroid = sum / count) for each zoom level up to
+    MAP_MAX_CLUSTER_ZOOM. Updated incrementally when a user's location moves.
+    """
+    zoom = models.PositiveSmallIntegerField()
+    cell_x = models.IntegerField()
+    cell_y = models.IntegerField()
+    count = models.IntegerField(default=0)
+    lat_sum = models.FloatField(default=0)
+    lon_sum = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'location_cluster_cells'
+        constraints = [
+            models.UniqueConstraint(fields=['zoom', 'cell_x', 'cell_y'], name='unique_location_cluster_cell'),
+        ]
+
+    def __str__(self):
+        return f"z{self.zoom} ({self.cell_x}, {self.cell_y}): {self.count}"
+
+
+class WeatherObservation(models.Model):
+    """
+    One current-weather reading for a weather cell, as fetched upstream
+    Values are scaled small integers (e.g. tenths of a degree), 2 bytes each;
+    see observation_service.OBSERVATION_FIELDS for the scales
+    """
+    id = models.BigAutoField(primary_key=True)
+    cell = models.CharField(max_length=12)  # Geohash prefix (WEATHER_CELL_PRECISION)
+    observed_at = models.DateTimeField()
+    temperature = models.SmallIntegerField(null=True)  # 0.1 °C
+    feels_like = models.SmallIntegerField(null=True)  # 0.1 °C
+    humidity = models.PositiveSmallIntegerField(null=True)  # %
+    pressure = models.PositiveSmallIntegerField(null=True)  # hPa
+    wind_speed = models.PositiveSmallIntegerField(null=True)  # 0.1 m/s
+    wind_direction = models.PositiveSmallIntegerField(null=True)  # degrees
+    cloud_cover = models.PositiveSmallIntegerField(null=True)  # %
+    visibility = models.PositiveSmallIntegerField(null=True)  # 10 m
+    precipitation = models.PositiveSmallIntegerField(null=True)  # 0.1 mm in the last hour
+    condition_code = models.PositiveSmallIntegerField(null=True)  # OpenWeatherMap condition id
+
+    class Meta:
+        db_table = 'weather_observations'
+        constraints = [
+            # Also the (cell, time) index behind history range scans
+            models.UniqueConstraint(fields=['cell', 'observed_at'], name='unique_weather_observation'),
+        ]
+
+    def __str__(self):
+        return f"{self.cell} at {self.observed_at}"
+
+
+class WeatherCellStats(models.Model):
+    """
+    Running statistics of one observation field in a weather cell
+    Updated as observations are stored (Welford's algorithm), so normals and
+    anomalies are a single row lookup instead of a scan of the history
+    """
+    cell = models.CharField(max_length=12)
+    field = models.CharField(max_length=20)  # Key of observation_service.OBSERVATION_FIELDS
+    count = models.PositiveIntegerField(default=0)
+    mean = models.FloatField(default=0.0)
+    m2 = models.FloatField(default=0.0)  # Sum of squared deviations from the mean
+    min_value = models.FloatField(null=True)
+    max_value = models.FloatField(null=True)
+    last_value = models.FloatField(null=True)
+    last_observed_at = models.DateTimeField(null=True)
+    hourly = models.JSONField(default=list)  # 24 x [count, mean, m2] by local solar hour
+    monthly = models.JSONField(default=list)  # 12 x [count, mean, m2] by month
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'weather_cell_stats'
+        constraints = [
+            models.UniqueConstraint(fields=['cell', 'field'], name='unique_weather_cell_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.cell} {self.field} ({self.count} observations)"
+
+
+class UserSearchEntry(models.Model):
+    """
+    Lowercased search text for a user (username, email, name, location)
+
+    Kept in sync by weather.signals. Migration 0013 adds the backend
+    specific index: a pg_trgm GIN index on PostgreSQL, or the user_search_fts
+    FTS5 table (maintained by triggers) on SQLite.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='search_entry')
+    document = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_search_index'
+
+    def __str__(self):
+        return f"Search entry for user {self.user_id}"
+
 
 class AdminChatHistory(models.Model):
     """Store admin chat conversations with AI"""
@@ -0,0 +1,125 @@
+"""
+Activity Log Service
+Single write path for ActivityLog rows, with per-type sampling and
+incremental rollup maintenance (SystemLog rollups follow every saved row
+through a signal, see signals.py)
+"""
+
+import random
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Activity types that are never sampled away (data_export is the admin export audit trail)
+ALWAYS_LOGGED = frozenset({'login', 'logout', 'signup', 'settings_change', 'data_export'})
+
+# Activity types that change who counts as active on the admin dashboard
+SESSION_ACTIVITY_TYPES = frozenset({'login', 'logout', 'signup'})
+
+SAMPLE_RATES_CACHE_KEY = 'activity_log:sample_rates'
+SAMPLE_RATES_CACHE_TTL = 60  # seconds; how long other workers may see stale rates
+
+
+def get_sample_rates() -> Dict[str, float]:
+    """
+    Get the effective sampling rate per activity type
+
+    Defaults come from settings.ACTIVITY_LOG_SAMPLE_RATES and are overridden
+    by ActivitySamplingRate rows, which can be edited at runtime.
+
+    Returns:
+        dict: activity_type -> rate between 0.0 and 1.0
+    """
+    rates = cache.get(SAMPLE_RATES_CACHE_KEY)
+    if rates is not None:
+        return rates
+
+    rates = dict(getattr(settings, 'ACTIVITY_LOG_SAMPLE_RATES', {}))
+    try:
+        from ..models import ActivitySamplingRate
+        rates.update(ActivitySamplingRate.objects.values_list('activity_type', 'sample_rate'))
+    except Exception as e:
+        logger.error(f"Failed to load activity sample rates: {e}")
+
+    cache.set(SAMPLE_RATES_CACHE_KEY, rates, SAMPLE_RATES_CACHE_TTL)
+    return rates
+
+
+def get_sample_rate(activity_type: str) -> float:
+    """Get the sampling rate for one activity type (1.0 = log everything)"""
+    if activity_type in ALWAYS_LOGGED:
+        return 1.0
+    rate = get_sample_rates().get(activity_type, 1.0)
+    return min(max(float(rate), 0.0), 1.0)
+
+
+def set_sample_rate(activity_type: str, sample_rate: float):
+    """
+    Change the sampling rate for an activity type at runtime
+
+    Args:
+        activity_type: One of ActivityLog.ACTIVITY_TYPES
+        sample_rate: Fraction of events to keep (0.0 - 1.0)
+    """
+    from ..models import ActivitySamplingRate
+
+    if activity_type in ALWAYS_LOGGED:
+        raise ValueError(f"'{activity_type}' activities are always logged")
+    if not 0.0 <= sample_rate <= 1.0:
+        raise ValueError("Sample rate must be between 0.0 and 1.0")
+
+    ActivitySamplingRate.objects.update_or_create(
+        activity_type=activity_type,
+        defaults={'sample_rate': sample_rate}
+    )
+
+
+def clear_sample_rate_cache():
+    """Drop cached rates so the next write reloads them"""
+    cache.delete(SAMPLE_RATES_CACHE_KEY)
+
+
+def log_activity(user, activity_type: str, description: str, ip_address: str = None,
+                 user_agent: str = None, metadata: dict = None):
+    """
+    Write an ActivityLog row, subject to the activity type's sampling rate
+
+    Kept rows store weight = 1 / rate so that summing weights gives an
+    unbiased estimate of the real number of events.
+
+    Returns:
+        ActivityLog: The created row, or None if the event was sampled out
+    """
+    from ..models import ActivityLog
+
+    rate = get_sample_rate(activity_type)
+    if rate <= 0.0:
+        return None
+    if rate < 1.0 and random.random() >= rate:
+        return None
+
+    log = ActivityLog.objects.create(
+        user=user,
+        activity_type=activity_type,
+        description=description,
+        ip_address=ip_address,
+        user_agent=user_agent,
+        metadata=metadata,
+        weight=1.0 / rate
+    )
+
+    try:
+        from .log_rollup_service import record_activity
+        record_activity(log)
+    except Exception as e:
+        # Rollups can be repaired with `manage.py rebuild_log_rollups`
+        logger.error(f"Failed to update activity rollups: {e}")
+
+    if activity_type in SESSION_ACTIVITY_TYPES:
+        from .dashboard_service import invalidate_dashboard_stats
+        invalidate_dashboard_stats()
+
+    return log
@@ -10,8 +10,14 @@ import re
 from django.conf import settings
 from typing import Dict, Any, Optional
 
+from .rate_limit_service import limited_request
+from ..utils.deadline import Deadline, DeadlineExceeded
+
 logger = logging.getLogger(__name__)
 
+# Upstream steps are skipped once less than this is left for them
+MIN_LOOKUP_SECONDS = 1.0
+
 class WeatherChatbotService:
     """Service class for handling weather chatbot interactions"""
 
@@ -45,10 +51,12 @@ Example responses:
 - For non-weather topics: Politely redirect to weather assistance
 
 When you receive real weather data in the format [REAL WEATHER DATA: ...], use that information to provide accurate, current weather conditions.
+If it includes the usual temperature for the place, use it to say whether the weather is unusual for there.
+If it includes a forecast for tomorrow, answer questions about tomorrow from that forecast, not from the current conditions.
 
 Keep responses conversational but informative."""
 
-    def get_chatbot_response(self, user_message: str, conversation_history: Optional[list] = None, user_location: str = None, current_weather_data: dict = None, user_locations: Optional[list] = None, user_weather_data: dict = None, is_admin: bool = False) -> Dict[str, Any]:
+    def get_chatbot_response(self, user_message: str, conversation_history: Optional[list] = None, user_location: str = None, current_weather_data: dict = None, user_locations: Optional[list] = None, user_weather_data: dict = None, is_admin: bool = False, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
         Get response from Groq API for the user message
 
@@ -60,10 +68,14 @@ Keep responses conversational but informative."""
             user_locations (list, optional): List of user locations for admin queries
             user_weather_data (dict, optional): Weather data for specific user from frontend
             is_admin (bool, optional): Whether this is an admin user
+            deadline (Deadline, optional): Request deadline; weather lookups leave
+                CHATBOT_LLM_MIN_SECONDS of it for the Groq call, which is skipped
+                for the fallback response if the budget is nearly gone
 
         Returns:
             Dict containing response data or error information
         """
+        llm_min_seconds = getattr(settings, 'CHATBOT_LLM_MIN_SECONDS', 3.0)
         try:
             # If current weather data is provided (from map), use it directly for general queries
             weather_info = None
@@ -81,7 +93,10 @@ Keep responses conversational but informative."""
                 )
             else:
                 # Check if this is a weather query and get real weather data
-                weather_result = self._check_weather_query(user_message, user_location)
+                weather_result = self._check_weather_query(
+                    user_message, user_location,
+                    deadline=deadline.reserve(llm_min_seconds) if deadline else None
+                )
                 if isinstance(weather_result, dict):
                     weather_info = weather_result.get('weather_info')
                     detected_location = weather_result.get('location')
@@ -161,9 +176,15 @@ Keep responses conversational but informative."""
                 "stream": False
             }
 
+            # Not enough time left for a useful answer: go straight to the fallback
+            if deadline and not deadline.allows(MIN_LOOKUP_SECONDS):
+                raise DeadlineExceeded(f"Only {deadline.remaining():.1f}s left for the Groq call")
+
             # Make API request
-            response = requests.post(
+            response = limited_request(
+                'groq', 'POST',
                 self.base_url,
+                deadline=deadline,
                 headers=self.headers,
                 json=payload,
                 timeout=30
@@ -342,13 +363,15 @@ Keep responses conversational but informative."""
         else:
             return "I'm ClimaChat, your weather assistant! I'm currently experiencing some technical difficulties, but I'm here to help with weather-related questions. Please try again in a moment."
 
-    def _check_weather_query(self, user_message: str, user_location: str = None) -> Optional[dict]:
+    def _check_weather_query(self, user_message: str, user_location: str = None,
+                             deadline: Optional[Deadline] = None) -> Optional[dict]:
         """
         Check if the user message is asking for weather information and get real data
 
         Args:
             user_message (str): The user's message
             user_location (str, optional): User's saved location or detected location
+            deadline (Deadline, optional): Budget for the lookups
 
         Returns:
             dict: Dictionary with 'weather_info' and 'location', or None if no weather query
@@ -429,23 +452,32 @@ Keep responses conversational but informative."""
 
         # If we found a location, fetch weather for it
         if location:
+            if deadline and not deadline.allows(MIN_LOOKUP_SECONDS):
+                return None  # No time for a lookup; let AI answer without data
+
             # Get weather data using the weather service
             try:
                 from ..utils.weather_helpers import get_weather_for_chatbot
-                weather_data = get_weather_for_chatbot(city=location)
+                weather_data = get_weather_for_chatbot(city=location, deadline=deadline)
 
                 if weather_data['success']:
                     # Format comprehensive weather data for AI
                     formatted_data = f"Location: {weather_data['location']}, Temperature: {weather_data['temperature']} (feels like {weather_data['feels_like']}), Condition: {weather_data['condition']}, Humidity: {weather_data['humidity']}, Wind: {weather_data['wind_speed']}, Pressure: {weather_data['pressure']}, Visibility: {weather_data['visibility']}, Sunrise: {weather_data['sunrise']}, Sunset: {weather_data['sunset']}"
+                    formatted_data += self._climate_context(weather_data)
+                    formatted_data += self._forecast_context(weather_data, message_lower, deadline)
                     return {
                         'weather_info': formatted_data,
                         'location': location
                     }
+                elif deadline and not deadline.allows(MIN_LOOKUP_SECONDS):
+                    return None  # Skip the suffix retry when the budget is nearly gone
                 else:
                     # Try with Philippines suffix for local places
-                    weather_data = get_weather_for_chatbot(city=f"{location},PH")
+                    weather_data = get_weather_for_chatbot(city=f"{location},PH", deadline=deadline)
                     if weather_data['success']:
                         formatted_data = f"Location: {weather_data['location']}, Temperature: {weather_data['temperature']} (feels like {weather_data['feels_like']}), Condition: {weather_data['condition']}, Humidity: {weather_data['humidity']}, Wind: {weather_data['wind_speed']}, Pressure: {weather_data['pressure']}, Visibility: {weather_data['visibility']}, Sunrise: {weather_data['sunrise']}, Sunset: {weather_data['sunset']}"
+                        formatted_data += self._climate_context(weather_data)
+                        formatted_data += self._forecast_context(weather_data, message_lower, deadline)
                         return {
                             'weather_info': formatted_data,
                             'location': location
@@ -459,6 +491,53 @@ Keep responses conversational but informative."""
 
         return None
 
+    def _climate_context(self, weather_data: dict) -> str:
+        """
+        How the temperature compares with what is usual at the location
+
+        Args:
+            weather_data (dict): get_weather_for_chatbot() result
+
+        Returns:
+            str: ", Usual temperature here ..." from stored observations, or ""
+        """
+        coordinates = weather_data.get('coordinates') or {}
+        if weather_data.get('temperature_value') is None or coordinates.get('lat') is None:
+            return ""
+        try:
+            from .climatology_service import describe_for_prompt
+            description = describe_for_prompt(coordinates['lat'], coordinates['lon'], weather_data['temperature_value'])
+        except Exception as e:
+            logger.error(f"Error comparing weather with normals: {str(e)}")
+            return ""
+        return f", {description}" if description else ""
+
+    def _forecast_context(self, weather_data: dict, message_lower: str,
+                          deadline: Optional[Deadline] = None) -> str:
+        """
+        Tomorrow's forecast for the location when the user asks about tomorrow
+
+        Args:
+            weather_data (dict): get_weather_for_chatbot() result
+            message_lower (str): Lowercased user message
+            deadline (Deadline, optional): Budget for a forecast fetch on a cache miss
+
+        Returns:
+            str: ", Tomorrow (...): ..." from the cached forecast, or ""
+        """
+        coordinates = weather_data.get('coordinates') or {}
+        if 'tomorrow' not in message_lower or coordinates.get('lat') is None:
+            return ""
+        if deadline and not deadline.allows(MIN_LOOKUP_SECONDS):
+            return ""
+        try:
+            from .forecast_service import describe_tomorrow
+            description = describe_tomorrow(coordinates['lat'], coordinates['lon'], deadline=deadline)
+        except Exception as e:
+            logger.error(f"Error getting tomorrow's forecast: {str(e)}")
+            return ""
+        return f", {description}" if description else ""
+
     def validate_api_key(self) -> bool:
         """
         Validate if the API key is working
@@ -473,7 +552,8 @@ Keep responses conversational but informative."""
                 "max_tokens": 10
             }
 
-            response = requests.post(
+            response = limited_request(
+                'groq', 'POST',
                 self.base_url,
                 headers=self.headers,
                 json=test_payload,
@@ -0,0 +1,233 @@
+"""
+Circuit Breaker Service
+Per-upstream breakers that stop calling a degraded OpenWeather or Groq
+
+Calls are counted in 10-second slots over a rolling window. Once at least
+min_requests calls were made and the share of failures (errors, 5xx and
+calls slower than slow_call_seconds) reaches failure_rate, the breaker
+opens: calls fail immediately with CircuitOpen, which callers handle like
+any other upstream failure (stale cache, fallback responses). After
+open_seconds one trial call is let through (half-open); it closes the
+breaker if it succeeds quickly and re-opens it otherwise. Only the trial
+call, identified by the token before_call returns, can change a half-open
+breaker; calls still in flight from before it opened are just counted.
+
+State, counters and the trial token are kept in the shared cache (the
+database cache by default, like the rate limit buckets), so every worker
+sees one breaker and one trial call per upstream. Counters are one key
+per slot and metric, updated with cache.incr: atomic on Redis; on the
+database cache a rare concurrent increment can be lost, which only nudges
+the failure rate.
+"""
+
+import logging
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from typing import Dict, Optional
+
+from .rate_limit_service import UpstreamUnavailable
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DEFAULT_BREAKERS = {
+    'openweather': {'window_seconds': 60, 'min_requests': 10, 'failure_rate': 0.5,
+                    'slow_call_seconds': 5.0, 'open_seconds': 30},
+    'groq': {'window_seconds': 60, 'min_requests': 5, 'failure_rate': 0.5,
+             'slow_call_seconds': 15.0, 'open_seconds': 60},
+}
+
+# Rate limit buckets that share an upstream's breaker
+BREAKER_FOR_BUCKET = {
+    'openweather': 'openweather',
+    'openweather_geo': 'openweather',
+    'groq': 'groq',
+}
+
+SLOT_SECONDS = 10
+METRICS = ('calls', 'failures', 'slow', 'latency_ms')
+# A trial call that never reports back frees the half-open slot after this long
+TRIAL_SECONDS = 60
+
+
+class CircuitOpen(UpstreamUnavailable):
+    """The upstream's breaker is open; the call was not made"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit for {name} is open, retry in {retry_after:.0f}s", retry_after)
+        self.name = name
+
+
+def get_breakers() -> Dict[str, Dict]:
+    breakers = {name: dict(config) for name, config in DEFAULT_BREAKERS.items()}
+    for name, config in getattr(settings, 'CIRCUIT_BREAKERS', {}).items():
+        breakers.setdefault(name, {}).update(config)
+    return breakers
+
+
+def _state_key(name: str) -> str:
+    return f'breaker:{name}:state'
+
+
+def _trial_key(name: str) -> str:
+    return f'breaker:{name}:trial'
+
+
+def _slot_key(name: str, slot: int, metric: str) -> str:
+    return f'breaker:{name}:slot:{slot}:{metric}'
+
+
+def _window_slots(config: Dict, now: float):
+    current = int(now // SLOT_SECONDS)
+    count = max(int(config['window_seconds'] // SLOT_SECONDS), 1)
+    return range(current - count + 1, current + 1)
+
+
+def _window_keys(name: str, config: Dict, now: float):
+    return [_slot_key(name, slot, metric) for slot in _window_slots(config, now) for metric in METRICS]
+
+
+def _incr(key: str, amount: int, ttl: int):
+    if not amount:
+        return
+    if not cache.add(key, amount, ttl):
+        try:
+            cache.incr(key, amount)
+        except ValueError:  # Expired between add and incr
+            cache.set(key, amount, ttl)
+
+
+def _window(name: str, config: Dict, now: float) -> Dict:
+    """Summed counters of the rolling window"""
+    totals = dict.fromkeys(METRICS, 0)
+    for key, value in cache.get_many(_window_keys(name, config, now)).items():
+        totals[key.rsplit(':', 1)[1]] += value
+    return {'calls': totals['calls'], 'failures': totals['failures'], 'slow': totals['slow'],
+            'latency': totals['latency_ms'] / 1000}
+
+
+def _get_state(name: str) -> Dict:
+    return cache.get(_state_key(name)) or {'state': CLOSED, 'opened_at': None}
+
+
+def _set_state(name: str, state: str, now: float):
+    previous = _get_state(name)['state']
+    cache.set(_state_key(name), {'state': state, 'opened_at': now if state != CLOSED else None}, None)
+    if state == CLOSED:
+        cache.delete(_trial_key(name))
+    if previous != state:
+        log = logger.info if state == CLOSED else logger.warning
+        log(f"Circuit breaker for {name}: {previous} -> {state}")
+
+
+def before_call(name: str) -> Optional[str]:
+    """
+    Check the breaker before calling an upstream
+
+    Returns:
+        str: Trial token when this call is the half-open trial (pass it to
+        record() or release_trial()), else None
+
+    Raises:
+        CircuitOpen: The breaker is open, or half-open with a trial in flight
+    """
+    config = get_breakers().get(name)
+    if not config:
+        return None
+    state = _get_state(name)
+    if state['state'] == CLOSED:
+        return None
+
+    now = time.time()
+    retry_after = state['opened_at'] + config['open_seconds'] - now
+    if state['state'] == OPEN and retry_after > 0:
+        raise CircuitOpen(name, retry_after)
+    # Open long enough: exactly one worker gets to make the trial call
+    trial = uuid.uuid4().hex
+    if not cache.add(_trial_key(name), trial, TRIAL_SECONDS):
+        raise CircuitOpen(name, max(retry_after, 1))
+    if state['state'] == OPEN:
+        _set_state(name, HALF_OPEN, state['opened_at'])
+    return trial
+
+
+def _holds_trial(name: str, trial: Optional[str]) -> bool:
+    return trial is not None and cache.get(_trial_key(name)) == trial
+
+
+def release_trial(name: str, trial: Optional[str]) -> None:
+    """Give up a trial that wasn't made, so another worker can make it"""
+    if _holds_trial(name, trial):
+        cache.delete(_trial_key(name))
+
+
+def record(name: str, success: bool, latency: float, trial: Optional[str] = None) -> None:
+    """
+    Record the outcome of a call and open or close the breaker
+
+    Args:
+        name: Breaker name
+        success: Whether the call succeeded
+        latency: Call duration in seconds
+        trial: before_call()'s token; only the trial call moves a half-open breaker
+    """
+    config = get_breakers().get(name)
+    if not config:
+        return
+    now = time.time()
+    slow = latency >= config['slow_call_seconds']
+    failed = not success or slow
+
+    slot = _window_slots(config, now)[-1]
+    ttl = int(config['window_seconds']) + SLOT_SECONDS
+    _incr(_slot_key(name, slot, 'calls'), 1, ttl)
+    _incr(_slot_key(name, slot, 'failures'), int(not success), ttl)
+    _incr(_slot_key(name, slot, 'slow'), int(slow and success), ttl)
+    _incr(_slot_key(name, slot, 'latency_ms'), int(latency * 1000), ttl)
+
+    state = _get_state(name)['state']
+    if state == HALF_OPEN:
+        if not _holds_trial(name, trial):
+            return  # A call from before the breaker opened; only the trial decides
+        if failed:
+            _set_state(name, OPEN, now)
+            cache.delete(_trial_key(name))
+        else:
+            cache.delete_many(_window_keys(name, config, now))
+            _set_state(name, CLOSED, now)
+        return
+
+    if state == CLOSED and failed:
+        window = _window(name, config, now)
+        if (window['calls'] >= config['min_requests']
+                and (window['failures'] + window['slow']) / window['calls'] >= config['failure_rate']):
+            _set_state(name, OPEN, now)
+
+
+def get_breaker_stats() -> Dict[str, Dict]:
+    """State and rolling-window counters per breaker"""
+    now = time.time()
+    stats = {}
+    for name, config in get_breakers().items():
+        state = _get_state(name)
+        window = _window(name, config, now)
+        stats[name] = {
+            'state': state['state'],
+            'opened_at': state['opened_at'],
+            'retry_in_seconds': (
+                max(round(state['opened_at'] + config['open_seconds'] - now), 0)
+                if state['state'] == OPEN else None
+            ),
+            'window_seconds': config['window_seconds'],
+            'calls': window['calls'],
+            'failures': window['failures'],
+            'slow_calls': window['slow'],
+            'failure_rate': round((window['failures'] + window['slow']) / window['calls'], 3) if window['calls'] else 0.0,
+            'mean_latency_ms': round(window['latency'] / window['calls'] * 1000) if window['calls'] else None,
+        }
+    return stats
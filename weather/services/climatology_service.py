@@ -0,0 +1,272 @@
+"""
+Climatology Service
+Rolling statistics and normals per weather cell, kept current as
+observations are stored
+
+For each cell and field in STATS_FIELDS a WeatherCellStats row holds the
+count, mean and variance (Welford's online algorithm), min/max and the
+last value, plus the same running mean/variance per local solar hour and
+per month. Each stored observation updates them in O(1), so "is this
+unusual here?" is one row lookup for the chatbot, temperature alerts and
+the admin dashboard. `manage.py rebuild_weather_stats` recomputes them
+from the observation table.
+"""
+
+import logging
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.db import transaction
+from django.utils import timezone
+from typing import Dict, Iterable, List, Optional
+
+from .observation_service import OBSERVATION_FIELDS
+from ..utils.geohash import decode
+
+logger = logging.getLogger(__name__)
+
+STATS_FIELDS = ('temperature', 'feels_like', 'humidity', 'wind_speed', 'pressure')
+
+# Fewest observations before a normal is trusted
+MIN_NORMAL_COUNT = 20
+
+# z-score bands for describing a value against its normal
+ANOMALY_LABELS = (
+    (2.0, 'far above normal'),
+    (1.0, 'above normal'),
+    (-1.0, 'near normal'),
+    (-2.0, 'below normal'),
+)
+FAR_BELOW_LABEL = 'far below normal'
+
+
+def _empty(slots: int) -> List[List[float]]:
+    return [[0, 0.0, 0.0] for _ in range(slots)]
+
+
+def _add(accumulator: List[float], value: float):
+    """Welford update of a [count, mean, m2] accumulator in place"""
+    accumulator[0] += 1
+    delta = value - accumulator[1]
+    accumulator[1] += delta / accumulator[0]
+    accumulator[2] += delta * (value - accumulator[1])
+
+
+def _std(count: int, m2: float) -> Optional[float]:
+    return math.sqrt(m2 / (count - 1)) if count > 1 else None
+
+
+def local_time(cell: str, moment: datetime) -> datetime:
+    """Local solar time of a moment at the cell centre (UTC + longitude / 15 hours)"""
+    _, lon = decode(cell)
+    return moment.astimezone(dt_timezone.utc).replace(tzinfo=None) + timedelta(hours=round(lon / 15))
+
+
+def update_stats(observations: Iterable) -> int:
+    """
+    Fold new observations into their cells' running statistics
+
+    Observations not newer than a cell's last counted one are skipped, so
+    replayed or duplicate observations are never counted twice.
+
+    Args:
+        observations: WeatherObservation instances (saved or not)
+
+    Returns:
+        int: Observations counted
+    """
+    from ..models import WeatherCellStats
+
+    by_cell: Dict[str, List] = {}
+    for obs in observations:
+        by_cell.setdefault(obs.cell, []).append(obs)
+    if not by_cell:
+        return 0
+
+    counted = set()
+    with transaction.atomic():
+        existing = {
+            (stats.cell, stats.field): stats
+            for stats in WeatherCellStats.objects.select_for_update().filter(cell__in=list(by_cell), field__in=STATS_FIELDS)
+        }
+        created, changed = [], []
+        for cell, cell_observations in by_cell.items():
+            for field in STATS_FIELDS:
+                stats = existing.get((cell, field))
+                is_new = stats is None
+                if is_new:
+                    stats = WeatherCellStats(cell=cell, field=field, hourly=_empty(24), monthly=_empty(12))
+                accumulator = [stats.count, stats.mean, stats.m2]
+                touched = False
+                for obs in sorted(cell_observations, key=lambda item: item.observed_at):
+                    raw = getattr(obs, field)
+                    if raw is None or (stats.last_observed_at and obs.observed_at <= stats.last_observed_at):
+                        continue
+                    value = raw / OBSERVATION_FIELDS[field]
+                    local = local_time(cell, obs.observed_at)
+                    _add(accumulator, value)
+                    _add(stats.hourly[local.hour], value)
+                    _add(stats.monthly[local.month - 1], value)
+                    stats.min_value = value if stats.min_value is None else min(stats.min_value, value)
+                    stats.max_value = value if stats.max_value is None else max(stats.max_value, value)
+                    stats.last_value = value
+                    stats.last_observed_at = obs.observed_at
+                    touched = True
+                    counted.add((cell, obs.observed_at))
+                if not touched:
+                    continue
+                stats.count, stats.mean, stats.m2 = accumulator
+                (created if is_new else changed).append(stats)
+
+        WeatherCellStats.objects.bulk_create(created)
+        WeatherCellStats.objects.bulk_update(changed, [
+            'count', 'mean', 'm2', 'min_value', 'max_value', 'last_value',
+            'last_observed_at', 'hourly', 'monthly', 'updated_at',
+        ])
+    return len(counted)
+
+
+def _summary(stats, when: Optional[datetime]) -> Dict:
+    when = when or timezone.now()
+    local = local_time(stats.cell, when)
+    hour_count, hour_mean, hour_m2 = stats.hourly[local.hour] if stats.hourly else (0, 0.0, 0.0)
+    month_count, month_mean, month_m2 = stats.monthly[local.month - 1] if stats.monthly else (0, 0.0, 0.0)
+    return {
+        'cell': stats.cell,
+        'field': stats.field,
+        'count': stats.count,
+        'mean': stats.mean,
+        'std': _std(stats.count, stats.m2),
+        'min': stats.min_value,
+        'max': stats.max_value,
+        'last_value': stats.last_value,
+        'last_observed_at': stats.last_observed_at,
+        'hour_normal': {'hour': local.hour, 'count': hour_count, 'mean': hour_mean, 'std': _std(hour_count, hour_m2)},
+        'month_normal': {'month': local.month, 'count': month_count, 'mean': month_mean, 'std': _std(month_count, month_m2)},
+    }
+
+
+def get_normals(cell: str, field: str = 'temperature', when: Optional[datetime] = None) -> Optional[Dict]:
+    """
+    Overall, hour-of-day and monthly statistics of a cell's field
+
+    Args:
+        cell: Weather cell
+        field: One of STATS_FIELDS
+        when: Moment whose local hour and month select the normals (default: now)
+
+    Returns:
+        dict: count, mean, std, min, max, last_value, last_observed_at,
+        hour_normal and month_normal ({count, mean, std}), or None without data
+    """
+    from ..models import WeatherCellStats
+
+    stats = WeatherCellStats.objects.filter(cell=cell, field=field).first()
+    return _summary(stats, when) if stats else None
+
+
+def _compare(summary: Dict, value: float) -> Optional[Dict]:
+    # Most specific normal with enough observations: this hour, this month, all time
+    for basis, normal in (('hour', summary['hour_normal']), ('month', summary['month_normal']),
+                          ('overall', {'count': summary['count'], 'mean': summary['mean'], 'std': summary['std']})):
+        if normal['count'] >= MIN_NORMAL_COUNT and normal['std']:
+            break
+    else:
+        return None
+
+    z_score = (value - normal['mean']) / normal['std']
+    label = next((text for threshold, text in ANOMALY_LABELS if z_score >= threshold), FAR_BELOW_LABEL)
+    return {
+        'value': round(value, 1),
+        'normal': round(normal['mean'], 1),
+        'std': round(normal['std'], 1),
+        'difference': round(value - normal['mean'], 1),
+        'z_score': round(z_score, 2),
+        'label': label,
+        'basis': basis,
+        'count': normal['count'],
+        'record_high': summary['max'] is not None and value > summary['max'],
+        'record_low': summary['min'] is not None and value < summary['min'],
+        'min': summary['min'],
+        'max': summary['max'],
+    }
+
+
+def compare_to_normal(cell: str, value: float, field: str = 'temperature',
+                      when: Optional[datetime] = None) -> Optional[Dict]:
+    """
+    How a value compares with the cell's normal for the time
+
+    The normal is the local hour's if it has MIN_NORMAL_COUNT observations,
+    else the month's, else the overall one.
+
+    Returns:
+        dict: value, normal, std, difference, z_score, label, basis, count,
+        record_high, record_low, min, max; or None without enough history
+    """
+    summary = get_normals(cell, field, when)
+    return _compare(summary, float(value)) if summary else None
+
+
+def describe_for_prompt(lat: float, lon: float, temperature: float) -> Optional[str]:
+    """One-line temperature-vs-normal summary for the chatbot prompt, or None"""
+    from .weather_cache_service import cell_for
+
+    comparison = compare_to_normal(cell_for(lat, lon), temperature)
+    if not comparison:
+        return None
+    period = {'hour': 'at this hour', 'month': 'this month', 'overall': 'overall'}[comparison['basis']]
+    text = (
+        f"Usual temperature here {period}: {comparison['normal']}°C (±{comparison['std']}, "
+        f"{comparison['count']} readings, observed range {comparison['min']}-{comparison['max']}°C); "
+        f"now {comparison['difference']:+}°C, {comparison['label']}"
+    )
+    if comparison['record_high']:
+        text += ", the highest on record here"
+    elif comparison['record_low']:
+        text += ", the lowest on record here"
+    return text
+
+
+def get_unusual_conditions(limit: int = 5, max_age_hours: int = 3) -> List[Dict]:
+    """
+    Cells whose latest temperature is furthest from their normal
+
+    Returns:
+        list: compare_to_normal() dicts with 'cell' and 'observed_at', largest |z| first
+    """
+    from ..models import WeatherCellStats
+
+    recent = timezone.now() - timedelta(hours=max_age_hours)
+    results = []
+    for stats in WeatherCellStats.objects.filter(field='temperature', last_observed_at__gte=recent,
+                                                 count__gte=MIN_NORMAL_COUNT):
+        comparison = _compare(_summary(stats, stats.last_observed_at), stats.last_value)
+        if comparison:
+            results.append({**comparison, 'cell': stats.cell, 'observed_at': stats.last_observed_at})
+    results.sort(key=lambda item: abs(item['z_score']), reverse=True)
+    return results[:limit]
+
+
+def rebuild_stats(cells: Optional[Iterable[str]] = None, chunk_size: int = 5000) -> Dict[str, int]:
+    """
+    Recompute cells' statistics from the observation table
+
+    Returns:
+        dict: {'cells': count, 'observations': count}
+    """
+    from ..models import WeatherCellStats, WeatherObservation
+
+    if cells is None:
+        cells = WeatherObservation.objects.values_list('cell', flat=True).distinct()
+    totals = {'cells': 0, 'observations': 0}
+    for cell in list(cells):
+        WeatherCellStats.objects.filter(cell=cell).delete()
+        batch = []
+        for obs in WeatherObservation.objects.filter(cell=cell).order_by('observed_at').iterator(chunk_size=chunk_size):
+            batch.append(obs)
+            if len(batch) >= chunk_size:
+                totals['observations'] += update_stats(batch)
+                batch = []
+        totals['observations'] += update_stats(batch)
+        totals['cells'] += 1
+    return totals
@@ -0,0 +1,102 @@
+"""
+Admin Dashboard Service
+Computes the admin dashboard and user management stats from indexed
+lookups and single aggregate queries, and caches them briefly
+"""
+
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+from typing import Dict, Any
+
+from .presence_service import count_active_users
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_STATS_CACHE_KEY = 'admin_dashboard:stats'
+USER_STATS_CACHE_KEY = 'admin_users:stats'
+
+
+def _cache_ttl() -> int:
+    return getattr(settings, 'ADMIN_DASHBOARD_CACHE_TTL', 30)
+
+
+def _weather_trends(limit: int = 5):
+    """Cells whose latest temperature is furthest from normal, with a place name when cached"""
+    from .climatology_service import get_unusual_conditions
+    from .weather_cache_service import get_cached_many
+
+    trends = get_unusual_conditions(limit)
+    cached = get_cached_many('current', [trend['cell'] for trend in trends])
+    for trend in trends:
+        trend['location'] = (cached.get(trend['cell']) or {}).get('location') or trend['cell']
+    return trends
+
+
+def _compute_dashboard_stats() -> Dict[str, Any]:
+    from ..models import ActivityLog, UserLocation
+
+    User = get_user_model()
+    last_24_hours = timezone.now() - timedelta(days=1)
+
+    return {
+        'users_count': User.objects.filter(is_superuser=False).count(),
+        'active_sessions': count_active_users(),
+        'recent_activities': list(
+            ActivityLog.objects.filter(timestamp__gte=last_24_hours)
+            .select_related('user').order_by('-timestamp')[:5]
+        ),
+        'user_locations': list(
+            UserLocation.objects.filter(user__is_superuser=False)
+            .select_related('user').order_by('-updated_at')[:5]
+        ),
+        'weather_trends': _weather_trends(),
+    }
+
+
+def get_dashboard_stats() -> Dict[str, Any]:
+    """
+    Get admin dashboard stats, served from cache for ADMIN_DASHBOARD_CACHE_TTL seconds
+
+    Returns:
+        dict: users_count, active_sessions, recent_activities, user_locations, weather_trends
+    """
+    stats = cache.get(DASHBOARD_STATS_CACHE_KEY)
+    if stats is None:
+        stats = _compute_dashboard_stats()
+        cache.set(DASHBOARD_STATS_CACHE_KEY, stats, _cache_ttl())
+    return stats
+
+
+def get_user_stats() -> Dict[str, int]:
+    """
+    Get the admin users page counters in one conditional-aggregate query
+
+    Returns:
+        dict: total_users, active_users, new_today, inactive_users
+    """
+    stats = cache.get(USER_STATS_CACHE_KEY)
+    if stats is not None:
+        return stats
+
+    User = get_user_model()
+    thirty_days_ago = timezone.now() - timedelta(days=30)
+
+    stats = User.objects.filter(is_staff=False, is_superuser=False).aggregate(
+        total_users=Count('id'),
+        active_users=Count('id', filter=Q(is_active=True)),
+        new_today=Count('id', filter=Q(date_joined__date=timezone.now().date())),
+        # Not logged in for 30+ days or inactive accounts
+        inactive_users=Count('id', filter=Q(last_login__lt=thirty_days_ago) | Q(is_active=False)),
+    )
+    cache.set(USER_STATS_CACHE_KEY, stats, _cache_ttl())
+    return stats
+
+
+def invalidate_dashboard_stats():
+    """Drop cached admin stats after logins, logouts, signups or user changes"""
+    cache.delete_many([DASHBOARD_STATS_CACHE_KEY, USER_STATS_CACHE_KEY])
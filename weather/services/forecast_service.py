@@ -0,0 +1,346 @@
+"""
+Forecast Service
+One cached 5-day / 3-hour forecast per location, serving daily, hourly and
+"tomorrow" answers
+
+OpenWeatherMap's /forecast returns 40 three-hour slots that only change
+when the provider's 3-hourly model run lands, so the compacted payload is
+cached until the next cycle (00, 03, 06 ... UTC plus
+WEATHER_FORECAST_CYCLE_GRACE). Coordinates share the per-cell entry of
+the weather cache (kind 'forecast'); city queries are cached by name.
+Daily min/max/avg come from every slot of the local day in one vectorized
+pass, not from a single sampled slot. Current conditions can be derived
+from the slots around now (derive_current) instead of calling /weather.
+"""
+
+import hashlib
+import logging
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.cache import cache
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..utils.deadline import Deadline
+
+logger = logging.getLogger(__name__)
+
+SLOT_SECONDS = 3 * 3600
+DAY_SECONDS = 86400
+
+# Slot values kept from the upstream payload
+NUMERIC_SLOT_FIELDS = ('temperature', 'temp_min', 'temp_max', 'feels_like', 'humidity',
+                       'pressure', 'wind_speed', 'pop', 'rain')
+
+# Slot values interpolated to the current time, and those an observation corrects
+INTERPOLATED_FIELDS = ('temperature', 'feels_like', 'humidity', 'pressure', 'wind_speed', 'cloud_cover')
+CORRECTED_FIELDS = ('temperature', 'feels_like', 'humidity', 'pressure')
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def cycle_expiry(now: Optional[float] = None) -> float:
+    """
+    When a forecast fetched now goes stale: the next 3-hour model cycle
+    (plus WEATHER_FORECAST_CYCLE_GRACE for the provider to publish it),
+    capped by WEATHER_FORECAST_CACHE_TTL
+    """
+    now = now or time.time()
+    grace = _setting('WEATHER_FORECAST_CYCLE_GRACE', 600)
+    next_cycle = ((now - grace) // SLOT_SECONDS + 1) * SLOT_SECONDS + grace
+    return min(next_cycle, now + _setting('WEATHER_FORECAST_CACHE_TTL', SLOT_SECONDS))
+
+
+def compact_forecast(data: Dict) -> Dict:
+    """
+    Compact /forecast payload: location and every 3-hour slot, metric units
+
+    Returns:
+        dict: {'location', 'slots': [...], 'expires_at'}
+    """
+    city = data.get('city', {})
+    slots = []
+    for item in data.get('list', []):
+        main = item.get('main', {})
+        weather = item.get('weather', [{}])[0]
+        slots.append({
+            'dt': item.get('dt'),
+            'temperature': main.get('temp'),
+            'temp_min': main.get('temp_min'),
+            'temp_max': main.get('temp_max'),
+            'feels_like': main.get('feels_like'),
+            'humidity': main.get('humidity'),
+            'pressure': main.get('pressure'),
+            'wind_speed': item.get('wind', {}).get('speed'),  # m/s
+            'wind_direction': item.get('wind', {}).get('deg'),
+            'cloud_cover': item.get('clouds', {}).get('all'),
+            'visibility': item.get('visibility'),  # m
+            'pop': item.get('pop', 0),
+            'rain': item.get('rain', {}).get('3h', 0),  # mm in the 3 hours
+            'condition': weather.get('description', '').title(),
+            'condition_main': weather.get('main', ''),
+            'condition_code': weather.get('id'),
+            'icon': weather.get('icon', ''),
+        })
+    return {
+        'location': {
+            'name': city.get('name', 'Unknown'),
+            'country': city.get('country', ''),
+            'coordinates': city.get('coord', {}),
+            'timezone': city.get('timezone', 0),  # UTC offset in seconds
+            'sunrise': city.get('sunrise'),
+            'sunset': city.get('sunset'),
+        },
+        'slots': slots,
+        'expires_at': cycle_expiry(),
+    }
+
+
+def _city_cache_key(city: str) -> str:
+    normalized = ' '.join(city.lower().split())
+    return f"weather:forecast:city:{hashlib.md5(normalized.encode('utf-8')).hexdigest()}"
+
+
+def get_forecast(city: str = None, lat: float = None, lon: float = None,
+                 deadline: Optional[Deadline] = None) -> Dict:
+    """
+    Cached compact forecast of a location, fetched on a miss
+
+    Args:
+        city: City name
+        lat, lon: Coordinates (the forecast of their weather cell)
+        deadline: Request deadline for a fetch on a miss
+
+    Returns:
+        dict: {'success': True, 'data': compact_forecast()} or an error result
+    """
+    from .weather_cache_service import cell_for, get_for_cells
+    from .weather_service import get_weather_service
+
+    if lat is not None and lon is not None:
+        cell = cell_for(lat, lon)
+        data = get_for_cells('forecast', [cell], deadline=deadline).get(cell)
+        if data:
+            return {'success': True, 'data': data}
+        # Another request holds the cell's fetch lock, or the fetch failed
+        return get_weather_service(deadline=deadline).get_forecast_slots(lat=lat, lon=lon)
+
+    if not city:
+        return {'success': False, 'error': 'Either city name or coordinates must be provided'}
+    key = _city_cache_key(city)
+    cached = cache.get(key)
+    if cached and cached['expires_at'] > time.time():
+        return {'success': True, 'data': cached}
+    result = get_weather_service(deadline=deadline).get_forecast_slots(city=city)
+    if result.get('success'):
+        cache.set(key, result['data'], int(result['data']['expires_at'] - time.time()) + _setting('WEATHER_STALE_TTL', 21600))
+    elif cached:
+        return {'success': True, 'data': {**cached, 'stale': True}}
+    return result
+
+
+def get_cached_forecast(city: str = None, lat: float = None, lon: float = None) -> Optional[Dict]:
+    """Cached compact forecast of a location if it is still current, without fetching"""
+    from .weather_cache_service import cell_for, get_cached
+
+    if lat is not None and lon is not None:
+        data = get_cached('forecast', cell_for(lat, lon))
+    elif city:
+        data = cache.get(_city_cache_key(city))
+    else:
+        return None
+    if not data or data.get('expires_at', 0) <= time.time():
+        return None
+    return data
+
+
+def _columns(slots: List[Dict]) -> Dict[str, np.ndarray]:
+    columns = {'dt': np.array([slot['dt'] for slot in slots], dtype=np.int64)}
+    for field in NUMERIC_SLOT_FIELDS:
+        # None becomes NaN in a float array
+        columns[field] = np.array([slot.get(field) for slot in slots], dtype='float64')
+    return columns
+
+
+def daily_summary(forecast: Dict, days: int = 5) -> List[Dict]:
+    """
+    Per local day aggregates of every forecast slot, in one vectorized pass
+
+    Min/max come from the slots' temp_min/temp_max, averages from all the
+    day's slots; condition and icon are those of the slot nearest local noon.
+    The first day may be partial (only its remaining slots are forecast).
+
+    Returns:
+        list: Up to `days` dicts, oldest first
+    """
+    slots = forecast.get('slots') or []
+    if not slots:
+        return []
+    columns = _columns(slots)
+    local = columns['dt'] + int(forecast.get('location', {}).get('timezone') or 0)
+    day_index = local // DAY_SECONDS
+    # Slots are in time order, so each day's slots are contiguous
+    day_keys, starts, counts = np.unique(day_index, return_index=True, return_counts=True)
+    day_keys, starts, counts = day_keys[:days], starts[:days], counts[:days]
+    end = int(starts[-1] + counts[-1])
+
+    def reduce(ufunc, field):
+        return ufunc.reduceat(np.nan_to_num(columns[field][:end], nan=0.0), starts)
+
+    temp_min = np.fmin.reduceat(columns['temp_min'][:end], starts)
+    temp_max = np.fmax.reduceat(columns['temp_max'][:end], starts)
+    temp_avg = reduce(np.add, 'temperature') / counts
+    humidity = reduce(np.add, 'humidity') / counts
+    wind_max = np.fmax.reduceat(columns['wind_speed'][:end], starts)
+    pop_max = np.fmax.reduceat(columns['pop'][:end], starts)
+    rain = reduce(np.add, 'rain')
+    # Representative slot: nearest local noon within each day
+    distance = np.abs((local[:end] % DAY_SECONDS) - DAY_SECONDS // 2)
+    noon = np.lexsort((distance, day_index[:end]))
+    representative = noon[np.searchsorted(day_index[:end][noon], day_keys)]
+
+    summary = []
+    for position, day in enumerate(day_keys.tolist()):
+        slot = slots[int(representative[position])]
+        summary.append({
+            'date': datetime.fromtimestamp(day * DAY_SECONDS, tz=dt_timezone.utc).strftime('%Y-%m-%d'),
+            'temperature': {
+                'min': round(float(temp_min[position])),
+                'max': round(float(temp_max[position])),
+                'avg': round(float(temp_avg[position])),
+            },
+            'condition': slot['condition'],
+            'condition_main': slot['condition_main'],
+            'icon': slot['icon'],
+            'humidity': round(float(humidity[position])),
+            'wind_speed': round(float(wind_max[position]) * 3.6),  # km/h, the day's strongest
+            'precipitation_probability': round(float(pop_max[position]) * 100),
+            'precipitation': round(float(rain[position]), 1),  # mm
+            'slots': int(counts[position]),
+        })
+    return summary
+
+
+def hourly(forecast: Dict, hours: int = 24, now: Optional[float] = None) -> List[Dict]:
+    """The 3-hour slots covering the next `hours` hours"""
+    now = now or time.time()
+    upcoming = [slot for slot in forecast.get('slots') or [] if slot['dt'] + SLOT_SECONDS > now]
+    offset = int(forecast.get('location', {}).get('timezone') or 0)
+    return [
+        {
+            'dt': slot['dt'],
+            'time': datetime.fromtimestamp(slot['dt'] + offset, tz=dt_timezone.utc).strftime('%H:%M'),
+            'temperature': round(slot['temperature']) if slot['temperature'] is not None else None,
+            'feels_like': round(slot['feels_like']) if slot['feels_like'] is not None else None,
+            'humidity': slot['humidity'],
+            'wind_speed': round((slot['wind_speed'] or 0) * 3.6),  # km/h
+            'precipitation_probability': round((slot['pop'] or 0) * 100),
+            'condition': slot['condition'],
+            'condition_main': slot['condition_main'],
+            'icon': slot['icon'],
+        }
+        for slot in upcoming[:max(-(-hours // 3), 1)]
+    ]
+
+
+def day_ahead(forecast: Dict, days_ahead: int = 1, now: Optional[float] = None) -> Optional[Dict]:
+    """daily_summary() entry for the local day `days_ahead` after today, or None"""
+    offset = int(forecast.get('location', {}).get('timezone') or 0)
+    local_today = datetime.fromtimestamp((now or time.time()) + offset, tz=dt_timezone.utc).date()
+    target = (local_today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
+    return next((day for day in daily_summary(forecast, days=6) if day['date'] == target), None)
+
+
+def describe_tomorrow(lat: float, lon: float, deadline: Optional[Deadline] = None) -> Optional[str]:
+    """One-line forecast of tomorrow for the chatbot prompt, or None"""
+    result = get_forecast(lat=lat, lon=lon, deadline=deadline)
+    if not result.get('success'):
+        return None
+    day = day_ahead(result['data'])
+    if not day:
+        return None
+    return (
+        f"Tomorrow ({day['date']}): {day['condition']}, {day['temperature']['min']}-{day['temperature']['max']}°C "
+        f"(avg {day['temperature']['avg']}°C), humidity {day['humidity']}%, wind up to {day['wind_speed']} km/h, "
+        f"{day['precipitation_probability']}% chance of rain ({day['precipitation']} mm)"
+    )
+
+
+def _interpolate(before: Optional[float], after: Optional[float], weight: float) -> Optional[float]:
+    if before is None or after is None:
+        return after if before is None else before
+    return before + (after - before) * weight
+
+
+def _interpolate_direction(before: Optional[float], after: Optional[float], weight: float) -> Optional[float]:
+    """Wind direction along the shorter arc (350° to 10° passes 0°, not 180°)"""
+    if before is None or after is None:
+        return _interpolate(before, after, weight)
+    return (before + ((after - before + 180) % 360 - 180) * weight) % 360
+
+
+def derive_current(forecast: Dict, now: Optional[float] = None,
+                   anchor: Optional[Dict] = None, anchor_weight: float = 0.0) -> Optional[Dict]:
+    """
+    Current conditions interpolated from the forecast slots around now
+
+    Numeric values are linear between the slots before and after now (wind
+    direction along the shorter arc); condition, icon and rain come from
+    the nearest slot. With an anchor (a real observation), the forecast's
+    error at the anchor's time is added to CORRECTED_FIELDS, scaled by
+    anchor_weight (1 = fully, fading to 0 as the observation ages).
+
+    Args:
+        forecast: compact_forecast() data
+        now: Epoch seconds (default: now)
+        anchor: Real observation, metric values with 'dt' (WeatherAPIService 'measurements')
+        anchor_weight: Share of the anchor's correction to apply, 0-1
+
+    Returns:
+        dict: {'values': metric values by field, 'nearest': slot, 'slots': [dt, ...],
+        'corrected': bool}; None when now is not within a slot of the forecast
+    """
+    slots = forecast.get('slots') or []
+    now = now or time.time()
+    if not slots or now < slots[0]['dt'] - SLOT_SECONDS or now > slots[-1]['dt']:
+        return None
+
+    times = np.array([slot['dt'] for slot in slots], dtype=np.int64)
+
+    def around(moment):
+        # Slots either side of the moment; the first two when it is before the first slot
+        after = min(max(int(np.searchsorted(times, moment, side='right')), 1), len(slots) - 1)
+        before = max(after - 1, 0)
+        span = slots[after]['dt'] - slots[before]['dt']
+        weight = min(max((moment - slots[before]['dt']) / span, 0.0), 1.0) if span else 0.0
+        return slots[before], slots[after], weight
+
+    def at(moment):
+        before, after, weight = around(moment)
+        values = {field: _interpolate(before.get(field), after.get(field), weight) for field in INTERPOLATED_FIELDS}
+        values['wind_direction'] = _interpolate_direction(before.get('wind_direction'), after.get('wind_direction'), weight)
+        return values, before, after, weight
+
+    values, before, after, weight = at(now)
+    corrected = False
+    if anchor and anchor.get('dt') and anchor_weight > 0:
+        forecast_then = at(anchor['dt'])[0]
+        for field in CORRECTED_FIELDS:
+            if anchor.get(field) is not None and forecast_then[field] is not None and values[field] is not None:
+                values[field] += (anchor[field] - forecast_then[field]) * anchor_weight
+                corrected = True
+        if values['humidity'] is not None:
+            values['humidity'] = min(max(values['humidity'], 0), 100)
+
+    nearest = after if weight >= 0.5 else before
+    values['precipitation'] = (nearest.get('rain') or 0) / 3  # mm/h from the slot's 3-hour total
+    return {
+        'values': values,
+        'nearest': nearest,
+        'slots': sorted({before['dt'], after['dt']}),
+        'corrected': corrected,
+    }
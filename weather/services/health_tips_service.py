@@ -6,6 +6,8 @@ import re
 from django.conf import settings
 from typing import Dict, Any, List
 
+from .rate_limit_service import limited_request
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,7 +26,8 @@ class HealthTipsService:
             return self._get_fallback_tips(weather_data)
 
         try:
-            response = requests.post(
+            response = limited_request(
+                'groq', 'POST',
                 self.api_url,
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -0,0 +1,184 @@
+"""
+Weather History Service
+Observation history of a cell downsampled for charts, with bounded size
+
+A requested range is snapped to a resolution tier: the smallest of
+RESOLUTIONS that splits it into at most `points` buckets. Start and end
+are aligned to the tier, so every request for "the last 7 days" within
+the same tier step maps to the same cache entry, and the response never
+has more than `points` points per field however long the range is.
+
+Methods:
+    lttb    Largest-Triangle-Three-Buckets: real observations that keep
+            the line's shape
+    minmax  min/max/mean of each tier bucket: the envelope of the data
+"""
+
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.core.cache import cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.downsample import lttb, minmax_envelope
+from .observation_service import OBSERVATION_FIELDS
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('lttb', 'minmax')
+DEFAULT_POINTS = 500
+MAX_POINTS = 2000
+
+# Resolution tiers (seconds); observations arrive about every 10 minutes
+RESOLUTIONS = (600, 1800, 3600, 3 * 3600, 6 * 3600, 12 * 3600, 86400, 7 * 86400)
+
+# Ranges that are over are cached this long; ranges reaching now for one tier step
+HISTORY_CACHE_TTL = 24 * 3600
+MAX_LIVE_CACHE_TTL = 600
+
+
+def resolution_for(span_seconds: float, points: int) -> int:
+    """Smallest tier splitting span_seconds into at most points buckets"""
+    for resolution in RESOLUTIONS:
+        if span_seconds / resolution <= points:
+            return resolution
+    return RESOLUTIONS[-1]
+
+
+def align_range(start: datetime, end: datetime, points: int) -> Tuple[int, int, int]:
+    """
+    Range snapped to its resolution tier
+
+    Returns:
+        tuple: (start, end, resolution) in epoch seconds
+    """
+    start_ts, end_ts = int(start.timestamp()), int(end.timestamp())
+    resolution = resolution_for(max(end_ts - start_ts, 1), max(points - 1, 1))
+    return (start_ts // resolution) * resolution, -(-end_ts // resolution) * resolution, resolution
+
+
+def load_series(cell: str, start_ts: int, end_ts: int,
+                fields: Iterable[str]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Observations of a cell in [start_ts, end_ts) as float arrays, NaN for missing
+
+    Read from the columnar store when it is enabled, otherwise from the
+    observation table.
+
+    Returns:
+        tuple: (epoch seconds, {field: values})
+    """
+    from . import series_store_service
+
+    fields = list(fields)
+    start = datetime.fromtimestamp(start_ts, tz=dt_timezone.utc)
+    end = datetime.fromtimestamp(end_ts, tz=dt_timezone.utc)
+
+    if series_store_service.is_enabled():
+        columns = series_store_service.read_columns(cell, start, end, fields)
+        return (
+            columns['time'].astype('float64'),
+            {field: series_store_service.decode_column(columns[field], OBSERVATION_FIELDS[field]) for field in fields},
+        )
+
+    from ..models import WeatherObservation
+
+    rows = list(
+        WeatherObservation.objects
+        .filter(cell=cell, observed_at__gte=start, observed_at__lt=end)
+        .order_by('observed_at')
+        .values_list('observed_at', *fields)
+    )
+    times = np.array([observed_at.timestamp() for observed_at, *_ in rows], dtype='float64')
+    values = {}
+    for position, field in enumerate(fields, start=1):
+        # None becomes NaN in a float array
+        column = np.array([row[position] for row in rows], dtype='float64')
+        values[field] = column / OBSERVATION_FIELDS[field]
+    return times, values
+
+
+def _to_list(values: np.ndarray, decimals: int) -> List:
+    rounded = np.round(values, decimals).tolist()
+    if decimals:
+        return [None if value != value else value for value in rounded]  # NaN != NaN
+    return [None if value != value else int(value) for value in rounded]
+
+
+def _downsample(times: np.ndarray, values: Dict[str, np.ndarray], method: str,
+                start_ts: int, end_ts: int, resolution: int, points: int) -> Dict[str, Dict]:
+    series = {}
+    edges = np.arange(start_ts, end_ts + resolution, resolution, dtype='float64')
+    for field, column in values.items():
+        decimals = 1 if OBSERVATION_FIELDS[field] > 1 else 0
+        present = ~np.isnan(column)
+        x, y = times[present], column[present]
+        if method == 'minmax':
+            envelope = minmax_envelope(x, y, edges)
+            filled = envelope['count'] > 0
+            series[field] = {
+                'time': edges[:-1][filled].astype(np.int64).tolist(),
+                'min': _to_list(envelope['min'][filled], decimals),
+                'max': _to_list(envelope['max'][filled], decimals),
+                'mean': _to_list(envelope['mean'][filled], 1),
+            }
+        else:
+            keep = lttb(x, y, points)
+            series[field] = {
+                'time': x[keep].astype(np.int64).tolist(),
+                'value': _to_list(y[keep], decimals),
+            }
+    return series
+
+
+def get_downsampled_history(cell: str, start: datetime, end: datetime,
+                            fields: Optional[Iterable[str]] = None,
+                            points: int = DEFAULT_POINTS, method: str = 'lttb') -> Dict:
+    """
+    History of a cell downsampled to at most `points` points per field, cached per tier
+
+    Args:
+        cell: Weather cell
+        start: Range start (aware datetime)
+        end: Range end (aware datetime)
+        fields: Subset of OBSERVATION_FIELDS (default: all)
+        points: Most points per field (capped at MAX_POINTS)
+        method: 'lttb' or 'minmax'
+
+    Returns:
+        dict: {'start', 'end', 'resolution', 'method', 'observations',
+        'series': {field: {'time', 'value'} or {'time', 'min', 'max', 'mean'}}}
+        with times in epoch seconds
+
+    Raises:
+        ValueError: Unknown field or method
+    """
+    fields = list(fields or OBSERVATION_FIELDS)
+    unknown = [field for field in fields if field not in OBSERVATION_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown observation fields: {', '.join(unknown)}")
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method}; use one of: {', '.join(METHODS)}")
+    points = min(max(int(points), 3), MAX_POINTS)
+
+    start_ts, end_ts, resolution = align_range(start, end, points)
+    key = f"weather:history:{cell}:{method}:{resolution}:{start_ts}:{end_ts}:{points}:{','.join(fields)}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    times, values = load_series(cell, start_ts, end_ts, fields)
+    result = {
+        'start': start_ts,
+        'end': end_ts,
+        'resolution': resolution,
+        'method': method,
+        'observations': len(times),
+        'series': _downsample(times, values, method, start_ts, end_ts, resolution, points),
+    }
+    # A range reaching now gains observations; keep it only for one tier step
+    ttl = HISTORY_CACHE_TTL if end_ts <= time.time() else min(resolution, MAX_LIVE_CACHE_TTL)
+    cache.set(key, result, ttl)
+    return result
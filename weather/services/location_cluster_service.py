@@ -0,0 +1,155 @@
+"""
+Location Cluster Service
+Maintains a grid cluster pyramid of user locations for the admin map so
+zoomed-out views are served as a bounded number of aggregates
+
+Cells follow the Web Mercator tile grid: at zoom z there are
+2 ** (z + CLUSTER_GRID_SHIFT) cells per axis, i.e. 8x8 cells per map tile.
+"""
+
+import logging
+import math
+from collections import defaultdict
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLUSTER_GRID_SHIFT = 3
+# Web Mercator cannot represent the poles
+MAX_LATITUDE = 85.05112878
+
+
+def max_cluster_zoom() -> int:
+    return getattr(settings, 'MAP_MAX_CLUSTER_ZOOM', 12)
+
+
+def _grid_size(zoom: int) -> int:
+    return 2 ** (zoom + CLUSTER_GRID_SHIFT)
+
+
+def cell_for(lat: float, lon: float, zoom: int) -> Tuple[int, int]:
+    """Grid cell (x, y) containing a point at a zoom level"""
+    n = _grid_size(zoom)
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def _pyramid(lat: float, lon: float) -> List[Tuple[int, int, int]]:
+    return [(zoom, *cell_for(lat, lon, zoom)) for zoom in range(max_cluster_zoom() + 1)]
+
+
+def _cells_q(cells) -> Q:
+    query = Q()
+    for zoom, x, y in cells:
+        query |= Q(zoom=zoom, cell_x=x, cell_y=y)
+    return query
+
+
+def record_move(old: Optional[Tuple[float, float]], new: Optional[Tuple[float, float]]):
+    """
+    Move one user between cells at every zoom level
+
+    Three queries regardless of the number of levels: decrement the old
+    cells, create missing new cells, increment the new cells.
+
+    Args:
+        old: Previous (lat, lon), or None for a new location
+        new: Current (lat, lon), or None when the location is removed
+    """
+    from ..models import LocationClusterCell
+
+    now = timezone.now()
+    if old:
+        old_lat, old_lon = map(float, old)
+        LocationClusterCell.objects.filter(_cells_q(_pyramid(old_lat, old_lon))).update(
+            count=F('count') - 1,
+            lat_sum=F('lat_sum') - old_lat,
+            lon_sum=F('lon_sum') - old_lon,
+            updated_at=now
+        )
+    if new:
+        new_lat, new_lon = map(float, new)
+        cells = _pyramid(new_lat, new_lon)
+        LocationClusterCell.objects.bulk_create(
+            [LocationClusterCell(zoom=zoom, cell_x=x, cell_y=y) for zoom, x, y in cells],
+            ignore_conflicts=True
+        )
+        LocationClusterCell.objects.filter(_cells_q(cells)).update(
+            count=F('count') + 1,
+            lat_sum=F('lat_sum') + new_lat,
+            lon_sum=F('lon_sum') + new_lon,
+            updated_at=now
+        )
+
+
+def rebuild_clusters() -> int:
+    """
+    Recompute the whole pyramid from UserLocation
+
+    Returns:
+        int: Number of cells written
+    """
+    from django.db import transaction
+    from ..models import LocationClusterCell, UserLocation
+
+    cells: Dict[Tuple[int, int, int], List[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+    points = UserLocation.objects.filter(user__is_superuser=False).values_list('latitude', 'longitude')
+    for lat, lon in points.iterator(chunk_size=2000):
+        lat, lon = float(lat), float(lon)
+        for key in _pyramid(lat, lon):
+            cell = cells[key]
+            cell[0] += 1
+            cell[1] += lat
+            cell[2] += lon
+
+    with transaction.atomic():
+        LocationClusterCell.objects.all().delete()
+        LocationClusterCell.objects.bulk_create([
+            LocationClusterCell(zoom=zoom, cell_x=x, cell_y=y, count=count, lat_sum=lat_sum, lon_sum=lon_sum)
+            for (zoom, x, y), (count, lat_sum, lon_sum) in cells.items()
+        ], batch_size=1000)
+    return len(cells)
+
+
+def cells_in_bbox(zoom: int, bbox: Optional[Tuple[float, float, float, float]] = None):
+    """
+    Non-empty cells at a zoom level, optionally within a west,south,east,north box
+    """
+    from ..models import LocationClusterCell
+
+    cells = LocationClusterCell.objects.filter(zoom=zoom, count__gt=0)
+    if bbox:
+        west, south, east, north = bbox
+        # Screen y grows southwards
+        x_west, y_north = cell_for(north, west, zoom)
+        x_east, y_south = cell_for(south, east, zoom)
+        cells = cells.filter(cell_y__gte=y_north, cell_y__lte=y_south)
+        if west <= east:
+            cells = cells.filter(cell_x__gte=x_west, cell_x__lte=x_east)
+        else:
+            cells = cells.filter(Q(cell_x__gte=x_west) | Q(cell_x__lte=x_east))
+    return cells
+
+
+def get_clusters(zoom: int, bbox: Optional[Tuple[float, float, float, float]] = None) -> List[dict]:
+    """
+    Cluster aggregates for a map view
+
+    Returns:
+        list: {'latitude', 'longitude', 'count'} with the centroid of each cell
+    """
+    zoom = max(0, min(zoom, max_cluster_zoom()))
+    return [
+        {
+            'latitude': round(lat_sum / count, 6),
+            'longitude': round(lon_sum / count, 6),
+            'count': count,
+        }
+        for count, lat_sum, lon_sum in cells_in_bbox(zoom, bbox).values_list('count', 'lat_sum', 'lon_sum')
+    ]
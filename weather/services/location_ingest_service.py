@@ -0,0 +1,222 @@
+"""
+Location Ingest Service
+Debounces user location updates and applies them in bulk upserts
+
+An update is dropped when the user moved less than LOCATION_MIN_MOVE_METERS
+since the last accepted position and that position is younger than
+LOCATION_MIN_INTERVAL_SECONDS. Accepted updates are buffered per process
+(latest position per user wins) and written with one
+bulk_create(update_conflicts=True) once the buffer is LOCATION_FLUSH_BATCH_SIZE
+entries, by a timer LOCATION_FLUSH_INTERVAL_SECONDS after the first buffered
+update, and at process exit. A failed write puts the batch back in the buffer
+(behind any newer update of the same user) and is retried by the timer.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from typing import Dict, Optional, Tuple
+
+from ..utils.geohash import encode, haversine_km
+
+logger = logging.getLogger(__name__)
+
+# Location names are shared between users within one ~1.2 x 0.6 km geohash cell
+LOCATION_NAME_PRECISION = 6
+LOCATION_NAME_CACHE_TTL = 7 * 24 * 3600
+
+_buffer: Dict[int, Tuple[float, float, str]] = {}
+_buffer_lock = threading.Lock()
+_buffer_started: Optional[float] = None
+_flush_timer: Optional[threading.Timer] = None
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def _last_key(user_id: int) -> str:
+    return f'location:last:{user_id}'
+
+
+def _name_key(lat: float, lon: float) -> str:
+    return f'location:name:{encode(lat, lon, LOCATION_NAME_PRECISION)}'
+
+
+def resolve_location_name(lat: float, lon: float, location_name: Optional[str]) -> str:
+    """
+    Reuse a reverse-geocoded name for nearby positions
+
+    A name sent by the client is cached for its geohash cell; an empty one
+    is filled from that cache.
+    """
+    location_name = (location_name or '').strip()
+    if location_name:
+        cache.set(_name_key(lat, lon), location_name, LOCATION_NAME_CACHE_TTL)
+        return location_name
+    return cache.get(_name_key(lat, lon)) or ''
+
+
+def _last_position(user_id: int):
+    """(lat, lon, accepted_at) of the user's last accepted update, or None"""
+    last = cache.get(_last_key(user_id))
+    if last is None:
+        from ..models import UserLocation
+
+        row = UserLocation.objects.filter(user_id=user_id).values_list('latitude', 'longitude', 'updated_at').first()
+        if row:
+            last = (float(row[0]), float(row[1]), row[2].timestamp())
+            cache.set(_last_key(user_id), last, _setting('LOCATION_MIN_INTERVAL_SECONDS', 300))
+    return last
+
+
+def submit_location(user, lat: float, lon: float, location_name: Optional[str] = None) -> bool:
+    """
+    Queue a location update unless it is within the movement threshold
+
+    Returns:
+        bool: True if the update was accepted
+    """
+    lat, lon = float(lat), float(lon)
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError('latitude/longitude out of range')
+
+    now = time.time()
+    min_interval = _setting('LOCATION_MIN_INTERVAL_SECONDS', 300)
+    last = _last_position(user.pk)
+    if last:
+        moved_m = haversine_km(last[0], last[1], lat, lon) * 1000
+        if moved_m < _setting('LOCATION_MIN_MOVE_METERS', 100) and now - last[2] < min_interval:
+            if _flush_due(now):
+                flush()
+            return False
+
+    cache.set(_last_key(user.pk), (lat, lon, now), min_interval)
+    location_name = resolve_location_name(lat, lon, location_name)
+
+    global _buffer_started
+    with _buffer_lock:
+        _buffer[user.pk] = (lat, lon, location_name)
+        if _buffer_started is None:
+            _buffer_started = now
+        _schedule_flush()
+    if _flush_due(now):
+        flush()
+    return True
+
+
+def _flush_due(now: float) -> bool:
+    """Whether the buffer is full or has waited LOCATION_FLUSH_INTERVAL_SECONDS"""
+    with _buffer_lock:
+        return bool(_buffer) and (
+            len(_buffer) >= _setting('LOCATION_FLUSH_BATCH_SIZE', 200)
+            or now - _buffer_started >= _setting('LOCATION_FLUSH_INTERVAL_SECONDS', 5)
+        )
+
+
+def _schedule_flush():
+    """Start the flush timer if none is pending (call with _buffer_lock held)"""
+    global _flush_timer
+    if _flush_timer is None:
+        _flush_timer = threading.Timer(_setting('LOCATION_FLUSH_INTERVAL_SECONDS', 5), _timed_flush)
+        _flush_timer.daemon = True
+        _flush_timer.start()
+
+
+def _timed_flush():
+    global _flush_timer
+    with _buffer_lock:
+        _flush_timer = None
+    try:
+        flush()
+    finally:
+        close_old_connections()
+
+
+def _take_buffer() -> Dict[int, Tuple[float, float, str]]:
+    global _buffer_started
+    with _buffer_lock:
+        pending = dict(_buffer)
+        _buffer.clear()
+        _buffer_started = None
+    return pending
+
+
+def _requeue(pending: Dict[int, Tuple[float, float, str]]):
+    """Put a failed batch back; updates buffered since then are newer and win"""
+    global _buffer_started
+    with _buffer_lock:
+        for user_id, position in pending.items():
+            _buffer.setdefault(user_id, position)
+        if _buffer_started is None:
+            _buffer_started = time.time()
+        _schedule_flush()
+
+
+def flush() -> int:
+    """
+    Write all buffered updates in one upsert
+
+    Also moves the users in the admin map cluster pyramid and re-indexes
+    users whose location name changed, since bulk writes skip model signals.
+    If the write fails the batch is put back in the buffer for the timer to
+    retry, so callers never lose updates or fail on another user's row.
+
+    Returns:
+        int: Number of locations written (0 if the write failed)
+    """
+    from django.contrib.auth import get_user_model
+    from ..models import UserLocation
+    from .location_cluster_service import record_move
+    from .user_search_service import refresh_user
+
+    pending = _take_buffer()
+    if not pending:
+        return 0
+
+    try:
+        with transaction.atomic():
+            previous = {
+                user_id: (lat, lon, name)
+                for user_id, lat, lon, name in UserLocation.objects.filter(user_id__in=pending)
+                .values_list('user_id', 'latitude', 'longitude', 'location_name')
+            }
+            UserLocation.objects.bulk_create(
+                [
+                    UserLocation(user_id=user_id, latitude=round(lat, 6), longitude=round(lon, 6),
+                                 location_name=name, geohash=encode(lat, lon))
+                    for user_id, (lat, lon, name) in pending.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=['latitude', 'longitude', 'location_name', 'geohash', 'updated_at']
+            )
+
+            admins = set(get_user_model().objects.filter(pk__in=pending, is_superuser=True).values_list('pk', flat=True))
+            renamed = []
+            for user_id, (lat, lon, name) in pending.items():
+                old = previous.get(user_id)
+                if user_id not in admins:
+                    record_move(old[:2] if old else None, (lat, lon))
+                if not old or (old[2] or '') != name:
+                    renamed.append(user_id)
+
+            for user in get_user_model().objects.filter(pk__in=renamed):
+                refresh_user(user)
+    except Exception:
+        logger.exception(f"Failed to write {len(pending)} buffered location update(s); will retry")
+        _requeue(pending)
+        return 0
+    return len(pending)
+
+
+def _flush_at_exit():
+    if _buffer:
+        flush()
+
+
+atexit.register(_flush_at_exit)
@@ -0,0 +1,257 @@
+"""
+Log Archive Service
+Moves old ActivityLog/SystemLog rows into monthly gzipped NDJSON files
+and reads them back for admin queries over archived ranges
+"""
+
+import gzip
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+from typing import Dict, Any, List, Optional
+
+from ..utils.pagination import KeysetPage, decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Columns written to the archive for each log type
+ARCHIVE_FIELDS = {
+    'activity': ['id', 'timestamp', 'user_id', 'activity_type', 'description',
+                 'ip_address', 'user_agent', 'metadata', 'weight'],
+    'system': ['id', 'timestamp', 'user_id', 'level', 'module', 'message', 'extra_data'],
+}
+
+
+def _log_model(log_type: str):
+    from ..models import ActivityLog, SystemLog
+    return ActivityLog if log_type == 'activity' else SystemLog
+
+
+def get_archive_dir() -> Path:
+    return Path(getattr(settings, 'LOG_ARCHIVE_DIR', Path(settings.BASE_DIR) / 'log_archive'))
+
+
+def _serialize(row: Dict[str, Any]) -> str:
+    row = dict(row)
+    row['timestamp'] = row['timestamp'].isoformat()
+    return json.dumps(row, separators=(',', ':'))
+
+
+def archive_logs(log_type: str, cutoff: datetime, chunk_size: int = 5000, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Move rows older than cutoff out of the hot table, oldest first, in chunks
+
+    Each chunk is split by month and written to its own
+    <log_type>/<YYYY-MM>/<log_type>-<first_id>-<last_id>.ndjson.gz file.
+    Rows are deleted only after the file has been written and recorded in
+    the LogArchive manifest. Rollups are left untouched, so stats for
+    archived ranges stay available.
+
+    Args:
+        log_type: 'activity' or 'system'
+        cutoff: Archive rows with timestamp < cutoff
+        chunk_size: Rows fetched and deleted per transaction
+        dry_run: Only count what would be archived
+
+    Returns:
+        dict: {'rows': archived row count, 'files': files written}
+    """
+    from ..models import LogArchive
+
+    model = _log_model(log_type)
+    fields = ARCHIVE_FIELDS[log_type]
+    old_rows = model.objects.filter(timestamp__lt=cutoff)
+
+    if dry_run:
+        return {'rows': old_rows.count(), 'files': 0}
+
+    archive_dir = get_archive_dir()
+    totals = {'rows': 0, 'files': 0}
+
+    while True:
+        chunk = list(old_rows.order_by('timestamp', 'id').values(*fields)[:chunk_size])
+        if not chunk:
+            break
+
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for row in chunk:
+            by_month.setdefault(row['timestamp'].strftime('%Y-%m'), []).append(row)
+
+        for month, rows in by_month.items():
+            first, last = rows[0], rows[-1]
+            relative_path = Path(log_type) / month / f"{log_type}-{first['id']}-{last['id']}.ndjson.gz"
+            file_path = archive_dir / relative_path
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+
+            with gzip.open(file_path, 'wt', encoding='utf-8') as fh:
+                for row in rows:
+                    fh.write(_serialize(row) + '\n')
+
+            try:
+                with transaction.atomic():
+                    LogArchive.objects.create(
+                        log_type=log_type,
+                        month=first['timestamp'].date().replace(day=1),
+                        first_timestamp=first['timestamp'],
+                        last_timestamp=last['timestamp'],
+                        first_id=first['id'],
+                        last_id=last['id'],
+                        row_count=len(rows),
+                        path=str(relative_path)
+                    )
+                    model.objects.filter(id__in=[row['id'] for row in rows]).delete()
+            except Exception:
+                file_path.unlink(missing_ok=True)
+                raise
+
+            totals['rows'] += len(rows)
+            totals['files'] += 1
+            logger.info(f"Archived {len(rows)} {log_type} log rows to {relative_path}")
+
+    return totals
+
+
+def read_archive_file(archive) -> List[Dict[str, Any]]:
+    """Load the rows of one LogArchive file, oldest first"""
+    rows = []
+    with gzip.open(get_archive_dir() / archive.path, 'rt', encoding='utf-8') as fh:
+        for line in fh:
+            row = json.loads(line)
+            row['timestamp'] = parse_datetime(row['timestamp'])
+            rows.append(row)
+    return rows
+
+
+def _matches(row: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    return all(row.get(key) == value for key, value in filters.items())
+
+
+def iter_archived_rows(log_type: str, start: datetime, end: datetime, filters: Optional[Dict[str, Any]] = None,
+                       newest_first: bool = True):
+    """
+    Yield archived rows within [start, end] in (timestamp, id) order
+
+    Only the files whose manifest range overlaps the request are opened.
+
+    Args:
+        log_type: 'activity' or 'system'
+        start: Range start
+        end: Range end
+        filters: Exact-match column filters, e.g. {'activity_type': 'login'}
+        newest_first: Iteration direction
+    """
+    from ..models import LogArchive
+
+    filters = filters or {}
+    archives = LogArchive.objects.filter(
+        log_type=log_type,
+        first_timestamp__lte=end,
+        last_timestamp__gte=start
+    ).order_by(*(('-last_timestamp', '-last_id') if newest_first else ('first_timestamp', 'first_id')))
+
+    for archive in archives:
+        rows = read_archive_file(archive)
+        if newest_first:
+            rows.reverse()
+        for row in rows:
+            if start <= row['timestamp'] <= end and _matches(row, filters):
+                yield row
+
+
+def _to_instance(log_type: str, row: Dict[str, Any], users: Dict[int, Any]):
+    """Rebuild an unsaved model instance so templates can render archived rows"""
+    model = _log_model(log_type)
+    instance = model(**{key: value for key, value in row.items() if key != 'user_id'})
+    user = users.get(row.get('user_id'))
+    if user is not None:
+        instance.user = user  # Users deleted since archiving render as blank
+    return instance
+
+
+class ArchiveAwarePaginator:
+    """
+    Keyset paginator over the hot log table plus archived files
+
+    Pages are built by merging per_page + 1 candidates from each source on
+    the (timestamp, id) key, so cursors work across the hot/archive
+    boundary and use the same after/before scheme as KeysetPaginator.
+    """
+
+    def __init__(self, queryset, per_page: int, log_type: str, start: datetime, end: datetime,
+                 filters: Optional[Dict[str, Any]] = None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.log_type = log_type
+        self.start = start
+        self.end = end
+        self.filters = filters or {}
+
+    def _archived(self, position, newer: bool) -> List[Dict[str, Any]]:
+        # Narrow the range to the cursor so files on the wrong side are never opened
+        start, end = self.start, self.end
+        if position and newer:
+            start = max(start, position[0])
+        elif position:
+            end = min(end, position[0])
+
+        rows = []
+        for row in iter_archived_rows(self.log_type, start, end, self.filters, newest_first=not newer):
+            key = (row['timestamp'], row['id'])
+            if position and ((key <= position) if newer else (key >= position)):
+                continue
+            rows.append(row)
+            if len(rows) > self.per_page:
+                break
+        return rows
+
+    def _hot(self, position, newer: bool) -> List[Dict[str, Any]]:
+        from django.db.models import Q
+
+        queryset = self.queryset
+        if position:
+            value, pk = position
+            op = 'gt' if newer else 'lt'
+            queryset = queryset.filter(Q(**{f'timestamp__{op}': value}) | Q(timestamp=value, **{f'pk__{op}': pk}))
+        ordering = ('timestamp', 'pk') if newer else ('-timestamp', '-pk')
+        return list(queryset.order_by(*ordering)[:self.per_page + 1])
+
+    def _position(self, cursor):
+        decoded = decode_cursor(cursor) if cursor else None
+        if not decoded:
+            return None
+        timestamp = parse_datetime(decoded[0]) if isinstance(decoded[0], str) else None
+        return (timestamp, decoded[1]) if timestamp else None
+
+    def get_page(self, after: str = None, before: str = None) -> KeysetPage:
+        after_pos = self._position(after)
+        before_pos = self._position(before) if not after_pos else None
+        newer = before_pos is not None
+        position = before_pos or after_pos
+
+        hot = [(obj.timestamp, obj.pk, obj) for obj in self._hot(position, newer)]
+        archived = self._archived(position, newer)
+
+        # Resolve users for archived rows in one query
+        User = get_user_model()
+        user_ids = {row['user_id'] for row in archived if row.get('user_id')}
+        users = User.objects.in_bulk(user_ids) if user_ids else {}
+        cold = [(row['timestamp'], row['id'], _to_instance(self.log_type, row, users)) for row in archived]
+
+        merged = sorted(hot + cold, key=lambda item: (item[0], item[1]), reverse=not newer)
+        has_more = len(merged) > self.per_page
+        items = [item[2] for item in merged[:self.per_page]]
+        if newer:
+            items.reverse()
+
+        return KeysetPage(
+            items,
+            has_next=(True if newer else has_more) and bool(items),
+            has_previous=(has_more if newer else after_pos is not None) and bool(items),
+            next_cursor=encode_cursor(items[-1].timestamp, items[-1].pk) if items else None,
+            previous_cursor=encode_cursor(items[0].timestamp, items[0].pk) if items else None,
+        )
@@ -0,0 +1,257 @@
+"""
+Log Export Service
+Streams activity logs, system logs, admin chat history and user weather
+alerts as CSV or NDJSON (optionally gzipped) in constant memory
+"""
+
+import csv
+import heapq
+import json
+import logging
+import zlib
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from itertools import islice
+from django.apps import apps
+from django.utils import timezone
+from typing import Any, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per database round trip while streaming
+EXPORT_CHUNK_SIZE = 2000
+
+# model, timestamp field, exportable columns (first ones are the defaults),
+# and the admin_logs filters: 'activity' -> type column, 'user' -> user column
+EXPORT_SOURCES = {
+    'activity': {
+        'model': 'ActivityLog',
+        'timestamp': 'timestamp',
+        'columns': ['id', 'timestamp', 'user__email', 'activity_type', 'description', 'ip_address',
+                    'user_agent', 'metadata', 'weight', 'user_id'],
+        'default_columns': 6,
+        'activity': 'activity_type',
+        'user': 'user_id',
+    },
+    'system': {
+        'model': 'SystemLog',
+        'timestamp': 'timestamp',
+        'columns': ['id', 'timestamp', 'level', 'module', 'message', 'user__email', 'extra_data', 'user_id'],
+        'default_columns': 6,
+        'activity': 'level',
+        'user': 'user_id',
+    },
+    'chat': {
+        'model': 'AdminChatHistory',
+        'timestamp': 'timestamp',
+        'columns': ['id', 'timestamp', 'admin_user__email', 'session_id', 'message', 'response',
+                    'user_mentioned', 'weather_data', 'admin_user_id'],
+        'default_columns': 7,
+        'activity': None,
+        'user': 'admin_user_id',
+    },
+    'alerts': {
+        'model': 'UserWeatherAlert',
+        'timestamp': 'sent_at',
+        'columns': ['id', 'sent_at', 'recipient__email', 'sent_by__email', 'alert_type', 'title', 'message',
+                    'temperature', 'weather_condition', 'location', 'latitude', 'longitude', 'is_read',
+                    'read_at', 'recipient_id', 'sent_by_id'],
+        'default_columns': 14,
+        'activity': 'alert_type',
+        'user': 'recipient_id',
+    },
+}
+
+# Sources whose old rows are moved to the log archive files
+ARCHIVED_SOURCES = ('activity', 'system')
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def get_columns(source: str, requested: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Validate a requested column list against the source
+
+    Returns:
+        list: Requested columns in the given order, or the default columns
+
+    Raises:
+        ValueError: Unknown source or column
+    """
+    if source not in EXPORT_SOURCES:
+        raise ValueError(f"Unknown export type: {source}")
+    config = EXPORT_SOURCES[source]
+    requested = [column.strip() for column in (requested or []) if column.strip()]
+    if not requested:
+        return config['columns'][:config['default_columns']]
+    unknown = [column for column in requested if column not in config['columns']]
+    if unknown:
+        raise ValueError(f"Unknown column(s) for {source}: {', '.join(unknown)}")
+    return requested
+
+
+def filter_logs(source: str, activity: str = 'all', user: str = 'all',
+                start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """
+    Queryset for a log source with the admin_logs filters applied
+
+    Args:
+        source: Key of EXPORT_SOURCES
+        activity: Activity type, log level or alert type ('all' for no filter)
+        user: User id ('all' for no filter)
+        start: Only rows at or after this time
+        end: Only rows at or before this time
+    """
+    config = EXPORT_SOURCES[source]
+    rows = apps.get_model('weather', config['model']).objects.all()
+    timestamp = config['timestamp']
+
+    if start:
+        rows = rows.filter(**{f'{timestamp}__gte': start})
+    if end:
+        rows = rows.filter(**{f'{timestamp}__lte': end})
+    if activity and activity != 'all' and config['activity']:
+        rows = rows.filter(**{config['activity']: activity})
+    if user and str(user).isdigit():
+        rows = rows.filter(**{config['user']: int(user)})
+    return rows
+
+
+def iter_rows(queryset, columns: List[str], order_field: str = 'timestamp',
+              chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[tuple]:
+    """Yield tuples of only the requested columns, newest first, chunk by chunk"""
+    return queryset.order_by(f'-{order_field}', '-id').values_list(*columns).iterator(chunk_size=chunk_size)
+
+
+def _archived_rows(source: str, select: List[str], activity: str = 'all', user: str = 'all',
+                   start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[tuple]:
+    """Yield archived rows as tuples of the select columns, newest first, resolving emails chunk by chunk"""
+    from django.contrib.auth import get_user_model
+    from .log_archive_service import iter_archived_rows
+
+    config = EXPORT_SOURCES[source]
+    filters = {}
+    if activity and activity != 'all':
+        filters[config['activity']] = activity
+    if user and str(user).isdigit():
+        filters[config['user']] = int(user)
+
+    rows = iter_archived_rows(source, start or datetime.min.replace(tzinfo=dt_timezone.utc),
+                              end or timezone.now(), filters)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        emails = {}
+        if 'user__email' in select:
+            user_ids = {row['user_id'] for row in chunk if row.get('user_id')}
+            emails = dict(get_user_model().objects.filter(id__in=user_ids).values_list('id', 'email'))
+        for row in chunk:
+            row['user__email'] = emails.get(row.get('user_id'))
+            yield tuple(row.get(column) for column in select)
+
+
+def iter_rows_with_archive(source: str, columns: List[str], chunk_size: int = EXPORT_CHUNK_SIZE,
+                           **filters) -> Iterator[tuple]:
+    """
+    Like iter_rows over filter_logs(), plus the rows moved to the log archive
+
+    Both sides are already newest first, so they are merged on
+    (timestamp, id) without buffering either one.
+    """
+    if source not in ARCHIVED_SOURCES:
+        raise ValueError(f"Archived export is only available for: {', '.join(ARCHIVED_SOURCES)}")
+    timestamp = EXPORT_SOURCES[source]['timestamp']
+    select = columns + [column for column in (timestamp, 'id') if column not in columns]
+    key_index = (select.index(timestamp), select.index('id'))
+
+    hot = iter_rows(filter_logs(source, **filters), select, timestamp, chunk_size)
+    cold = _archived_rows(source, select, chunk_size=chunk_size, **filters)
+    merged = heapq.merge(hot, cold, key=lambda row: (row[key_index[0]], row[key_index[1]]), reverse=True)
+    width = len(columns)
+    return (row[:width] for row in merged)
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def _json_value(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _csv_value(value: Any):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(',', ':'))
+    return _json_value(value)
+
+
+def iter_csv(rows: Iterable[tuple], columns: List[str]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def iter_ndjson(rows: Iterable[tuple], columns: List[str]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps({column: _json_value(value) for column, value in zip(columns, row)},
+                         separators=(',', ':')) + '\n'
+
+
+def iter_gzip(chunks: Iterable[str], flush_bytes: int = 64 * 1024) -> Iterator[bytes]:
+    """Gzip a stream of text chunks, emitting compressed blocks of about flush_bytes input"""
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    pending = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        pending += len(data)
+        out = compressor.compress(data)
+        if pending >= flush_bytes:
+            out += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def export_stream(source: str, export_format: str = 'csv', columns: Optional[Iterable[str]] = None,
+                  compress: bool = False, archived: bool = False, **filters) -> Iterator:
+    """
+    Build the export stream for a source
+
+    Args:
+        source: 'activity', 'system', 'chat' or 'alerts'
+        export_format: 'csv' or 'ndjson'
+        columns: Column names (default: the source's default columns)
+        compress: Gzip the output (yields bytes instead of str)
+        archived: Include rows moved to the log archive (activity and system only)
+        **filters: Passed to filter_logs (activity, user, start, end)
+
+    Raises:
+        ValueError: Unknown source, format or column, or archived for a source without archives
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    columns = get_columns(source, columns)
+    if archived:
+        rows = iter_rows_with_archive(source, columns, **filters)
+    else:
+        rows = iter_rows(filter_logs(source, **filters), columns, EXPORT_SOURCES[source]['timestamp'])
+    stream = iter_csv(rows, columns) if export_format == 'csv' else iter_ndjson(rows, columns)
+    return iter_gzip(stream) if compress else stream
+
+
+def export_filename(source: str, export_format: str, compress: bool, now: datetime) -> str:
+    return f"{source}-export-{now:%Y%m%d-%H%M%S}.{export_format}{'.gz' if compress else ''}"
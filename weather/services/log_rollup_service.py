@@ -0,0 +1,222 @@
+"""
+Log Rollup Service
+Maintains and reads hourly/daily rollups of ActivityLog and SystemLog
+so the admin logs stats panel never scans raw log rows
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def hour_bucket(ts: datetime) -> datetime:
+    """Floor a timestamp to the start of its UTC hour"""
+    return ts.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def day_bucket(ts: datetime) -> datetime:
+    """Floor a timestamp to the start of its UTC day"""
+    return hour_bucket(ts).replace(hour=0)
+
+
+def _increment(model, lookup: Dict[str, Any], amount):
+    """Atomically add amount to a rollup row, creating it if needed"""
+    updated = model.objects.filter(**lookup).update(event_count=F('event_count') + amount)
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(event_count=amount, **lookup)
+    except IntegrityError:
+        # Another worker created the bucket first
+        model.objects.filter(**lookup).update(event_count=F('event_count') + amount)
+
+
+def record_activity(log):
+    """Add one ActivityLog row to its hourly and daily rollup buckets"""
+    from ..models import ActivityRollup
+
+    for granularity, bucket in (('hour', hour_bucket(log.timestamp)), ('day', day_bucket(log.timestamp))):
+        _increment(ActivityRollup, {
+            'granularity': granularity,
+            'bucket_start': bucket,
+            'activity_type': log.activity_type,
+            'user_id': log.user_id,
+        }, log.weight)
+
+
+def record_system_log(log):
+    """Add one SystemLog row to its hourly and daily rollup buckets"""
+    from ..models import SystemLogRollup
+
+    for granularity, bucket in (('hour', hour_bucket(log.timestamp)), ('day', day_bucket(log.timestamp))):
+        _increment(SystemLogRollup, {
+            'granularity': granularity,
+            'bucket_start': bucket,
+            'level': log.level,
+        }, 1)
+
+
+def _bucket_filter(start: datetime, end: datetime) -> Q:
+    """
+    Build a filter selecting the fewest buckets that cover [start, end]
+
+    Whole days in the middle of the range come from daily buckets, the
+    partial days at either end from hourly buckets (hour precision).
+    """
+    first_hour = hour_bucket(start)
+    first_midnight = day_bucket(start)
+    if first_midnight < first_hour:
+        first_midnight += timedelta(days=1)
+    last_midnight = day_bucket(end)
+
+    if first_midnight >= last_midnight:
+        return Q(granularity='hour', bucket_start__gte=first_hour, bucket_start__lte=end)
+
+    return (
+        Q(granularity='hour', bucket_start__gte=first_hour, bucket_start__lt=first_midnight) |
+        Q(granularity='day', bucket_start__gte=first_midnight, bucket_start__lt=last_midnight) |
+        Q(granularity='hour', bucket_start__gte=last_midnight, bucket_start__lte=end)
+    )
+
+
+def get_activity_stats(start: datetime, end: datetime, activity_type: Optional[str] = None,
+                       user_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Get activity totals, unique users and per-type breakdown from rollups
+
+    Args:
+        start: Range start
+        end: Range end
+        activity_type: Optional activity type filter
+        user_id: Optional user filter
+
+    Returns:
+        dict: {'total', 'unique_users', 'breakdown'}
+    """
+    from ..models import ActivityRollup
+
+    rollups = ActivityRollup.objects.filter(_bucket_filter(start, end))
+    if activity_type:
+        rollups = rollups.filter(activity_type=activity_type)
+    if user_id:
+        rollups = rollups.filter(user_id=user_id)
+
+    breakdown = [
+        {'activity_type': row['activity_type'], 'count': round(row['count'])}
+        for row in rollups.values('activity_type').annotate(count=Sum('event_count')).order_by('-count')
+    ]
+
+    return {
+        'total': sum(row['count'] for row in breakdown),
+        'unique_users': rollups.values('user').distinct().count(),
+        'breakdown': breakdown,
+    }
+
+
+def get_system_log_stats(start: datetime, end: datetime, level: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get system log totals and per-level breakdown from rollups
+
+    Returns:
+        dict: {'total', 'errors', 'warnings', 'breakdown'}
+    """
+    from ..models import SystemLogRollup
+
+    rollups = SystemLogRollup.objects.filter(_bucket_filter(start, end))
+    if level:
+        rollups = rollups.filter(level=level)
+
+    breakdown = list(rollups.values('level').annotate(count=Sum('event_count')).order_by('-count'))
+    counts = {row['level']: row['count'] for row in breakdown}
+
+    return {
+        'total': sum(counts.values()),
+        'errors': counts.get('error', 0),
+        'warnings': counts.get('warning', 0),
+        'breakdown': breakdown,
+    }
+
+
+def archived_until(log_type: str) -> Optional[datetime]:
+    """
+    Start of the first day whose raw rows of log_type are all still in the
+    database: rows up to the last LogArchive entry were moved to archive
+    files, so rollups before this can't be rebuilt (None if nothing is archived)
+    """
+    from ..models import LogArchive
+
+    last = LogArchive.objects.filter(log_type=log_type).aggregate(last=Max('last_timestamp'))['last']
+    return day_bucket(last) + timedelta(days=1) if last else None
+
+
+def rebuild_rollups(start: datetime, end: datetime) -> Dict[str, Any]:
+    """
+    Recompute rollups for [start, end) from raw log rows
+
+    Used to backfill history and to repair buckets after a failed write.
+    The range is widened to whole days so daily and hourly buckets agree,
+    and clipped per log type to days after its archived rows (see
+    archived_until), whose rollups are the only record left of them.
+
+    Returns:
+        dict: Number of rollup rows written per table ('activity', 'system'),
+        and 'clipped': {log_type: first day rebuilt} for clipped ranges
+    """
+    from ..models import ActivityLog, ActivityRollup, SystemLog, SystemLogRollup
+
+    start = day_bucket(start)
+    end = day_bucket(end - timedelta(microseconds=1)) + timedelta(days=1)
+    written = {'activity': 0, 'system': 0, 'clipped': {}}
+
+    ranges = {}
+    for log_type in ('activity', 'system'):
+        boundary = archived_until(log_type)
+        if boundary and boundary > start:
+            written['clipped'][log_type] = boundary
+            logger.warning(f"Not rebuilding {log_type} rollups before {boundary:%Y-%m-%d}: raw rows are archived")
+        ranges[log_type] = (max(start, boundary) if boundary else start, end)
+
+    with transaction.atomic():
+        activity_start, activity_end = ranges['activity']
+        system_start, system_end = ranges['system']
+        ActivityRollup.objects.filter(bucket_start__gte=activity_start, bucket_start__lt=activity_end).delete()
+        SystemLogRollup.objects.filter(bucket_start__gte=system_start, bucket_start__lt=system_end).delete()
+
+        activity_logs = ActivityLog.objects.filter(timestamp__gte=activity_start, timestamp__lt=activity_end).order_by()
+        system_logs = SystemLog.objects.filter(timestamp__gte=system_start, timestamp__lt=system_end).order_by()
+
+        for granularity, trunc in (('hour', TruncHour), ('day', TruncDay)):
+            rows = activity_logs.annotate(
+                bucket=trunc('timestamp', tzinfo=dt_timezone.utc)
+            ).values('bucket', 'activity_type', 'user_id').annotate(total=Sum('weight'))
+            created = ActivityRollup.objects.bulk_create([
+                ActivityRollup(
+                    granularity=granularity,
+                    bucket_start=row['bucket'],
+                    activity_type=row['activity_type'],
+                    user_id=row['user_id'],
+                    event_count=row['total']
+                ) for row in rows
+            ], batch_size=1000)
+            written['activity'] += len(created)
+
+            rows = system_logs.annotate(
+                bucket=trunc('timestamp', tzinfo=dt_timezone.utc)
+            ).values('bucket', 'level').annotate(total=Count('id'))
+            created = SystemLogRollup.objects.bulk_create([
+                SystemLogRollup(
+                    granularity=granularity,
+                    bucket_start=row['bucket'],
+                    level=row['level'],
+                    event_count=row['total']
+                ) for row in rows
+            ], batch_size=1000)
+            written['system'] += len(created)
+
+    return written
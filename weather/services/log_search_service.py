@@ -0,0 +1,283 @@
+"""
+Log Search Service
+Ranked full-text search over activity logs, system logs and admin chat history
+
+PostgreSQL matches against GIN expression indexes on to_tsvector(...),
+SQLite against FTS5 shadow tables kept in sync by triggers (both created
+by migration 0014), so the indexes are maintained on every write without
+application code. Other backends fall back to an icontains scan.
+"""
+
+import logging
+import re
+from datetime import datetime
+from django.db import connection
+from django.utils.dateparse import parse_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.pagination import KeysetPage, decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Searchable sources: table, text columns, FTS5 table and allowed column filters
+SEARCH_SOURCES = {
+    'activity': {
+        'model': 'ActivityLog',
+        'table': 'activity_logs',
+        'columns': ['description'],
+        'fts_table': 'activity_logs_fts',
+        'filters': {'type': 'activity_type', 'user': 'user_id'},
+    },
+    'system': {
+        'model': 'SystemLog',
+        'table': 'system_logs',
+        'columns': ['message'],
+        'fts_table': 'system_logs_fts',
+        'filters': {'type': 'level', 'user': 'user_id'},
+    },
+    'chat': {
+        'model': 'AdminChatHistory',
+        'table': 'admin_chat_history',
+        'columns': ['message', 'response'],
+        'fts_table': 'admin_chat_history_fts',
+        'filters': {'user': 'admin_user_id'},
+    },
+}
+
+SORT_RELEVANCE = 'relevance'
+SORT_RECENT = 'recent'
+
+
+def tsvector_sql(columns: List[str], alias: str = '') -> str:
+    """
+    The to_tsvector expression indexed on PostgreSQL
+
+    Queries must use exactly this expression for the planner to pick the index.
+    """
+    prefix = f'{alias}.' if alias else ''
+    text = " || ' ' || ".join(f"coalesce({prefix}{column}, '')" for column in columns)
+    return f"to_tsvector('english', {text})"
+
+
+def _model(source: str):
+    from django.apps import apps
+    return apps.get_model('weather', SEARCH_SOURCES[source]['model'])
+
+
+def _fts_match(query: str) -> str:
+    # Quoted terms ANDed; the last one as a prefix so partial words match while typing
+    tokens = [token for token in re.split(r'[^\w]+', query.lower()) if token]
+    terms = ['"{}"'.format(token.replace('"', '""')) for token in tokens]
+    if terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _where(source: str, filters: Dict[str, Any], start: Optional[datetime], end: Optional[datetime]):
+    """Shared date and column filters as (sql, params) on alias t"""
+    clauses, params = [], []
+    if start:
+        clauses.append('t.timestamp >= %s')
+        params.append(connection.ops.adapt_datetimefield_value(start))
+    if end:
+        clauses.append('t.timestamp <= %s')
+        params.append(connection.ops.adapt_datetimefield_value(end))
+    allowed = SEARCH_SOURCES[source]['filters']
+    for name, value in filters.items():
+        if name in allowed and value not in (None, ''):
+            clauses.append(f't.{allowed[name]} = %s')
+            params.append(value)
+    return ''.join(f' AND {clause}' for clause in clauses), params
+
+
+def _checked_position(sort: str, cursor: str):
+    """
+    Decoded cursor position, checked against the sort it must come from
+
+    Raises:
+        ValueError: Malformed cursor, or one from the other sort order
+    """
+    position = decode_cursor(cursor)
+    if position is not None:
+        value = position[0]
+        if sort == SORT_RECENT:
+            valid = isinstance(value, str) and parse_datetime(value) is not None
+        else:
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+        if valid:
+            return position
+    raise ValueError(f"Invalid cursor for sort '{sort}'; start again without a cursor")
+
+
+def _position_sql(sort: str, score_sql: str, position) -> Tuple[str, list]:
+    """Keyset condition for rows after the cursor position"""
+    if not position:
+        return '', []
+    value, pk = position
+    if sort == SORT_RECENT:
+        value = connection.ops.adapt_datetimefield_value(parse_datetime(value))
+        return ' AND (t.timestamp < %s OR (t.timestamp = %s AND t.id < %s))', [value, value, pk]
+    return f' AND ({score_sql} < %s OR ({score_sql} = %s AND t.id < %s))', [value, value, pk]
+
+
+def _order_sql(sort: str) -> str:
+    return 't.timestamp DESC, t.id DESC' if sort == SORT_RECENT else 'score DESC, t.id DESC'
+
+
+def _search_postgresql(source, query, where, where_params, sort, position, limit):
+    config = SEARCH_SOURCES[source]
+    score_sql = f"ts_rank({tsvector_sql(config['columns'], 't')}, q.query)"
+    after_sql, after_params = _position_sql(sort, score_sql, position)
+    sql = f"""
+        SELECT t.id, {score_sql} AS score
+        FROM {config['table']} t, websearch_to_tsquery('english', %s) q(query)
+        WHERE {tsvector_sql(config['columns'], 't')} @@ q.query{where}{after_sql}
+        ORDER BY {_order_sql(sort)}
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [query] + where_params + after_params + [limit])
+        return cursor.fetchall()
+
+
+def _search_sqlite(source, query, where, where_params, sort, position, limit):
+    config = SEARCH_SOURCES[source]
+    match = _fts_match(query)
+    if not match:
+        return []
+    fts = config['fts_table']
+    # bm25 is lower-is-better; negate it so both backends sort score DESC
+    score_sql = f'(-bm25({fts}))'
+    after_sql, after_params = _position_sql(sort, score_sql, position)
+    sql = f"""
+        SELECT t.id, {score_sql} AS score
+        FROM {fts} f
+        JOIN {config['table']} t ON t.id = f.rowid
+        WHERE {fts} MATCH %s{where}{after_sql}
+        ORDER BY {_order_sql(sort)}
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match] + where_params + after_params + [limit])
+        return cursor.fetchall()
+
+
+def _search_fallback(source, query, start, end, filters, position, limit):
+    from django.db.models import Q
+
+    config = SEARCH_SOURCES[source]
+    rows = _model(source).objects.all()
+    if start:
+        rows = rows.filter(timestamp__gte=start)
+    if end:
+        rows = rows.filter(timestamp__lte=end)
+    for name, value in filters.items():
+        if name in config['filters'] and value not in (None, ''):
+            rows = rows.filter(**{config['filters'][name]: value})
+    for token in query.split():
+        token_filter = Q()
+        for column in config['columns']:
+            token_filter |= Q(**{f'{column}__icontains': token})
+        rows = rows.filter(token_filter)
+    # No ranking without an index: newest first with the id as the cursor key
+    if position:
+        rows = rows.filter(id__lt=position[1])
+    return [(pk, 0.0) for pk in rows.order_by('-id').values_list('id', flat=True)[:limit]]
+
+
+def search_logs(source: str, query: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                filters: Optional[Dict[str, Any]] = None, sort: str = SORT_RELEVANCE,
+                cursor: Optional[str] = None, limit: int = 20) -> KeysetPage:
+    """
+    Full-text search one log source
+
+    Args:
+        source: 'activity', 'system' or 'chat'
+        query: Search text (web-search syntax on PostgreSQL, terms on SQLite)
+        start: Only rows at or after this time
+        end: Only rows at or before this time
+        filters: {'type': activity type or level, 'user': user id}
+        sort: 'relevance' (rank, then newest) or 'recent'
+        cursor: next_cursor from a previous page
+        limit: Page size
+
+    Returns:
+        KeysetPage of model instances, each with a search_rank attribute
+
+    Raises:
+        ValueError: Unknown source or sort, or a cursor not from this sort
+    """
+    if source not in SEARCH_SOURCES:
+        raise ValueError(f"Unknown search source: {source}")
+    if sort not in (SORT_RELEVANCE, SORT_RECENT):
+        raise ValueError(f"Unknown sort: {sort}")
+
+    query = ' '.join((query or '').split())
+    if not query:
+        return KeysetPage([], has_next=False, has_previous=False)
+
+    position = _checked_position(sort, cursor) if cursor else None
+    filters = filters or {}
+
+    search = {
+        'postgresql': _search_postgresql,
+        'sqlite': _search_sqlite,
+    }.get(connection.vendor)
+    if search:
+        where, where_params = _where(source, filters, start, end)
+        rows = search(source, query, where, where_params, sort, position, limit + 1)
+    else:
+        rows = _search_fallback(source, query, start, end, filters, position, limit + 1)
+
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    objects = _model(source).objects.select_related(
+        'admin_user' if source == 'chat' else 'user'
+    ).in_bulk([pk for pk, _ in rows])
+
+    items = []
+    for pk, score in rows:
+        obj = objects.get(pk)
+        if obj is None:
+            continue  # Deleted or archived since the search ran
+        obj.search_rank = score
+        items.append(obj)
+
+    next_cursor = None
+    if has_next and rows:
+        last_pk, last_score = rows[-1]
+        if sort == SORT_RECENT and items:
+            next_cursor = encode_cursor(items[-1].timestamp, items[-1].pk)
+        elif sort == SORT_RELEVANCE:
+            next_cursor = encode_cursor(last_score, last_pk)
+
+    return KeysetPage(
+        items,
+        has_next=next_cursor is not None,
+        has_previous=position is not None,
+        next_cursor=next_cursor,
+    )
+
+
+def matching_ids_sql(source: str, query: str):
+    """
+    SQL and params selecting the ids of every row matching query
+
+    For id__in filters (e.g. Django admin search) that should keep using
+    the full-text index instead of icontains.
+
+    Returns:
+        tuple: (sql, params) or None on backends without an index
+    """
+    config = SEARCH_SOURCES[source]
+    if connection.vendor == 'postgresql':
+        return (
+            f"SELECT id FROM {config['table']} "
+            f"WHERE {tsvector_sql(config['columns'])} @@ websearch_to_tsquery('english', %s)",
+            [query]
+        )
+    if connection.vendor == 'sqlite':
+        match = _fts_match(query)
+        if match:
+            return f"SELECT rowid FROM {config['fts_table']} WHERE {config['fts_table']} MATCH %s", [match]
+    return None
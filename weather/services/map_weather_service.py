@@ -0,0 +1,91 @@
+"""
+Map Weather Service
+Current weather for many admin-map users at once, deduplicated by weather cell
+
+Users are grouped by the weather cell of their stored geohash, each cell is
+read from the shared weather cache, and at most MAP_WEATHER_MAX_FETCHES
+missing cells are fetched upstream per call. 2,000 users in one city cost
+one upstream call; spread over a country, a few dozen.
+"""
+
+import logging
+from django.conf import settings
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .weather_cache_service import cell_for, cell_precision, get_for_cells
+
+logger = logging.getLogger(__name__)
+
+# Column order of each row in the 'cells' array
+MAP_WEATHER_FIELDS = [
+    'cell', 'latitude', 'longitude', 'temperature', 'feels_like', 'humidity',
+    'wind_speed', 'pressure', 'condition', 'condition_main', 'icon', 'location', 'fetched_at', 'stale',
+]
+
+
+def _cell_row(cell: str, data: Dict) -> list:
+    current = data.get('current', {})
+    coordinates = data.get('location', {}).get('coordinates', {})
+    return [
+        cell,
+        coordinates.get('lat'),
+        coordinates.get('lon'),
+        current.get('temperature'),
+        current.get('feels_like'),
+        current.get('humidity'),
+        current.get('wind_speed'),
+        current.get('pressure'),
+        current.get('condition'),
+        current.get('condition_main'),
+        current.get('icon'),
+        data.get('location', {}).get('name'),
+        int(data.get('fetched_at', 0)),
+        bool(data.get('stale')),
+    ]
+
+
+def weather_for_locations(rows: Iterable[Tuple[int, float, float, str]],
+                          max_fetches: Optional[int] = None) -> Dict:
+    """
+    Weather for a set of user positions as a compact array payload
+
+    Args:
+        rows: (user_id, latitude, longitude, geohash) tuples
+        max_fetches: Upstream fetch budget (default: MAP_WEATHER_MAX_FETCHES)
+
+    Returns:
+        dict: {
+            'fields': MAP_WEATHER_FIELDS,
+            'cells': one row per cell with weather,
+            'users': [[user_id, index into cells], ...],
+            'pending': user ids whose cell is not cached yet
+        }
+    """
+    precision = cell_precision()
+    user_cells: List[Tuple[int, str]] = []
+    for user_id, lat, lon, geohash in rows:
+        cell = geohash[:precision] if geohash and len(geohash) >= precision else cell_for(lat, lon)
+        user_cells.append((user_id, cell))
+
+    if max_fetches is None:
+        max_fetches = getattr(settings, 'MAP_WEATHER_MAX_FETCHES', 48)
+
+    # Most populated cells first, so a capped fetch covers the most users
+    counts: Dict[str, int] = {}
+    for _, cell in user_cells:
+        counts[cell] = counts.get(cell, 0) + 1
+    ordered = sorted(counts, key=counts.get, reverse=True)
+    weather = get_for_cells('current', ordered, max_fetches=max_fetches)
+
+    cells, index = [], {}
+    for cell in ordered:
+        if cell in weather:
+            index[cell] = len(cells)
+            cells.append(_cell_row(cell, weather[cell]))
+
+    return {
+        'fields': MAP_WEATHER_FIELDS,
+        'cells': cells,
+        'users': [[user_id, index[cell]] for user_id, cell in user_cells if cell in index],
+        'pending': [user_id for user_id, cell in user_cells if cell not in index],
+    }
@@ -0,0 +1,153 @@
+"""
+Weather Observation Service
+Persistent time series of the current-weather readings fetched upstream
+
+Every current-weather fetch of a cell (weather_cache_service.fetch_cells)
+is written here in one bulk insert per batch, keyed by (cell, observation
+time), so history and trends come from the database instead of extra
+upstream calls. OpenWeatherMap updates a station roughly every 10 minutes;
+refetching the same observation is a no-op thanks to the unique key.
+
+Values are stored as scaled small integers: field * scale, so a scale of
+10 keeps one decimal. With WEATHER_SERIES_STORE = 'columnar' they are also
+appended to per-cell column files that history reads come from
+(series_store_service). Each batch also updates the cells' running
+statistics (climatology_service).
+"""
+
+import logging
+from datetime import datetime, timezone as dt_timezone
+from django.db import DatabaseError
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Stored field -> scale applied before rounding to an integer
+OBSERVATION_FIELDS = {
+    'temperature': 10,      # °C
+    'feels_like': 10,       # °C
+    'humidity': 1,          # %
+    'pressure': 1,          # hPa
+    'wind_speed': 10,       # m/s
+    'wind_direction': 1,    # degrees
+    'cloud_cover': 1,       # %
+    'visibility': 0.1,      # m
+    'precipitation': 10,    # mm in the last hour
+    'condition_code': 1,    # OpenWeatherMap condition id
+}
+
+SMALLINT_MIN, SMALLINT_MAX = -32768, 32767
+INSERT_BATCH_SIZE = 500
+
+
+def _encode(value, scale) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return max(SMALLINT_MIN, min(SMALLINT_MAX, int(round(float(value) * scale))))
+    except (TypeError, ValueError):
+        return None
+
+
+def _decode(value: Optional[int], scale) -> Optional[float]:
+    if value is None:
+        return None
+    return round(value / scale, 1) if scale > 1 else int(round(value / scale))
+
+
+def build_observation(cell: str, data: Dict):
+    """
+    Unsaved WeatherObservation from formatted current weather, or None
+
+    Args:
+        cell: Weather cell the data was fetched for
+        data: WeatherAPIService.get_current_weather() data (with 'measurements')
+    """
+    from ..models import WeatherObservation
+
+    measurements = data.get('measurements') or {}
+    if not measurements.get('dt'):
+        return None
+    return WeatherObservation(
+        cell=cell,
+        observed_at=datetime.fromtimestamp(measurements['dt'], tz=dt_timezone.utc),
+        **{field: _encode(measurements.get(field), scale) for field, scale in OBSERVATION_FIELDS.items()}
+    )
+
+
+def record_observations(readings: Dict[str, Dict]) -> int:
+    """
+    Store current-weather readings in one bulk insert
+
+    Already stored (cell, observed_at) pairs are skipped. Database errors
+    are logged, never raised: history must not break weather fetches.
+
+    Args:
+        readings: {cell: current weather data}
+
+    Returns:
+        int: Number of observations handed to the database
+    """
+    from ..models import WeatherObservation
+
+    observations = [obs for obs in (build_observation(cell, data) for cell, data in readings.items()) if obs]
+    if not observations:
+        return 0
+    try:
+        WeatherObservation.objects.bulk_create(observations, batch_size=INSERT_BATCH_SIZE, ignore_conflicts=True)
+    except DatabaseError as e:
+        logger.error(f"Storing {len(observations)} weather observations failed: {e}")
+        return 0
+
+    from . import climatology_service, series_store_service
+
+    if series_store_service.is_enabled():
+        series_store_service.append_observations(observations)
+    try:
+        climatology_service.update_stats(observations)
+    except DatabaseError as e:
+        logger.error(f"Updating weather statistics failed: {e}")
+    return len(observations)
+
+
+def get_history(cell: str, start: datetime, end: datetime,
+                fields: Optional[Iterable[str]] = None) -> Dict[str, List]:
+    """
+    Observations of a cell in [start, end), oldest first, as columns
+
+    Args:
+        cell: Weather cell
+        start: Range start (aware datetime)
+        end: Range end (aware datetime)
+        fields: Subset of OBSERVATION_FIELDS (default: all)
+
+    Returns:
+        dict: {'time': [epoch seconds], field: [values]}; missing values are None
+
+    Raises:
+        ValueError: Unknown field
+    """
+    from ..models import WeatherObservation
+
+    fields = list(fields or OBSERVATION_FIELDS)
+    unknown = [field for field in fields if field not in OBSERVATION_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown observation fields: {', '.join(unknown)}")
+
+    from . import series_store_service
+
+    if series_store_service.is_enabled():
+        return series_store_service.read_history(cell, start, end, fields)
+
+    rows = (
+        WeatherObservation.objects
+        .filter(cell=cell, observed_at__gte=start, observed_at__lt=end)
+        .order_by('observed_at')
+        .values_list('observed_at', *fields)
+    )
+    columns = {'time': [], **{field: [] for field in fields}}
+    for observed_at, *values in rows.iterator(chunk_size=2000):
+        columns['time'].append(int(observed_at.timestamp()))
+        for field, value in zip(fields, values):
+            columns[field].append(_decode(value, OBSERVATION_FIELDS[field]))
+    return columns
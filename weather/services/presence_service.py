@@ -0,0 +1,97 @@
+"""
+User Presence Service
+Maintains UserPresence rows and answers "who is active" with indexed lookups
+"""
+
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _touch_interval() -> timedelta:
+    return timedelta(minutes=getattr(settings, 'PRESENCE_TOUCH_INTERVAL_MINUTES', 5))
+
+
+def _upsert(user, **fields):
+    from ..models import UserPresence
+
+    if not UserPresence.objects.filter(user=user).update(**fields):
+        UserPresence.objects.update_or_create(user=user, defaults=fields)
+
+
+def mark_login(user):
+    """Record a login: the user is online from now"""
+    now = timezone.now()
+    _upsert(user, state='online', last_login_at=now, last_seen_at=now)
+    cache.set(f'presence:touch:{user.pk}', True, int(_touch_interval().total_seconds()))
+
+    from .dashboard_service import invalidate_dashboard_stats
+    invalidate_dashboard_stats()
+
+
+def mark_logout(user):
+    """Record a logout: the user is offline from now"""
+    now = timezone.now()
+    _upsert(user, state='offline', last_logout_at=now, last_seen_at=now)
+    cache.delete(f'presence:touch:{user.pk}')
+
+    from .dashboard_service import invalidate_dashboard_stats
+    invalidate_dashboard_stats()
+
+
+def touch(user) -> bool:
+    """
+    Record that an authenticated user was seen, at most once per interval
+
+    Called on every request by UserPresenceMiddleware; the cache key makes
+    all but one call per PRESENCE_TOUCH_INTERVAL_MINUTES a no-op.
+
+    Returns:
+        bool: True if the presence row was written
+    """
+    interval = _touch_interval()
+    if not cache.add(f'presence:touch:{user.pk}', True, int(interval.total_seconds())):
+        return False
+
+    from ..models import UserProfile
+
+    now = timezone.now()
+    _upsert(user, state='online', last_seen_at=now)
+    # Same throttle as UserProfile.update_last_active, without loading the profile
+    UserProfile.objects.filter(user=user, last_active__lt=now - interval).update(last_active=now)
+    return True
+
+
+def _non_admin_presence():
+    from ..models import UserPresence
+    return UserPresence.objects.filter(user__is_superuser=False)
+
+
+def count_active_users(since: Optional[timedelta] = None) -> int:
+    """Count non-admin users who are online and were seen within `since` (default 24 hours)"""
+    cutoff = timezone.now() - (since or timedelta(days=1))
+    return _non_admin_presence().filter(state='online', last_seen_at__gte=cutoff).count()
+
+
+def get_online_users(within: Optional[timedelta] = None, limit: int = 50):
+    """
+    List users seen within `within` (default: the touch interval), most recent first
+
+    Returns:
+        QuerySet of UserPresence with the user preloaded
+    """
+    cutoff = timezone.now() - (within or _touch_interval())
+    return _non_admin_presence().filter(
+        state='online', last_seen_at__gte=cutoff
+    ).select_related('user').order_by('-last_seen_at')[:limit]
+
+
+def get_inactive_users(days: int = 30):
+    """Users not seen for `days` days"""
+    cutoff = timezone.now() - timedelta(days=days)
+    return _non_admin_presence().filter(last_seen_at__lt=cutoff).select_related('user')
@@ -0,0 +1,260 @@
+"""
+Upstream Rate Limit Service
+Token buckets per upstream and endpoint class, kept in the Django cache
+
+Buckets live in the shared cache (the database cache by default), so
+every worker draws from the same ones; a per-process cache would multiply
+the limit by the number of processes and fails check weather.W001.
+
+Each bucket (UPSTREAM_RATE_LIMITS) refills at per_minute tokens a minute
+up to burst. A call that finds the bucket empty either waits for a token
+up to its deadline or fails fast with RateLimitExceeded, which callers
+treat like any other upstream failure: stale cache or fallback responses.
+An upstream 429 empties the bucket for the Retry-After period.
+
+limited_request also goes through the upstream's circuit breaker
+(circuit_breaker_service).
+"""
+
+import logging
+import time
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from typing import Dict, Optional
+
+from ..utils.deadline import MIN_CALL_SECONDS, Deadline
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE_LIMITS = {
+    'openweather': {'per_minute': 60, 'burst': 20, 'max_wait': 2.0},
+    'openweather_geo': {'per_minute': 60, 'burst': 10, 'max_wait': 2.0},
+    'groq': {'per_minute': 30, 'burst': 5, 'max_wait': 5.0},
+}
+
+# Bucket state is updated under a short cache lock (cache.add is atomic on every backend).
+# A busy lock counts as no token: the caller retries until its wait runs out
+LOCK_SECONDS = 2
+LOCK_ATTEMPTS = 50
+LOCK_RETRY_SECONDS = 0.002
+LOCK_BUSY_RETRY_SECONDS = 0.05
+
+# Per-minute counters are kept for this long
+METRIC_TTL = 180
+METRICS = ('allowed', 'rejected', 'waited_ms', 'throttled')
+
+
+class UpstreamUnavailable(requests.exceptions.RequestException):
+    """An upstream call was not made (rate limited or circuit open)"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitExceeded(UpstreamUnavailable):
+    """No token was available for an upstream call before its deadline"""
+
+    def __init__(self, bucket: str, retry_after: float):
+        super().__init__(f"Rate limit for {bucket} reached, retry in {retry_after:.1f}s", retry_after)
+        self.bucket = bucket
+
+
+def get_limits() -> Dict[str, Dict]:
+    limits = {name: dict(config) for name, config in DEFAULT_RATE_LIMITS.items()}
+    for name, config in getattr(settings, 'UPSTREAM_RATE_LIMITS', {}).items():
+        limits.setdefault(name, {}).update(config)
+    return limits
+
+
+def _state_key(bucket: str) -> str:
+    return f'ratelimit:{bucket}:state'
+
+
+def _metric_key(bucket: str, metric: str, minute: int) -> str:
+    return f'ratelimit:{bucket}:{metric}:{minute}'
+
+
+def _count(bucket: str, metric: str, amount: int = 1):
+    key = _metric_key(bucket, metric, int(time.time() // 60))
+    if not cache.add(key, amount, METRIC_TTL):
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            cache.set(key, amount, METRIC_TTL)
+
+
+def _refill(state, config, now):
+    tokens, updated, blocked_until = state
+    rate = config['per_minute'] / 60.0
+    if now < blocked_until:
+        return 0.0, now, blocked_until
+    tokens = min(float(config['burst']), tokens + (now - max(updated, blocked_until)) * rate)
+    return tokens, now, blocked_until
+
+
+def _take(bucket: str, config: Dict, tokens: float):
+    """
+    Try to take tokens once
+
+    Returns:
+        float: 0 if taken, else seconds until enough tokens should be
+        available (LOCK_BUSY_RETRY_SECONDS when the bucket's lock is busy)
+    """
+    lock_key = f'ratelimit:{bucket}:lock'
+    for _ in range(LOCK_ATTEMPTS):
+        if cache.add(lock_key, 1, LOCK_SECONDS):
+            break
+        time.sleep(LOCK_RETRY_SECONDS)
+    else:
+        # Contention means a burst: never let a call through without a token
+        return LOCK_BUSY_RETRY_SECONDS
+
+    try:
+        now = time.time()
+        state = cache.get(_state_key(bucket)) or (float(config['burst']), now, 0.0)
+        available, updated, blocked_until = _refill(state, config, now)
+        if available >= tokens:
+            cache.set(_state_key(bucket), (available - tokens, updated, blocked_until), None)
+            return 0.0
+        cache.set(_state_key(bucket), (available, updated, blocked_until), None)
+        rate = config['per_minute'] / 60.0
+        return max(blocked_until - now, 0.0) + (tokens - available) / rate
+    finally:
+        cache.delete(lock_key)
+
+
+def available_tokens(bucket: str) -> Optional[float]:
+    """Tokens a bucket holds now, without taking any (None for an unlimited bucket)"""
+    config = get_limits()[bucket]
+    if not config.get('per_minute'):
+        return None
+    state = cache.get(_state_key(bucket))
+    return _refill(state, config, time.time())[0] if state else float(config['burst'])
+
+
+def is_quota_tight(bucket: str, reserve: float) -> bool:
+    """Whether a bucket is down to `reserve` (share of its burst, 0-1) or fewer tokens"""
+    tokens = available_tokens(bucket)
+    return tokens is not None and tokens <= get_limits()[bucket]['burst'] * reserve
+
+
+def acquire(bucket: str, tokens: float = 1, wait: Optional[float] = None) -> None:
+    """
+    Take tokens from a bucket, waiting up to `wait` seconds for them
+
+    Args:
+        bucket: Key of UPSTREAM_RATE_LIMITS
+        tokens: Cost of the call
+        wait: Longest wait in seconds (default: the bucket's max_wait; 0 fails fast)
+
+    Raises:
+        RateLimitExceeded: No tokens before the deadline
+    """
+    config = get_limits()[bucket]
+    if not config.get('per_minute'):
+        return  # Unlimited
+    wait = config.get('max_wait', 0) if wait is None else max(wait, 0)
+    started = time.monotonic()
+    deadline = started + wait
+
+    while True:
+        retry_after = _take(bucket, config, tokens)
+        if retry_after <= 0:
+            _count(bucket, 'allowed')
+            waited_ms = int((time.monotonic() - started) * 1000)
+            if waited_ms:
+                _count(bucket, 'waited_ms', waited_ms)
+            return
+        remaining = deadline - time.monotonic()
+        if retry_after > remaining:
+            _count(bucket, 'rejected')
+            raise RateLimitExceeded(bucket, retry_after)
+        time.sleep(retry_after)
+
+
+def note_throttled(bucket: str, retry_after: Optional[float] = None):
+    """Empty a bucket after an upstream 429 so no worker calls before Retry-After"""
+    config = get_limits()[bucket]
+    pause = retry_after if retry_after is not None else 60.0 / max(config.get('per_minute') or 60, 1)
+    now = time.time()
+    cache.set(_state_key(bucket), (0.0, now, now + pause), None)
+    _count(bucket, 'throttled')
+    logger.warning(f"Upstream {bucket} returned 429; pausing calls for {pause:.0f}s")
+
+
+def limited_request(bucket: str, method: str, url: str, wait: Optional[float] = None,
+                    deadline: Optional[Deadline] = None, **kwargs) -> requests.Response:
+    """
+    requests.request behind the upstream's circuit breaker and a rate limit bucket
+
+    With a deadline, queueing for a token and the call's timeout are both
+    capped by the request's remaining budget.
+
+    Raises:
+        CircuitOpen: The upstream's breaker is open
+        RateLimitExceeded: No token before the deadline
+        DeadlineExceeded: The request's budget is used up
+        requests.exceptions.RequestException: As requests does
+    """
+    from .circuit_breaker_service import BREAKER_FOR_BUCKET, before_call, record, release_trial
+
+    breaker = BREAKER_FOR_BUCKET.get(bucket, bucket)
+    if deadline:
+        deadline.timeout()  # Don't take a breaker trial or a token for a call that can't be made
+    trial = before_call(breaker)
+    try:
+        if deadline:
+            if wait is None:
+                wait = get_limits()[bucket].get('max_wait', 0)
+            wait = min(wait, max(deadline.remaining() - MIN_CALL_SECONDS, 0.0))
+        acquire(bucket, wait=wait)
+        if deadline:
+            requested_timeout = kwargs.get('timeout')
+            kwargs['timeout'] = deadline.timeout(requested_timeout)
+    except requests.exceptions.RequestException:
+        release_trial(breaker, trial)  # Let another worker make the trial call
+        raise
+
+    started = time.monotonic()
+    try:
+        response = requests.request(method, url, **kwargs)
+    except requests.exceptions.Timeout:
+        # A timeout cut short by the request's deadline says nothing about upstream health
+        if not (deadline and requested_timeout and kwargs['timeout'] < requested_timeout):
+            record(breaker, False, time.monotonic() - started, trial)
+        else:
+            release_trial(breaker, trial)
+        raise
+    except requests.exceptions.RequestException:
+        record(breaker, False, time.monotonic() - started, trial)
+        raise
+    # 4xx (bad city, bad key, 429) says nothing about upstream health
+    record(breaker, response.status_code < 500, time.monotonic() - started, trial)
+    if response.status_code == 429:
+        retry_after = response.headers.get('Retry-After', '')
+        note_throttled(bucket, float(retry_after) if retry_after.isdigit() else None)
+    return response
+
+
+def get_rate_limit_stats() -> Dict[str, Dict]:
+    """Current tokens and this/last minute's counters per bucket"""
+    minute = int(time.time() // 60)
+    stats = {}
+    for bucket, config in get_limits().items():
+        keys = {
+            (metric, when): _metric_key(bucket, metric, minute - offset)
+            for metric in METRICS for when, offset in (('this_minute', 0), ('last_minute', 1))
+        }
+        counters = cache.get_many(list(keys.values()))
+        tokens = available_tokens(bucket)
+        if tokens is None:
+            tokens = config.get('burst')
+        stats[bucket] = {
+            'per_minute': config.get('per_minute'),
+            'burst': config.get('burst'),
+            'tokens': round(tokens, 2) if tokens is not None else None,
+            **{f'{metric}_{when}': counters.get(key, 0) for (metric, when), key in keys.items()},
+        }
+    return stats
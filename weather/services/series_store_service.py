@@ -0,0 +1,221 @@
+"""
+Weather Series Store Service
+Optional columnar store of each weather cell's observation history
+
+With WEATHER_SERIES_STORE = 'columnar' every observation
+written to the database is also appended to fixed-width column files under
+WEATHER_SERIES_DIR/<cell[:2]>/<cell>/:
+
+    time.u4     observation time, uint32 epoch seconds, ascending
+    <field>.i2  scaled int16 value (observation_service.OBSERVATION_FIELDS),
+                MISSING for no value
+
+Reads memory-map the files and binary-search the time column, so a range
+is a zero-copy slice of every column however long the history is. The
+database stays the source of truth; `manage.py rebuild_weather_series`
+rebuilds the files from it.
+
+Appends to a cell happen under its weather cache fetch lock, so one
+process writes a cell at a time. The time column is written last and
+defines the row count; column tails left by an interrupted append are
+cut off by the next one.
+"""
+
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from django.conf import settings
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TIME_COLUMN = 'time'
+TIME_DTYPE = '<u4'
+VALUE_DTYPE = '<i2'
+MISSING = -32768
+
+
+def is_enabled() -> bool:
+    """Whether observations are kept in column files"""
+    return getattr(settings, 'WEATHER_SERIES_STORE', 'database') == 'columnar'
+
+
+def get_series_dir() -> Path:
+    return Path(getattr(settings, 'WEATHER_SERIES_DIR', Path(settings.BASE_DIR) / 'weather_series'))
+
+
+def _cell_dir(cell: str) -> Path:
+    return get_series_dir() / cell[:2] / cell
+
+
+def _column_path(cell: str, column: str) -> Path:
+    suffix = 'u4' if column == TIME_COLUMN else 'i2'
+    return _cell_dir(cell) / f'{column}.{suffix}'
+
+
+def _row_count(cell: str) -> int:
+    path = _column_path(cell, TIME_COLUMN)
+    return path.stat().st_size // np.dtype(TIME_DTYPE).itemsize if path.exists() else 0
+
+
+def _last_time(cell: str, rows: int) -> int:
+    if not rows:
+        return -1
+    with open(_column_path(cell, TIME_COLUMN), 'rb') as f:
+        f.seek((rows - 1) * np.dtype(TIME_DTYPE).itemsize)
+        return int(np.frombuffer(f.read(np.dtype(TIME_DTYPE).itemsize), dtype=TIME_DTYPE)[0])
+
+
+def append(cell: str, rows: Iterable[Tuple[int, Dict[str, Optional[int]]]]) -> int:
+    """
+    Append observations to a cell's column files
+
+    Rows not newer than the cell's last stored time are skipped, which keeps
+    the time column sorted and makes replays harmless.
+
+    Args:
+        cell: Weather cell
+        rows: (epoch seconds, {field: scaled value or None}), any order
+
+    Returns:
+        int: Rows appended
+    """
+    from .observation_service import OBSERVATION_FIELDS
+
+    stored = _row_count(cell)
+    last = _last_time(cell, stored)
+    new_rows, seen = [], set()
+    for timestamp, values in sorted(rows, key=lambda row: row[0]):
+        if timestamp > last and timestamp not in seen:
+            seen.add(timestamp)
+            new_rows.append((timestamp, values))
+    if not new_rows:
+        return 0
+
+    _cell_dir(cell).mkdir(parents=True, exist_ok=True)
+    item = np.dtype(VALUE_DTYPE).itemsize
+    for field in OBSERVATION_FIELDS:
+        path = _column_path(cell, field)
+        column = np.fromiter(
+            (MISSING if values.get(field) is None else values[field] for _, values in new_rows),
+            dtype=VALUE_DTYPE, count=len(new_rows),
+        )
+        with open(path, 'ab') as f:
+            present, partial = divmod(f.tell(), item)
+            if present > stored or partial:  # Tail of an interrupted append, maybe half a value
+                present = min(present, stored)
+                f.truncate(present * item)
+            if present < stored:  # Field added after the cell's files were created
+                f.write(np.full(stored - present, MISSING, dtype=VALUE_DTYPE).tobytes())
+            f.write(column.tobytes())
+    with open(_column_path(cell, TIME_COLUMN), 'ab') as f:
+        f.write(np.array([timestamp for timestamp, _ in new_rows], dtype=TIME_DTYPE).tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    return len(new_rows)
+
+
+def append_observations(observations: Iterable) -> int:
+    """Append unsaved or saved WeatherObservation instances, grouped by cell"""
+    from .observation_service import OBSERVATION_FIELDS
+
+    by_cell: Dict[str, List] = {}
+    for obs in observations:
+        by_cell.setdefault(obs.cell, []).append(
+            (int(obs.observed_at.timestamp()), {field: getattr(obs, field) for field in OBSERVATION_FIELDS})
+        )
+    appended = 0
+    for cell, rows in by_cell.items():
+        try:
+            appended += append(cell, rows)
+        except OSError as e:
+            logger.error(f"Appending weather series for cell {cell} failed: {e}")
+    return appended
+
+
+def read_columns(cell: str, start: datetime, end: datetime,
+                 fields: Iterable[str]) -> Dict[str, 'np.ndarray']:
+    """
+    Raw columns of a cell in [start, end) as read-only memory-mapped slices
+
+    Returns:
+        dict: {'time': uint32 array, field: int16 array (MISSING for none)}
+    """
+    rows = _row_count(cell)
+    fields = list(fields)
+    if not rows:
+        return {TIME_COLUMN: np.empty(0, dtype=TIME_DTYPE), **{field: np.empty(0, dtype=VALUE_DTYPE) for field in fields}}
+
+    times = np.memmap(_column_path(cell, TIME_COLUMN), dtype=TIME_DTYPE, mode='r', shape=(rows,))
+    lo = int(np.searchsorted(times, max(int(start.timestamp()), 0), side='left'))
+    hi = int(np.searchsorted(times, max(int(end.timestamp()), 0), side='left'))
+    columns = {TIME_COLUMN: times[lo:hi]}
+    for field in fields:
+        path = _column_path(cell, field)
+        if path.exists() and path.stat().st_size >= rows * np.dtype(VALUE_DTYPE).itemsize:
+            columns[field] = np.memmap(path, dtype=VALUE_DTYPE, mode='r', shape=(rows,))[lo:hi]
+        else:
+            columns[field] = np.full(hi - lo, MISSING, dtype=VALUE_DTYPE)
+    return columns
+
+
+def decode_column(column: 'np.ndarray', scale) -> 'np.ndarray':
+    """Scaled int16 column as float64 values, NaN for missing"""
+    values = column.astype('float64') / scale
+    values[column == MISSING] = np.nan
+    return values
+
+
+def read_history(cell: str, start: datetime, end: datetime, fields: Iterable[str]) -> Dict[str, List]:
+    """Same as observation_service.get_history, read from the column files"""
+    from .observation_service import OBSERVATION_FIELDS
+
+    fields = list(fields)
+    columns = read_columns(cell, start, end, fields)
+    history = {TIME_COLUMN: columns[TIME_COLUMN].tolist()}
+    for field in fields:
+        scale = OBSERVATION_FIELDS[field]
+        values = np.round(decode_column(columns[field], scale), 1 if scale > 1 else 0).tolist()
+        history[field] = [
+            None if value != value else (value if scale > 1 else int(value))  # NaN != NaN
+            for value in values
+        ]
+    return history
+
+
+def rebuild(cells: Optional[Iterable[str]] = None, chunk_size: int = 20000) -> Dict[str, int]:
+    """
+    Rewrite column files from the observation table
+
+    Args:
+        cells: Cells to rebuild (default: every cell with observations)
+        chunk_size: Rows read per query
+
+    Returns:
+        dict: {'cells': count, 'rows': count}
+    """
+    import shutil
+    from ..models import WeatherObservation
+    from .observation_service import OBSERVATION_FIELDS
+
+    if cells is None:
+        cells = WeatherObservation.objects.values_list('cell', flat=True).distinct()
+    written = {'cells': 0, 'rows': 0}
+    for cell in list(cells):
+        shutil.rmtree(_cell_dir(cell), ignore_errors=True)
+        rows = (
+            WeatherObservation.objects.filter(cell=cell).order_by('observed_at')
+            .values_list('observed_at', *OBSERVATION_FIELDS)
+        )
+        batch = []
+        for observed_at, *values in rows.iterator(chunk_size=chunk_size):
+            batch.append((int(observed_at.timestamp()), dict(zip(OBSERVATION_FIELDS, values))))
+            if len(batch) >= chunk_size:
+                written['rows'] += append(cell, batch)
+                batch = []
+        written['rows'] += append(cell, batch)
+        written['cells'] += 1
+    return written
@@ -0,0 +1,114 @@
+"""
+Spatial Query Service
+Bounding-box, radius and k-nearest lookups over UserLocation using the
+indexed geohash column (no PostGIS needed)
+
+Each query is turned into a handful of geohash prefix ranges, which the
+B-tree index answers as range scans; the exact geometry check runs on the
+small candidate set.
+"""
+
+import logging
+from django.db.models import Q
+from typing import List, Optional, Tuple
+
+from ..utils.geohash import covering_prefixes, haversine_km, prefix_upper_bound, radius_bbox
+
+logger = logging.getLogger(__name__)
+
+# k-nearest starts at this radius and doubles until it has k users
+KNN_START_RADIUS_KM = 5.0
+KNN_MAX_RADIUS_KM = 20038.0  # Half the Earth's circumference
+
+
+def _base_queryset(include_admins: bool = False):
+    from ..models import UserLocation
+
+    locations = UserLocation.objects.select_related('user')
+    if not include_admins:
+        locations = locations.filter(user__is_superuser=False)
+    return locations
+
+
+def _split_antimeridian(west: float, south: float, east: float, north: float):
+    if west <= east:
+        return [(west, south, east, north)]
+    return [(west, south, 180.0, north), (-180.0, south, east, north)]
+
+
+def _boxes_q(boxes) -> Q:
+    """Index-friendly geohash ranges plus the exact coordinate check for each box"""
+    query = Q()
+    for west, south, east, north in boxes:
+        cells = Q()
+        for prefix in covering_prefixes(west, south, east, north):
+            upper = prefix_upper_bound(prefix)
+            cells |= Q(geohash__gte=prefix, geohash__lt=upper) if upper else Q(geohash__gte=prefix)
+        query |= cells & Q(
+            latitude__gte=south, latitude__lte=north,
+            longitude__gte=west, longitude__lte=east
+        )
+    return query
+
+
+def bbox_q(west: float, south: float, east: float, north: float) -> Q:
+    """Filter for UserLocation rows inside a bounding box (may cross the antimeridian)"""
+    return _boxes_q(_split_antimeridian(west, south, east, north))
+
+
+def within_bbox(west: float, south: float, east: float, north: float, include_admins: bool = False):
+    """
+    User locations inside a bounding box (may cross the antimeridian)
+
+    Returns:
+        QuerySet of UserLocation with users preloaded
+    """
+    return _base_queryset(include_admins).filter(bbox_q(west, south, east, north))
+
+
+def within_radius(lat: float, lon: float, radius_km: float, include_admins: bool = False,
+                  limit: Optional[int] = None) -> List:
+    """
+    User locations within radius_km of a point, nearest first
+
+    Returns:
+        list: UserLocation objects, each with a distance_km attribute
+    """
+    candidates = _base_queryset(include_admins).filter(_boxes_q(radius_bbox(lat, lon, radius_km)))
+
+    results = []
+    for location in candidates:
+        distance = haversine_km(lat, lon, float(location.latitude), float(location.longitude))
+        if distance <= radius_km:
+            location.distance_km = round(distance, 3)
+            results.append(location)
+    results.sort(key=lambda location: location.distance_km)
+    return results[:limit] if limit else results
+
+
+def nearest(lat: float, lon: float, k: int = 10, max_radius_km: Optional[float] = None,
+            include_admins: bool = False) -> List:
+    """
+    The k user locations nearest to a point
+
+    Searches a growing radius: once a radius holds k users, nothing outside
+    it can be closer, so the result is exact.
+
+    Returns:
+        list: Up to k UserLocation objects with distance_km, nearest first
+    """
+    limit_km = min(max_radius_km or KNN_MAX_RADIUS_KM, KNN_MAX_RADIUS_KM)
+    radius = min(KNN_START_RADIUS_KM, limit_km)
+    while True:
+        results = within_radius(lat, lon, radius, include_admins=include_admins)
+        if len(results) >= k or radius >= limit_km:
+            return results[:k]
+        radius = min(radius * 2, limit_km)
+
+
+def users_near(lat: float, lon: float, radius_km: float) -> List[Tuple[int, float]]:
+    """
+    (user_id, distance_km) for non-admin users within a radius, e.g. the
+    recipients of an alert for a storm centred at (lat, lon)
+    """
+    return [(location.user_id, location.distance_km) for location in within_radius(lat, lon, radius_km)]
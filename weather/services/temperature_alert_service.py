@@ -9,6 +9,8 @@ import logging
 from django.conf import settings
 from typing import Dict, Any, Optional
 
+from .rate_limit_service import limited_request
+
 logger = logging.getLogger(__name__)
 
 class TemperatureAlertService:
@@ -90,9 +92,11 @@ class TemperatureAlertService:
                 'severity': 'comfortable'
             }
 
-    def get_ai_recommendations(self, temperature: float, location: str, weather_condition: str = None) -> Dict[str, Any]:
+    def get_ai_recommendations(self, temperature: float, location: str, weather_condition: str = None,
+                               normal: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Use AI to generate temperature-specific safety recommendations
+        normal is climatology_service.compare_to_normal() for the location, if known
         """
         category = self.get_temperature_category(temperature)
 
@@ -107,6 +111,7 @@ Location: {location}
 Temperature: {temperature}°C
 Temperature Category: {category['level']}
 Weather Condition: {weather_condition or 'Not specified'}
+Usual Temperature Here: {self._describe_normal(normal)}
 
 Please provide:
 1. A brief alert message (1-2 sentences) explaining the temperature risk
@@ -141,7 +146,8 @@ Be specific and practical. Focus on health and safety."""
                 "max_tokens": 500
             }
 
-            response = requests.post(
+            response = limited_request(
+                'groq', 'POST',
                 self.base_url,
                 headers=self.headers,
                 json=payload,
@@ -168,7 +174,8 @@ Be specific and practical. Focus on health and safety."""
                         'message': alert_data.get('alert_message', 'Temperature alert for your safety.'),
                         'recommendations': alert_data.get('recommendations', []),
                         'temperature': temperature,
-                        'location': location
+                        'location': location,
+                        'normal': normal
                     }
 
                 except json.JSONDecodeError as e:
@@ -176,17 +183,27 @@ Be specific and practical. Focus on health and safety."""
                     logger.error(f"AI Response: {ai_response}")
 
                     # Return basic alert without AI recommendations
-                    return self.get_fallback_alert(category, temperature, location)
+                    return self.get_fallback_alert(category, temperature, location, normal)
 
             else:
                 logger.error(f"AI API error: {response.status_code} - {response.text}")
-                return self.get_fallback_alert(category, temperature, location)
+                return self.get_fallback_alert(category, temperature, location, normal)
 
         except Exception as e:
             logger.error(f"Error generating AI recommendations: {str(e)}")
-            return self.get_fallback_alert(category, temperature, location)
+            return self.get_fallback_alert(category, temperature, location, normal)
+
+    def _describe_normal(self, normal: Optional[Dict[str, Any]]) -> str:
+        """Prompt text for how the temperature compares with the location's normal"""
+        if not normal:
+            return 'Not known'
+        return (
+            f"{normal['normal']}°C (observed range {normal['min']}-{normal['max']}°C); "
+            f"now {normal['difference']:+}°C, {normal['label']}"
+        )
 
-    def get_fallback_alert(self, category: Dict, temperature: float, location: str) -> Dict[str, Any]:
+    def get_fallback_alert(self, category: Dict, temperature: float, location: str,
+                           normal: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Return a basic alert when AI recommendations cannot be generated
         """
@@ -243,5 +260,6 @@ Be specific and practical. Focus on health and safety."""
             'message': fallback_messages.get(severity, 'Temperature alert for your area.'),
             'recommendations': fallback_recommendations.get(severity, []),
             'temperature': temperature,
-            'location': location
+            'location': location,
+            'normal': normal
         }
@@ -0,0 +1,195 @@
+"""
+User Search Service
+Prefix and fuzzy user lookup over the user_search_index table for the
+admin typeahead filters
+
+PostgreSQL uses a pg_trgm GIN index (ILIKE + word similarity), SQLite an
+FTS5 prefix index with a similarity pass for typos. Other backends fall
+back to a plain icontains scan.
+"""
+
+import difflib
+import logging
+import re
+from django.contrib.auth import get_user_model
+from django.db import connection
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Fuzzy matches scoring below this are dropped
+FUZZY_THRESHOLD = 0.6
+# SQLite candidates pulled from the prefix index for the similarity pass
+FUZZY_CANDIDATES = 200
+
+
+def normalize(text: str) -> str:
+    return ' '.join((text or '').lower().split())
+
+
+def build_document(user, location_name: Optional[str] = None) -> str:
+    """Build the lowercased search text for a user"""
+    return normalize(' '.join(filter(None, [
+        user.username, user.email, user.first_name, user.last_name, location_name
+    ])))
+
+
+def refresh_user(user):
+    """Create or update the search entry for one user"""
+    from ..models import UserLocation, UserSearchEntry
+
+    location_name = UserLocation.objects.filter(user_id=user.pk).values_list('location_name', flat=True).first()
+    UserSearchEntry.objects.update_or_create(
+        user_id=user.pk,
+        defaults={'document': build_document(user, location_name)}
+    )
+
+
+def rebuild_index(batch_size: int = 1000) -> int:
+    """
+    Rebuild every search entry from the user and location tables
+
+    Returns:
+        int: Number of entries written
+    """
+    from ..models import UserSearchEntry
+
+    User = get_user_model()
+    total = 0
+    batch = []
+    users = User.objects.select_related('current_location').only(
+        'id', 'username', 'email', 'first_name', 'last_name', 'current_location__location_name'
+    )
+    for user in users.iterator(chunk_size=batch_size):
+        location = getattr(user, 'current_location', None)
+        batch.append(UserSearchEntry(user_id=user.pk, document=build_document(user, location and location.location_name)))
+        if len(batch) >= batch_size:
+            total += _write_entries(batch)
+            batch = []
+    if batch:
+        total += _write_entries(batch)
+    return total
+
+
+def _write_entries(entries) -> int:
+    from ..models import UserSearchEntry
+
+    UserSearchEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['document', 'updated_at']
+    )
+    return len(entries)
+
+
+def _tokens(query: str) -> List[str]:
+    return [token for token in re.split(r'[^\w]+', normalize(query)) if token]
+
+
+def _staff_clause(include_staff: bool) -> str:
+    return '' if include_staff else 'AND NOT u.is_staff AND NOT u.is_superuser'
+
+
+def _search_postgresql(query: str, limit: int, include_staff: bool) -> List[int]:
+    user_table = get_user_model()._meta.db_table
+    text = normalize(query)
+    with connection.cursor() as cursor:
+        # ILIKE and <% (word similarity) are both served by the trigram GIN index
+        cursor.execute(
+            f"""
+            SELECT s.user_id
+            FROM user_search_index s
+            JOIN {user_table} u ON u.id = s.user_id
+            WHERE (s.document LIKE %s OR %s <%% s.document) {_staff_clause(include_staff)}
+            ORDER BY (s.document LIKE %s) DESC, word_similarity(%s, s.document) DESC, s.user_id
+            LIMIT %s
+            """,
+            [f'%{text}%', text, f'{text}%', text, limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fts_match(tokens: List[str]) -> str:
+    # Every token as a quoted prefix term, ANDed
+    return ' '.join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+
+
+def _search_sqlite(query: str, limit: int, include_staff: bool) -> List[int]:
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+
+    user_table = get_user_model()._meta.db_table
+    sql = f"""
+        SELECT f.rowid, f.document
+        FROM user_search_fts f
+        JOIN {user_table} u ON u.id = f.rowid
+        WHERE user_search_fts MATCH %s {_staff_clause(include_staff)}
+        ORDER BY rank
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [_fts_match(tokens), limit])
+        ids = [row[0] for row in cursor.fetchall()]
+        if len(ids) >= limit:
+            return ids
+
+        # Typo tolerance: score documents sharing the first two letters of a token
+        cursor.execute(sql, [' OR '.join(_fts_match([token[:2]]) for token in tokens), FUZZY_CANDIDATES])
+        scored = []
+        for user_id, document in cursor.fetchall():
+            if user_id in ids:
+                continue
+            words = document.split()
+            score = min(
+                max(difflib.SequenceMatcher(None, token, word[:len(token) + 2]).ratio() for word in words)
+                for token in tokens
+            )
+            if score >= FUZZY_THRESHOLD:
+                scored.append((score, user_id))
+        scored.sort(key=lambda item: -item[0])
+        return ids + [user_id for _, user_id in scored[:limit - len(ids)]]
+
+
+def _search_fallback(query: str, limit: int, include_staff: bool) -> List[int]:
+    from ..models import UserSearchEntry
+
+    entries = UserSearchEntry.objects.all()
+    for token in _tokens(query):
+        entries = entries.filter(document__contains=token)
+    if not include_staff:
+        entries = entries.filter(user__is_staff=False, user__is_superuser=False)
+    return list(entries.values_list('user_id', flat=True)[:limit])
+
+
+def search_users(query: str, limit: int = 10, include_staff: bool = False):
+    """
+    Find users by username, email, name or location
+
+    Args:
+        query: Free text; each word matches as a prefix, near misses match fuzzily
+        limit: Maximum number of users returned
+        include_staff: Also return staff and superusers
+
+    Returns:
+        list: User objects (current_location preloaded), best match first
+    """
+    if not normalize(query):
+        return []
+
+    search = {
+        'postgresql': _search_postgresql,
+        'sqlite': _search_sqlite,
+    }.get(connection.vendor, _search_fallback)
+
+    try:
+        ids = search(query, limit, include_staff)
+    except Exception as e:
+        # e.g. FTS5 not compiled into SQLite, or pg_trgm missing
+        logger.warning(f"Indexed user search failed, falling back to a scan: {e}")
+        ids = _search_fallback(query, limit, include_staff)
+
+    User = get_user_model()
+    users = User.objects.select_related('current_location').in_bulk(ids)
+    return [users[user_id] for user_id in ids if user_id in users]
@@ -0,0 +1,192 @@
+"""
+Weather Cache Service
+Shared per-cell cache in front of the OpenWeatherMap API
+
+Coordinates are snapped to a geohash cell (WEATHER_CELL_PRECISION) and
+weather is fetched once for the cell centre, so every user, page and
+process behind the same Django cache reuses one upstream call per cell
+until the kind's TTL runs out.
+
+Fetches here fail fast when the upstream rate limit is reached; entries
+are kept WEATHER_STALE_TTL past their TTL and served marked 'stale' until
+a refresh succeeds.
+
+Fetched current weather is also stored as history (observation_service).
+Cell fetches always call /weather; they are never derived from forecasts.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from typing import Dict, Iterable, Optional
+
+from ..utils.deadline import Deadline
+from ..utils.geohash import decode, encode
+
+logger = logging.getLogger(__name__)
+
+# Upstream call per kind of cached data, made at the cell centre
+WEATHER_KINDS = {
+    'current': 'get_current_weather',
+    'forecast': 'get_forecast_slots',
+    'air_quality': 'get_air_quality',
+}
+
+# Cache lifetime setting and default (seconds) per kind
+KIND_TTL_SETTINGS = {
+    'current': ('WEATHER_CACHE_TTL', 600),
+    'forecast': ('WEATHER_FORECAST_CACHE_TTL', 10800),
+    'air_quality': ('WEATHER_AIR_QUALITY_CACHE_TTL', 3600),
+}
+
+# A cell being fetched is locked so concurrent requests don't repeat the call
+FETCH_LOCK_SECONDS = 30
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def cell_precision() -> int:
+    return _setting('WEATHER_CELL_PRECISION', 4)
+
+
+def kind_ttl(kind: str) -> int:
+    name, default = KIND_TTL_SETTINGS[kind]
+    return _setting(name, default)
+
+
+def expires_at(kind: str, data: Dict) -> float:
+    """When cached data goes stale: its own 'expires_at' (forecasts follow the model cycle) or fetched_at + TTL"""
+    return data.get('expires_at') or data.get('fetched_at', 0) + kind_ttl(kind)
+
+
+def is_fresh(kind: str, data: Dict, now: Optional[float] = None) -> bool:
+    return (now or time.time()) < expires_at(kind, data)
+
+
+def cell_for(lat: float, lon: float) -> str:
+    """Weather cell (geohash prefix) containing a point"""
+    return encode(float(lat), float(lon), cell_precision())
+
+
+def cache_key(kind: str, cell: str) -> str:
+    return f'weather:{kind}:{cell}'
+
+
+def get_cached(kind: str, cell: str) -> Optional[Dict]:
+    """Cached data for a cell, or None"""
+    return cache.get(cache_key(kind, cell))
+
+
+def get_cached_many(kind: str, cells: Iterable[str]) -> Dict[str, Dict]:
+    """{cell: data} for the cells that are cached"""
+    cells = list(cells)
+    found = cache.get_many([cache_key(kind, cell) for cell in cells])
+    return {cell: found[cache_key(kind, cell)] for cell in cells if cache_key(kind, cell) in found}
+
+
+def remember_observation(cell: str, measurements: Optional[Dict]):
+    """Keep a real /weather reading of a cell to anchor derived current weather"""
+    if measurements and measurements.get('dt'):
+        cache.set(f"{cache_key('current', cell)}:observed", measurements,
+                  _setting('WEATHER_DERIVED_CURRENT_MAX_AGE', 1800))
+
+
+def latest_observation(cell: str) -> Optional[Dict]:
+    """Newest real reading of a cell (remembered or in its cached current weather), or None"""
+    observed_key = f"{cache_key('current', cell)}:observed"
+    found = cache.get_many([observed_key, cache_key('current', cell)])
+    readings = [found.get(observed_key), (found.get(cache_key('current', cell)) or {}).get('measurements')]
+    return max((reading for reading in readings if reading and reading.get('dt')),
+               key=lambda reading: reading['dt'], default=None)
+
+
+def _fetch(kind: str, cell: str, deadline: Optional[Deadline] = None) -> Optional[Dict]:
+    from .weather_service import get_weather_service
+
+    lat, lon = decode(cell)
+    try:
+        service = get_weather_service(rate_limit_wait=0, deadline=deadline, derive_current=False)
+        result = getattr(service, WEATHER_KINDS[kind])(lat=round(lat, 4), lon=round(lon, 4))
+    except Exception as e:
+        logger.error(f"Weather fetch for cell {cell} failed: {e}")
+        return None
+    if not result.get('success') or not result.get('data'):
+        logger.warning(f"Weather fetch for cell {cell} failed: {result.get('error')}")
+        return None
+    data = result['data']
+    data['cell'] = cell
+    data['fetched_at'] = time.time()
+    return data
+
+
+def fetch_cells(kind: str, cells: Iterable[str], max_workers: Optional[int] = None,
+                deadline: Optional[Deadline] = None) -> Dict[str, Dict]:
+    """
+    Fetch cells upstream in parallel and cache the results
+
+    Cells another request is already fetching are skipped.
+
+    Args:
+        kind: Key of WEATHER_KINDS
+        cells: Cells to fetch
+        max_workers: Concurrent upstream calls (default: WEATHER_FETCH_CONCURRENCY)
+        deadline: Request deadline capping the calls' timeouts
+
+    Returns:
+        dict: {cell: data} for the cells fetched successfully
+    """
+    cells = [cell for cell in dict.fromkeys(cells) if cache.add(f'{cache_key(kind, cell)}:lock', 1, FETCH_LOCK_SECONDS)]
+    if not cells:
+        return {}
+
+    workers = max(1, min(max_workers or _setting('WEATHER_FETCH_CONCURRENCY', 8), len(cells)))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            fetched = {
+                cell: data
+                for cell, data in zip(cells, executor.map(lambda cell: _fetch(kind, cell, deadline), cells))
+                if data
+            }
+        cache.set_many({cache_key(kind, cell): data for cell, data in fetched.items()},
+                       kind_ttl(kind) + _setting('WEATHER_STALE_TTL', 21600))
+        if kind == 'current' and fetched:
+            from .observation_service import record_observations
+
+            record_observations(fetched)
+    finally:
+        cache.delete_many([f'{cache_key(kind, cell)}:lock' for cell in cells])
+    return fetched
+
+
+def get_for_cells(kind: str, cells: Iterable[str], max_fetches: Optional[int] = None,
+                  deadline: Optional[Deadline] = None) -> Dict[str, Dict]:
+    """
+    Cached data for cells, fetching up to max_fetches missing or expired ones
+
+    Returns:
+        dict: {cell: data}; data that couldn't be refreshed is returned with
+        'stale': True, cells with nothing cached are left out
+    """
+    cells = list(dict.fromkeys(cells))
+    cached = get_cached_many(kind, cells)
+    now = time.time()
+    found = {cell: data for cell, data in cached.items() if is_fresh(kind, data, now)}
+    missing = [cell for cell in cells if cell not in found]
+    if max_fetches is not None:
+        missing = missing[:max_fetches]
+    if missing:
+        found.update(fetch_cells(kind, missing, deadline=deadline))
+    for cell, data in cached.items():
+        if cell not in found:
+            found[cell] = {**data, 'stale': True}
+    return found
+
+
+def get_for_point(kind: str, lat: float, lon: float) -> Optional[Dict]:
+    """Data for the cell containing a point, fetched on a miss"""
+    cell = cell_for(lat, lon)
+    return get_for_cells(kind, [cell]).get(cell)
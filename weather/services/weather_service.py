@@ -5,16 +5,33 @@ Handles OpenWeatherMap API calls and data processing
 
 import requests
 import logging
+import time
 from django.conf import settings
 from typing import Dict, Optional, List
 from datetime import datetime, timedelta
 
+from .circuit_breaker_service import CircuitOpen
+from .rate_limit_service import RateLimitExceeded, UpstreamUnavailable, limited_request
+from ..utils.deadline import Deadline
+
 logger = logging.getLogger(__name__)
 
 class WeatherAPIService:
     """Service class to handle all weather-related API calls"""
 
-    def __init__(self):
+    def __init__(self, rate_limit_wait: Optional[float] = None, deadline: Optional[Deadline] = None,
+                 derive_current: Optional[bool] = None):
+        """
+        Args:
+            rate_limit_wait: Longest wait for a rate limit token in seconds
+                (default: the bucket's max_wait; 0 fails fast)
+            deadline: Request deadline capping every call's timeout
+            derive_current: Whether current weather may be derived from a cached
+                forecast (default: WEATHER_DERIVED_CURRENT)
+        """
+        self.rate_limit_wait = rate_limit_wait
+        self.deadline = deadline
+        self.derive_current = getattr(settings, 'WEATHER_DERIVED_CURRENT', True) if derive_current is None else derive_current
         self.api_key = getattr(settings, 'OPENWEATHER_API_KEY', None)
         self.base_url = getattr(settings, 'OPENWEATHER_BASE_URL', 'https://api.openweathermap.org/data/2.5')
 
@@ -22,10 +39,28 @@ class WeatherAPIService:
             logger.error("OpenWeatherMap API key not found in settings")
             raise ValueError("OpenWeatherMap API key is required")
 
+    def _get(self, url: str, params: Dict, bucket: str = 'openweather'):
+        """GET behind the shared upstream rate limiter"""
+        return limited_request(bucket, 'GET', url, wait=self.rate_limit_wait, deadline=self.deadline,
+                               params=params, timeout=10)
+
+    def _unavailable(self, e: UpstreamUnavailable) -> Dict:
+        logger.warning(str(e))
+        return {
+            'success': False,
+            'error': 'Weather service is busy - please try again shortly',
+            'rate_limited': isinstance(e, RateLimitExceeded),
+            'circuit_open': isinstance(e, CircuitOpen),
+            'retry_after': round(e.retry_after, 1)
+        }
+
     def get_current_weather(self, city: str = None, lat: float = None, lon: float = None) -> Dict:
         """
         Get current weather data for a location
 
+        May be served from the location's cached forecast instead of /weather
+        (see _derived_current_weather); such data has 'derived': True.
+
         Args:
             city: City name (e.g., "Manila,PH" or "New York,US")
             lat: Latitude (if using coordinates)
@@ -53,15 +88,25 @@ class WeatherAPIService:
                     'error': 'Either city name or coordinates (lat, lon) must be provided'
                 }
 
+            # Interpolate from the cached forecast when that saves the call
+            derived = self._derived_current_weather(city, lat, lon) if self.derive_current else None
+            if derived:
+                return {
+                    'success': True,
+                    'data': derived
+                }
+
             # Make API request
             url = f"{self.base_url}/weather"
-            response = requests.get(url, params=params, timeout=10)
+            response = self._get(url, params)
 
             if response.status_code == 200:
                 data = response.json()
+                formatted = self._format_current_weather(data)
+                self._remember_observation(formatted, lat, lon)
                 return {
                     'success': True,
-                    'data': self._format_current_weather(data)
+                    'data': formatted
                 }
             elif response.status_code == 404:
                 return {
@@ -74,6 +119,14 @@ class WeatherAPIService:
                     'error': f'API error: {response.status_code}'
                 }
 
+        except UpstreamUnavailable as e:
+            derived = self._derived_current_weather(city, lat, lon, reason='upstream_unavailable') if self.derive_current else None
+            if derived:
+                return {
+                    'success': True,
+                    'data': derived
+                }
+            return self._unavailable(e)
         except requests.exceptions.Timeout:
             logger.error("Weather API request timeout")
             return {
@@ -97,6 +150,9 @@ class WeatherAPIService:
         """
         Get weather forecast data for a location
 
+        Served from the location's cached 3-hour forecast (forecast_service),
+        fetched once per model cycle.
+
         Args:
             city: City name
             lat: Latitude
@@ -104,8 +160,40 @@ class WeatherAPIService:
             days: Number of days for forecast (max 5 for free tier)
 
         Returns:
-            Dict containing forecast data or error information
+            Dict containing daily and hourly forecast data or error information
+        """
+        from .forecast_service import get_forecast
+
+        try:
+            result = get_forecast(city=city, lat=lat, lon=lon, deadline=self.deadline)
+            if not result.get('success'):
+                return result
+            return {
+                'success': True,
+                'data': self._format_forecast_data(result['data'], days)
+            }
+
+        except Exception as e:
+            logger.error(f"Error in get_weather_forecast: {str(e)}")
+            return {
+                'success': False,
+                'error': 'Unable to fetch forecast data'
+            }
+
+    def get_forecast_slots(self, city: str = None, lat: float = None, lon: float = None) -> Dict:
+        """
+        Fetch the full 5-day / 3-hour forecast upstream (uncached)
+
+        Args:
+            city: City name
+            lat: Latitude
+            lon: Longitude
+
+        Returns:
+            Dict containing forecast_service.compact_forecast() data or error information
         """
+        from .forecast_service import compact_forecast
+
         try:
             params = {
                 'appid': self.api_key,
@@ -124,13 +212,17 @@ class WeatherAPIService:
                 }
 
             url = f"{self.base_url}/forecast"
-            response = requests.get(url, params=params, timeout=10)
+            response = self._get(url, params)
 
             if response.status_code == 200:
-                data = response.json()
                 return {
                     'success': True,
-                    'data': self._format_forecast_data(data, days)
+                    'data': compact_forecast(response.json())
+                }
+            elif response.status_code == 404:
+                return {
+                    'success': False,
+                    'error': 'Location not found'
                 }
             else:
                 return {
@@ -138,8 +230,10 @@ class WeatherAPIService:
                     'error': f'API error: {response.status_code}'
                 }
 
+        except UpstreamUnavailable as e:
+            return self._unavailable(e)
         except Exception as e:
-            logger.error(f"Error in get_weather_forecast: {str(e)}")
+            logger.error(f"Error in get_forecast_slots: {str(e)}")
             return {
                 'success': False,
                 'error': 'Unable to fetch forecast data'
@@ -164,7 +258,7 @@ class WeatherAPIService:
             }
 
             url = f"http://api.openweathermap.org/data/2.5/air_pollution"
-            response = requests.get(url, params=params, timeout=10)
+            response = self._get(url, params)
 
             if response.status_code == 200:
                 data = response.json()
@@ -178,6 +272,8 @@ class WeatherAPIService:
                     'error': f'API error: {response.status_code}'
                 }
 
+        except UpstreamUnavailable as e:
+            return self._unavailable(e)
         except Exception as e:
             logger.error(f"Error in get_air_quality: {str(e)}")
             return {
@@ -204,7 +300,7 @@ class WeatherAPIService:
             }
 
             url = f"http://api.openweathermap.org/geo/1.0/direct"
-            response = requests.get(url, params=params, timeout=10)
+            response = self._get(url, params, bucket='openweather_geo')
 
             if response.status_code == 200:
                 data = response.json()
@@ -218,6 +314,8 @@ class WeatherAPIService:
                     'error': f'API error: {response.status_code}'
                 }
 
+        except UpstreamUnavailable as e:
+            return self._unavailable(e)
         except Exception as e:
             logger.error(f"Error in search_locations: {str(e)}")
             return {
@@ -255,43 +353,159 @@ class WeatherAPIService:
                     'sunrise': datetime.fromtimestamp(data.get('sys', {}).get('sunrise', 0)).strftime('%H:%M'),
                     'sunset': datetime.fromtimestamp(data.get('sys', {}).get('sunset', 0)).strftime('%H:%M')
                 },
-                'timestamp': datetime.fromtimestamp(data.get('dt', 0)).isoformat()
+                'timestamp': datetime.fromtimestamp(data.get('dt', 0)).isoformat(),
+                'derived': False,
+                # Unrounded metric values for the observation store
+                'measurements': {
+                    'dt': data.get('dt'),
+                    'temperature': data.get('main', {}).get('temp'),
+                    'feels_like': data.get('main', {}).get('feels_like'),
+                    'humidity': data.get('main', {}).get('humidity'),
+                    'pressure': data.get('main', {}).get('pressure'),
+                    'wind_speed': data.get('wind', {}).get('speed'),  # m/s
+                    'wind_direction': data.get('wind', {}).get('deg'),
+                    'cloud_cover': data.get('clouds', {}).get('all'),
+                    'visibility': data.get('visibility'),  # m
+                    'precipitation': data.get('rain', {}).get('1h', 0),  # mm
+                    'condition_code': data.get('weather', [{}])[0].get('id'),
+                }
             }
         except Exception as e:
             logger.error(f"Error formatting weather data: {str(e)}")
             return {}
 
-    def _format_forecast_data(self, data: Dict, days: int) -> Dict:
-        """Format forecast data for consistent output"""
+    def _remember_observation(self, formatted: Dict, lat: float = None, lon: float = None):
+        """Keep a /weather reading as its cell's anchor for derived current weather"""
+        from .weather_cache_service import cell_for, remember_observation
+
+        coordinates = formatted.get('location', {}).get('coordinates', {})
+        if lat is None or lon is None:
+            lat, lon = coordinates.get('lat'), coordinates.get('lon')
+        if lat is not None and lon is not None:
+            remember_observation(cell_for(lat, lon), formatted.get('measurements'))
+
+    def _derived_current_weather(self, city: str = None, lat: float = None, lon: float = None,
+                                 reason: Optional[str] = None) -> Optional[Dict]:
+        """
+        Current weather interpolated from the location's cached forecast
+
+        The dashboard asks for the forecast of the same coordinates, so
+        deriving current conditions from it saves the /weather call. It is
+        used when:
+
+        - the cell had a real reading within WEATHER_DERIVED_CURRENT_MAX_AGE,
+          which corrects the forecast (so /weather is called at most once per
+          cell in that time);
+        - the OpenWeather rate limit bucket is down to
+          WEATHER_DERIVED_CURRENT_QUOTA_RESERVE of its burst;
+        - reason is given (the upstream is unavailable).
+
+        Args:
+            city: City name
+            lat: Latitude
+            lon: Longitude
+            reason: Derive for this reason without checking the above
+
+        Returns:
+            Dict shaped like _format_current_weather() with 'derived': True
+            and 'derivation', or None to call /weather
+        """
+        from .forecast_service import derive_current, get_cached_forecast
+        from .rate_limit_service import is_quota_tight
+        from .weather_cache_service import cell_for, latest_observation
+
         try:
-            forecast_list = data.get('list', [])
-            daily_forecasts = []
-
-            # Group by day (every 8th item is roughly one day in 3-hour intervals)
-            for i in range(0, min(len(forecast_list), days * 8), 8):
-                item = forecast_list[i]
-                daily_forecasts.append({
-                    'date': datetime.fromtimestamp(item.get('dt', 0)).strftime('%Y-%m-%d'),
-                    'temperature': {
-                        'min': round(item.get('main', {}).get('temp_min', 0)),
-                        'max': round(item.get('main', {}).get('temp_max', 0)),
-                        'avg': round(item.get('main', {}).get('temp', 0))
-                    },
-                    'condition': item.get('weather', [{}])[0].get('description', '').title(),
-                    'condition_main': item.get('weather', [{}])[0].get('main', ''),
-                    'icon': item.get('weather', [{}])[0].get('icon', ''),
-                    'humidity': item.get('main', {}).get('humidity', 0),
-                    'wind_speed': round(item.get('wind', {}).get('speed', 0) * 3.6),
-                    'precipitation_probability': item.get('pop', 0) * 100
-                })
+            forecast = get_cached_forecast(city=city, lat=lat, lon=lon)
+            if not forecast:
+                return None
+
+            if lat is None or lon is None:
+                coordinates = forecast.get('location', {}).get('coordinates') or {}
+                lat, lon = coordinates.get('lat'), coordinates.get('lon')
+            observation = latest_observation(cell_for(lat, lon)) if lat is not None and lon is not None else None
+            age = time.time() - observation['dt'] if observation else None
+            max_age = getattr(settings, 'WEATHER_DERIVED_CURRENT_MAX_AGE', 1800)
+
+            if reason is None:
+                if is_quota_tight('openweather', getattr(settings, 'WEATHER_DERIVED_CURRENT_QUOTA_RESERVE', 0.25)):
+                    reason = 'quota'
+                elif age is not None and age <= max_age:
+                    reason = 'recent_observation'
+                else:
+                    return None
+
+            # The reading's correction fades out as it ages
+            anchor_weight = max(1 - age / max_age, 0.0) if age is not None and max_age else 0.0
+            derived = derive_current(forecast, anchor=observation, anchor_weight=anchor_weight)
+            if not derived:
+                return None
+            return self._format_derived_weather(forecast, derived, reason, age)
+
+        except Exception as e:
+            logger.error(f"Error deriving current weather: {str(e)}")
+            return None
 
+    def _format_derived_weather(self, forecast: Dict, derived: Dict, reason: str, age: Optional[float]) -> Dict:
+        """Format forecast_service.derive_current() output like current weather data"""
+        values = derived['values']
+        slot = derived['nearest']
+        location = forecast.get('location', {})
+
+        def rounded(value, scale=1):
+            return round(value * scale) if value is not None else None
+
+        def clock(timestamp):
+            return datetime.fromtimestamp(timestamp).strftime('%H:%M') if timestamp else None
+
+        return {
+            'location': {
+                'name': location.get('name', 'Unknown'),
+                'country': location.get('country', ''),
+                'coordinates': location.get('coordinates', {})
+            },
+            'current': {
+                'temperature': rounded(values['temperature']),
+                'feels_like': rounded(values['feels_like']),
+                'humidity': rounded(values['humidity']),
+                'pressure': rounded(values['pressure']),
+                'visibility': (slot.get('visibility') or 0) / 1000,  # Convert to km
+                'wind_speed': rounded(values['wind_speed'], 3.6),  # Convert to km/h
+                'wind_direction': rounded(values['wind_direction']),
+                'cloud_cover': rounded(values['cloud_cover']),
+                'condition': slot.get('condition', ''),
+                'condition_main': slot.get('condition_main', ''),
+                'icon': slot.get('icon', ''),
+                'precipitation': round(values['precipitation'], 1)
+            },
+            'sun': {
+                'sunrise': clock(location.get('sunrise')),
+                'sunset': clock(location.get('sunset'))
+            },
+            'timestamp': datetime.now().isoformat(),
+            'derived': True,
+            'derivation': {
+                'reason': reason,
+                'forecast_slots': [datetime.fromtimestamp(dt).isoformat() for dt in derived['slots']],
+                'observation_age': round(age) if age is not None else None,
+                'corrected': derived['corrected']
+            }
+        }
+
+    def _format_forecast_data(self, forecast: Dict, days: int) -> Dict:
+        """Format a cached compact forecast for consistent output"""
+        from .forecast_service import daily_summary, hourly
+
+        try:
+            location = forecast.get('location', {})
             return {
                 'location': {
-                    'name': data.get('city', {}).get('name', 'Unknown'),
-                    'country': data.get('city', {}).get('country', ''),
-                    'coordinates': data.get('city', {}).get('coord', {})
+                    'name': location.get('name', 'Unknown'),
+                    'country': location.get('country', ''),
+                    'coordinates': location.get('coordinates', {})
                 },
-                'forecast': daily_forecasts
+                'forecast': daily_summary(forecast, days),
+                'hourly': hourly(forecast, hours=24),
+                'stale': forecast.get('stale', False)
             }
         except Exception as e:
             logger.error(f"Error formatting forecast data: {str(e)}")
@@ -328,6 +542,8 @@ class WeatherAPIService:
         }
 
 # Convenience function for easy access
-def get_weather_service() -> WeatherAPIService:
+def get_weather_service(rate_limit_wait: Optional[float] = None,
+                        deadline: Optional[Deadline] = None,
+                        derive_current: Optional[bool] = None) -> WeatherAPIService:
     """Get a configured weather service instance"""
-    return WeatherAPIService()
\ No newline at end of file
+    return WeatherAPIService(rate_limit_wait=rate_limit_wait, deadline=deadline, derive_current=derive_current)
\ No newline at end of file
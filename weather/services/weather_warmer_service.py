@@ -0,0 +1,232 @@
+"""
+Weather Cache Warmer Service
+Keeps current weather, forecast and air quality cached for every cell
+where users are, so the first page view of the day isn't a cold miss
+
+Cells come from UserLocation, plus geocoded UserProfile.location for users
+without one. Geocoding calls count against the pass's budget (at most
+GEOCODE_BUDGET_SHARE of it); profiles left over are geocoded in later
+passes. Each pass refreshes the (cell, kind) pairs past
+WEATHER_WARM_REFRESH_AT of their TTL (forecasts: past their model cycle),
+most recently active users' cells first, within an upstream call budget;
+run every minute this spreads refreshes over time instead of bunching
+them at expiry.
+"""
+
+import hashlib
+import logging
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .weather_cache_service import cell_for, cell_precision, expires_at, fetch_cells, get_cached_many, kind_ttl
+
+logger = logging.getLogger(__name__)
+
+WARM_KINDS = ('current', 'forecast', 'air_quality')
+WARMER_STATS_CACHE_KEY = 'weather:warmer:stats'
+
+# Geocoded profile locations change rarely; misses are cached too
+GEOCODE_CACHE_TTL = 30 * 24 * 3600
+# Most of a pass's upstream budget that geocoding may use, so refreshes continue on a cold start
+GEOCODE_BUDGET_SHARE = 0.5
+
+# Activity weight of a user never seen, and the decay (hours) for seen ones
+UNSEEN_USER_WEIGHT = 0.1
+ACTIVITY_DECAY_HOURS = 24.0
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def _geocode_key(name: str) -> str:
+    normalized = ' '.join(name.lower().split())
+    return f"weather:geocode:{hashlib.md5(normalized.encode('utf-8')).hexdigest()}"
+
+
+def cached_geocode(name: str) -> Tuple[bool, Optional[Tuple[float, float]]]:
+    """(found in cache, (lat, lon) or None) of a profile location, without calling upstream"""
+    cached = cache.get(_geocode_key(name))
+    if cached is None:
+        return False, None
+    return True, tuple(cached) if cached else None
+
+
+def geocode_location(name: str) -> Optional[Tuple[float, float]]:
+    """(lat, lon) of a free-text profile location, cached"""
+    found, point = cached_geocode(name)
+    if found:
+        return point
+
+    from .weather_service import get_weather_service
+
+    result = get_weather_service().search_locations(name, limit=1)
+    if not result.get('success'):
+        return None  # Upstream error: try again next pass
+    places = result.get('data') or []
+    point = (places[0]['lat'], places[0]['lon']) if places and places[0].get('lat') is not None else None
+    cache.set(_geocode_key(name), list(point) if point else [], GEOCODE_CACHE_TTL)
+    return point
+
+
+def _activity_weight(last_seen, now) -> float:
+    if last_seen is None:
+        return UNSEEN_USER_WEIGHT
+    hours = max((now - last_seen).total_seconds() / 3600, 0.0)
+    return 1.0 / (1.0 + hours / ACTIVITY_DECAY_HOURS)
+
+
+def collect_cells(geocode_budget: Optional[int] = None) -> Tuple[Dict[str, Dict], Dict[str, int]]:
+    """
+    Every weather cell with users in it
+
+    Args:
+        geocode_budget: Most upstream geocoding calls to make (default: no limit);
+            profiles beyond it are left out until a later pass
+
+    Returns:
+        tuple: ({cell: {'users': count, 'activity': summed activity weight}},
+        {'geocoded': upstream calls made, 'geocode_deferred': profiles left out})
+    """
+    from ..models import UserLocation, UserPresence, UserProfile
+
+    now = timezone.now()
+    precision = cell_precision()
+    last_seen = dict(UserPresence.objects.values_list('user_id', 'last_seen_at'))
+    cells: Dict[str, Dict] = {}
+
+    def add(cell, user_id):
+        entry = cells.setdefault(cell, {'users': 0, 'activity': 0.0})
+        entry['users'] += 1
+        entry['activity'] += _activity_weight(last_seen.get(user_id), now)
+
+    located = set()
+    for user_id, lat, lon, geohash in UserLocation.objects.values_list('user_id', 'latitude', 'longitude', 'geohash'):
+        located.add(user_id)
+        add(geohash[:precision] if len(geohash or '') >= precision else cell_for(lat, lon), user_id)
+
+    profiles = (
+        UserProfile.objects.exclude(location__isnull=True).exclude(location='')
+        .values_list('user_id', 'location')
+    )
+    geocoded: Dict[str, Optional[Tuple[float, float]]] = {}
+    stats = {'geocoded': 0, 'geocode_deferred': 0}
+    for user_id, location in profiles:
+        if user_id in located:
+            continue
+        key = ' '.join(location.lower().split())
+        if key not in geocoded:
+            found, point = cached_geocode(location)
+            if not found:
+                if geocode_budget is not None and stats['geocoded'] >= geocode_budget:
+                    stats['geocode_deferred'] += 1
+                    continue
+                stats['geocoded'] += 1
+                point = geocode_location(location)
+            geocoded[key] = point
+        if geocoded[key]:
+            add(cell_for(*geocoded[key]), user_id)
+    return cells, stats
+
+
+def plan_refreshes(cells: Dict[str, Dict], kinds: Iterable[str] = WARM_KINDS,
+                   now: Optional[float] = None) -> Tuple[List[Tuple[str, str]], Dict]:
+    """
+    The (kind, cell) pairs due for a refresh, highest priority first
+
+    Missing or past-refresh-point entries are due. Priority is the cell's
+    activity weight, then how overdue the entry is.
+
+    Returns:
+        tuple: (due pairs, metrics)
+    """
+    now = now or time.time()
+    refresh_at = _setting('WEATHER_WARM_REFRESH_AT', 0.8)
+    due, ages, lags = [], [], []
+    pairs = fresh = 0
+    users_total = sum(entry['users'] for entry in cells.values())
+    users_fresh_current = 0
+
+    for kind in kinds:
+        ttl = kind_ttl(kind)
+        cached = get_cached_many(kind, cells)
+        for cell, entry in cells.items():
+            pairs += 1
+            data = cached.get(cell)
+            age = now - data['fetched_at'] if data and data.get('fetched_at') else None
+            if age is not None:
+                ages.append(age)
+                if now < expires_at(kind, data):
+                    fresh += 1
+                    if kind == 'current':
+                        users_fresh_current += entry['users']
+            # Due once refresh_at of the TTL has passed; entries that expire with the
+            # provider's model cycle (forecasts) only once the new run is out
+            lead = 0 if data and data.get('expires_at') else ttl * (1 - refresh_at)
+            overdue = ttl if age is None else now - (expires_at(kind, data) - lead)
+            if overdue >= 0:
+                due.append((entry['activity'], overdue, kind, cell))
+                if age is not None:
+                    lags.append(overdue)
+
+    due.sort(key=lambda item: (item[0], item[1]), reverse=True)
+    metrics = {
+        'cells': len(cells),
+        'pairs': pairs,
+        'fresh': fresh,
+        'coverage': round(fresh / pairs, 4) if pairs else 1.0,
+        'user_coverage': round(users_fresh_current / users_total, 4) if users_total else 1.0,
+        'due': len(due),
+        'max_age_seconds': round(max(ages)) if ages else None,
+        'mean_age_seconds': round(sum(ages) / len(ages)) if ages else None,
+        'max_lag_seconds': round(max(lags)) if lags else 0,
+    }
+    return [(kind, cell) for _, _, kind, cell in due], metrics
+
+
+def warm_once(budget: int, kinds: Iterable[str] = WARM_KINDS) -> Dict:
+    """
+    One warming pass: refresh up to budget due (kind, cell) pairs
+
+    Returns:
+        dict: Metrics of the pass (also cached under WARMER_STATS_CACHE_KEY)
+    """
+    started = time.time()
+    kinds = list(kinds)
+    budget = max(budget, 0)
+    cells, geocode_stats = collect_cells(geocode_budget=max(int(budget * GEOCODE_BUDGET_SHARE), 1) if budget else 0)
+    due, metrics = plan_refreshes(cells, kinds, now=started)
+    metrics.update(geocode_stats)
+
+    selected: Dict[str, List[str]] = {}
+    for kind, cell in due[:budget - geocode_stats['geocoded']]:
+        selected.setdefault(kind, []).append(cell)
+
+    fetched = 0
+    for kind, kind_cells in selected.items():
+        fetched += len(fetch_cells(kind, kind_cells))
+    attempted = sum(len(kind_cells) for kind_cells in selected.values())
+
+    metrics.update({
+        'attempted': attempted,
+        'fetched': fetched,
+        'failed': attempted - fetched,
+        'backlog': max(metrics['due'] - attempted, 0),
+        'duration_seconds': round(time.time() - started, 2),
+        'finished_at': timezone.now().isoformat(),
+    })
+    cache.set(WARMER_STATS_CACHE_KEY, metrics, None)
+    logger.info(
+        f"Weather warmer: {metrics['cells']} cells, coverage {metrics['coverage']:.0%}, "
+        f"fetched {fetched}/{attempted}, backlog {metrics['backlog']}, max lag {metrics['max_lag_seconds']}s, "
+        f"geocoded {metrics['geocoded']} ({metrics['geocode_deferred']} deferred)"
+    )
+    return metrics
+
+
+def get_warmer_stats() -> Optional[Dict]:
+    """Metrics of the most recent warming pass, or None"""
+    return cache.get(WARMER_STATS_CACHE_KEY)
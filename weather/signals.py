@@ -0,0 +1,46 @@
+"""
+Model signal handlers that keep derived tables in sync with their sources
+"""
+import logging
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import SystemLog, UserLocation
+from .services.location_cluster_service import record_move
+from .services.log_rollup_service import record_system_log
+from .services.user_search_service import refresh_user
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=get_user_model())
+def update_user_search_on_user_save(sender, instance, **kwargs):
+    """Re-index a user after username, email or name changes"""
+    refresh_user(instance)
+
+
+@receiver(post_save, sender=UserLocation)
+def update_user_search_on_location_save(sender, instance, **kwargs):
+    """Re-index a user when their location name changes"""
+    refresh_user(instance.user)
+
+
+@receiver(pre_delete, sender=UserLocation)
+def remove_location_from_clusters(sender, instance, **kwargs):
+    """Take a deleted location (e.g. its user was deleted) out of the map clusters"""
+    is_admin = get_user_model().objects.filter(pk=instance.user_id, is_superuser=True).exists()
+    if not is_admin:
+        record_move((instance.latitude, instance.longitude), None)
+
+
+@receiver(post_save, sender=SystemLog)
+def add_system_log_to_rollups(sender, instance, created, **kwargs):
+    """Count a new SystemLog row in its hourly and daily rollups, whoever wrote it"""
+    if not created:
+        return
+    try:
+        record_system_log(instance)
+    except Exception as e:
+        # Rollups can be repaired with `manage.py rebuild_log_rollups`
+        logger.error(f"Failed to update system log rollups: {e}")
@@ -123,21 +123,23 @@ document.addEventListener('DOMContentLoaded', function() {
                             window.zoomToUser(targetUser.username);
                         }
 
-                        // Fetch weather
+                        // Fetch weather from the server's shared per-cell cache
                         try {
-                            const weatherResponse = await fetch(`https://api.openweathermap.org/data/2.5/weather?lat=${targetUser.latitude}&lon=${targetUser.longitude}&appid=${OPENWEATHER_API_KEY}&units=metric`);
+                            const weatherResponse = await fetch(`/api/admin/user-weather/?user_ids=${targetUser.id}`);
                             const weatherData = await weatherResponse.json();
 
-                            if (weatherResponse.ok) {
+                            if (weatherResponse.ok && weatherData.success && weatherData.users.length) {
+                                const row = weatherData.cells[weatherData.users[0][1]];
+                                const weather = Object.fromEntries(weatherData.fields.map((field, i) => [field, row[i]]));
                                 weatherDataForUser = {
                                     username: targetUser.username,
                                     location: targetUser.location_name || 'Unknown',
-                                    temperature: weatherData.main.temp,
-                                    feels_like: weatherData.main.feels_like,
-                                    condition: weatherData.weather[0].description,
-                                    humidity: weatherData.main.humidity,
-                                    wind_speed: weatherData.wind.speed,
-                                    pressure: weatherData.main.pressure
+                                    temperature: weather.temperature,
+                                    feels_like: weather.feels_like,
+                                    condition: weather.condition.toLowerCase(),
+                                    humidity: weather.humidity,
+                                    wind_speed: Math.round(weather.wind_speed / 3.6 * 10) / 10,  // km/h -> m/s
+                                    pressure: weather.pressure
                                 };
                             }
                         } catch (err) {
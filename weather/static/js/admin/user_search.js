@@ -0,0 +1,91 @@
+/**
+ * Admin User Search
+ * Typeahead over the indexed /api/admin/users/search/ endpoint
+ */
+
+const USER_SEARCH_DEBOUNCE_MS = 200;
+
+// Search users; resolves to the API's user rows
+function searchUsers(query, {limit = 10, includeStaff = false, fields = null} = {}) {
+    const params = new URLSearchParams({q: query, limit: limit});
+    if (includeStaff) params.set('include_staff', '1');
+    if (fields) params.set('fields', fields);
+
+    return fetch(`/api/admin/users/search/?${params}`)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(data => {
+            if (!data.success) throw new Error(data.error || 'User search failed');
+            return data.users;
+        });
+}
+
+// Call fn once input has been idle for the debounce delay
+function debounce(fn, delay = USER_SEARCH_DEBOUNCE_MS) {
+    let timer = null;
+    return (...args) => {
+        clearTimeout(timer);
+        timer = setTimeout(() => fn(...args), delay);
+    };
+}
+
+// Turn a text input into a user picker that writes the chosen id to hiddenInput
+function attachUserTypeahead(input, hiddenInput, {includeStaff = false, emptyValue = 'all'} = {}) {
+    const list = document.createElement('ul');
+    list.className = 'absolute z-20 mt-1 w-full bg-white border border-gray-200 rounded-lg shadow-lg max-h-64 overflow-y-auto hidden';
+    input.parentNode.appendChild(list);
+
+    let latestQuery = '';
+
+    function close() {
+        list.classList.add('hidden');
+        list.innerHTML = '';
+    }
+
+    function render(users) {
+        list.innerHTML = '';
+        if (!users.length) {
+            close();
+            return;
+        }
+        users.forEach(user => {
+            const item = document.createElement('li');
+            item.className = 'px-3 py-2 cursor-pointer hover:bg-blue-50 text-sm';
+            item.innerHTML = '<span class="font-medium text-gray-900"></span> <span class="text-gray-500"></span>';
+            item.children[0].textContent = user.username;
+            item.children[1].textContent = user.email;
+            item.addEventListener('mousedown', event => {
+                event.preventDefault();
+                input.value = user.email;
+                hiddenInput.value = user.id;
+                close();
+            });
+            list.appendChild(item);
+        });
+        list.classList.remove('hidden');
+    }
+
+    const lookup = debounce(query => {
+        searchUsers(query, {includeStaff: includeStaff, fields: 'id,username,email'})
+            .then(users => {
+                // Ignore responses for queries the admin has already typed past
+                if (query === latestQuery) render(users);
+            })
+            .catch(error => console.error('Error searching users:', error));
+    });
+
+    input.addEventListener('input', () => {
+        latestQuery = input.value.trim();
+        hiddenInput.value = emptyValue;
+        if (!latestQuery) {
+            close();
+            return;
+        }
+        lookup(latestQuery);
+    });
+    input.addEventListener('blur', close);
+}
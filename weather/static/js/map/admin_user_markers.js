@@ -2,34 +2,151 @@
 class AdminUserMarkers {
     constructor(map) {
         this.map = map;
-        this.userMarkers = [];
+        this.userMarkers = new Map(); // user id -> marker
+        this.clusterMarkers = [];
+        this.mode = null;             // 'clusters' when zoomed out, 'points' when zoomed in
+        this.cursor = null;           // updated_since for the next poll
+        this.etag = null;
+        this.pollCount = 0;
+        this.userWeather = new Map();   // user id -> current weather, filled server-side
+        this.pendingWeather = new Set(); // user ids whose weather cell wasn't cached yet
         this.loadUserLocations();
-        // Refresh every 30 seconds
-        setInterval(() => this.loadUserLocations(), 30000);
+        // Poll for changes every 30 seconds
+        setInterval(() => this.loadUserLocations({incremental: true}), 30000);
+        // Panning/zooming changes the viewport: reload it in full
+        this.map.on('moveend', () => this.loadUserLocations());
     }
 
-    async loadUserLocations() {
+    async loadUserLocations({incremental = false} = {}) {
+        // Every 10th poll is a full reload so removed users drop off the map
+        this.pollCount += 1;
+        if (this.pollCount % 10 === 0) incremental = false;
+
+        const params = new URLSearchParams({
+            bbox: this.map.getBounds().toBBoxString(),
+            zoom: Math.round(this.map.getZoom())
+        });
+        // Changed-rows polling only applies to individual points
+        if (this.mode !== 'points') incremental = false;
+        if (incremental && this.cursor) params.set('updated_since', this.cursor);
+
         try {
-            const response = await fetch('/api/admin/user-locations/');
+            const headers = {};
+            if (incremental && this.etag) headers['If-None-Match'] = this.etag;
+            const response = await fetch(`/api/admin/user-locations/?${params}`, {headers, cache: 'no-store'});
+            if (response.status === 304) return;
+
             const data = await response.json();
+            if (!data.success) return;
 
-            if (data.success) {
+            this.etag = response.headers.get('ETag');
+            if (data.mode === 'clusters') {
                 this.clearMarkers();
-                this.displayUsers(data.locations);
-                console.log(`Loaded ${data.locations.length} user locations`);
+                this.mode = 'clusters';
+                this.cursor = null;
+                this.displayClusters(data.clusters);
+                console.log(`Loaded ${data.clusters.length} user location clusters`);
+                return;
             }
+
+            if (!data.incremental) this.clearMarkers();
+            this.mode = 'points';
+            this.displayUsers(data.locations);
+            this.cursor = data.cursor || this.cursor;
+            this.loadUserWeather(data.incremental ? data.locations.map(user => user.id) : null);
+            console.log(`Loaded ${data.locations.length} user locations${data.incremental ? ' (changed)' : ''}`);
         } catch (error) {
             console.error('Failed to load user locations:', error);
         }
     }
 
+    async loadUserWeather(userIds = null) {
+        // One batched request per poll: the whole viewport on full reloads,
+        // otherwise the changed users plus those still waiting for a cell
+        const params = new URLSearchParams();
+        if (userIds === null) {
+            params.set('bbox', this.map.getBounds().toBBoxString());
+        } else {
+            const ids = new Set([...userIds, ...this.pendingWeather]);
+            if (ids.size === 0) return;
+            params.set('user_ids', [...ids].join(','));
+        }
+
+        try {
+            const weather = await AdminUserMarkers.fetchUserWeather(params);
+            if (!weather) return;
+            if (userIds === null) this.userWeather.clear();
+            weather.users.forEach((value, userId) => {
+                this.userWeather.set(userId, value);
+                this.pendingWeather.delete(userId);
+            });
+            weather.pending.forEach(userId => this.pendingWeather.add(userId));
+        } catch (error) {
+            console.error('Failed to load user weather:', error);
+        }
+    }
+
+    // Decode the compact /api/admin/user-weather/ payload into user id -> weather
+    static async fetchUserWeather(params) {
+        const response = await fetch(`/api/admin/user-weather/?${params}`, {cache: 'no-store'});
+        const data = await response.json();
+        if (!data.success) return null;
+
+        const cells = data.cells.map(row => Object.fromEntries(data.fields.map((field, i) => [field, row[i]])));
+        const users = new Map(data.users.map(([userId, cellIndex]) => [userId, cells[cellIndex]]));
+        return {users, pending: data.pending};
+    }
+
     clearMarkers() {
         this.userMarkers.forEach(marker => this.map.removeLayer(marker));
-        this.userMarkers = [];
+        this.userMarkers.clear();
+        this.clusterMarkers.forEach(marker => this.map.removeLayer(marker));
+        this.clusterMarkers = [];
+    }
+
+    displayClusters(clusters) {
+        clusters.forEach(cluster => {
+            // Size the bubble by the number of digits so large counts stay readable
+            const size = 30 + String(cluster.count).length * 6;
+            const icon = L.divIcon({
+                className: 'user-cluster-icon',
+                html: `
+                    <div style="
+                        background-color: rgba(59, 130, 246, 0.85);
+                        width: ${size}px;
+                        height: ${size}px;
+                        border-radius: 50%;
+                        border: 3px solid white;
+                        box-shadow: 0 2px 6px rgba(0,0,0,0.4);
+                        display: flex;
+                        align-items: center;
+                        justify-content: center;
+                        color: white;
+                        font-weight: bold;
+                        font-size: 13px;
+                        cursor: pointer;
+                    ">
+                        ${cluster.count}
+                    </div>
+                `,
+                iconSize: [size, size],
+                iconAnchor: [size / 2, size / 2]
+            });
+
+            const marker = L.marker([cluster.latitude, cluster.longitude], { icon })
+                .on('click', () => this.map.setView([cluster.latitude, cluster.longitude], this.map.getZoom() + 2))
+                .addTo(this.map);
+
+            this.clusterMarkers.push(marker);
+        });
     }
 
     displayUsers(locations) {
         locations.forEach(user => {
+            // Changed rows replace the user's existing marker
+            const existing = this.userMarkers.get(user.id);
+            if (existing) this.map.removeLayer(existing);
+
             // Create custom icon with user initial
             const icon = L.divIcon({
                 className: 'user-marker-icon',
@@ -75,7 +192,7 @@ class AdminUserMarkers {
                             Last seen: ${new Date(user.updated_at).toLocaleString()}
                         </p>
                         <button
-                            onclick="sendWeatherAlert('${user.username}', '${user.email}', ${user.latitude}, ${user.longitude})"
+                            onclick="sendWeatherAlert(${user.id}, '${user.username}', '${user.email}', ${user.latitude}, ${user.longitude})"
                             style="
                                 width: 100%;
                                 background: linear-gradient(to right, #ef4444, #dc2626);
@@ -104,26 +221,29 @@ class AdminUserMarkers {
                 `, { maxWidth: 250 })
                 .addTo(this.map);
 
-            this.userMarkers.push(marker);
+            this.userMarkers.set(user.id, marker);
         });
     }
 }
 
 // Global function to send weather alert
-window.sendWeatherAlert = async function(username, email, lat, lon) {
-    // Fetch current weather data for the user's location
+window.sendWeatherAlert = async function(userId, username, email, lat, lon) {
+    // Use the weather batched for the map, or ask the server for this user
     try {
-        const weatherResponse = await fetch(`https://api.openweathermap.org/data/2.5/weather?lat=${lat}&lon=${lon}&appid=${window.OPENWEATHER_API_KEY_FROM_ENV}&units=metric`);
-        const weatherData = await weatherResponse.json();
+        let weather = window.adminUserMarkers && window.adminUserMarkers.userWeather.get(userId);
+        if (!weather) {
+            const result = await AdminUserMarkers.fetchUserWeather(new URLSearchParams({user_ids: userId}));
+            weather = result && result.users.get(userId);
+        }
 
-        if (!weatherResponse.ok) {
+        if (!weather) {
             alert('Failed to fetch weather data');
             return;
         }
 
-        const temp = weatherData.main.temp;
-        const condition = weatherData.weather[0].main;
-        const description = weatherData.weather[0].description;
+        const temp = weather.temperature;
+        const condition = weather.condition_main;
+        const description = weather.condition.toLowerCase();
 
         // Determine alert message based on weather
         let alertMessage = '';
@@ -37,7 +37,7 @@ const MapInit = {
 
         // Initialize admin user markers (if admin page and class exists)
         if (typeof AdminUserMarkers !== 'undefined' && window.location.pathname.includes('/admin-map')) {
-            new AdminUserMarkers(MapConfig.map);
+            window.adminUserMarkers = new AdminUserMarkers(MapConfig.map);
         }
 
         // Hide loading indicator
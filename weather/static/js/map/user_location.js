@@ -1,9 +1,35 @@
 // User Location Tracker - Sends location to server when user logs in
+
+// Skip sending when the user moved less than this since the last send...
+const LOCATION_MIN_MOVE_METERS = 100;
+// ...and the last send is more recent than this
+const LOCATION_MIN_INTERVAL_MS = 5 * 60 * 1000;
+
 class UserLocationTracker {
     constructor() {
         this.init();
     }
 
+    // Distance in meters between two points (haversine)
+    distanceMeters(lat1, lon1, lat2, lon2) {
+        const toRad = deg => deg * Math.PI / 180;
+        const a = Math.sin(toRad(lat2 - lat1) / 2) ** 2 +
+            Math.cos(toRad(lat1)) * Math.cos(toRad(lat2)) * Math.sin(toRad(lon2 - lon1) / 2) ** 2;
+        return 2 * 6371008.8 * Math.asin(Math.sqrt(a));
+    }
+
+    shouldSend(lat, lon) {
+        const last = JSON.parse(localStorage.getItem('lastSentLocation') || 'null');
+        if (!last) return true;
+        const moved = this.distanceMeters(last.lat, last.lon, lat, lon);
+        return moved >= LOCATION_MIN_MOVE_METERS || Date.now() - last.at >= LOCATION_MIN_INTERVAL_MS;
+    }
+
+    // Reverse-geocoded names are reused for positions within ~1 km
+    nameCacheKey(lat, lon) {
+        return `locationName:${lat.toFixed(2)},${lon.toFixed(2)}`;
+    }
+
     init() {
         if ('geolocation' in navigator) {
             navigator.geolocation.getCurrentPosition(
@@ -17,24 +43,28 @@ class UserLocationTracker {
         try {
             const lat = position.coords.latitude;
             const lon = position.coords.longitude;
+            if (!this.shouldSend(lat, lon)) return;
 
-            // Get location name using reverse geocoding (Nominatim API)
-            let locationName = '';
-            try {
-                const geoResponse = await fetch(
-                    `https://nominatim.openstreetmap.org/reverse?format=json&lat=${lat}&lon=${lon}&zoom=10`
-                );
-                const geoData = await geoResponse.json();
+            // Get location name using reverse geocoding (Nominatim API), unless cached
+            let locationName = localStorage.getItem(this.nameCacheKey(lat, lon)) || '';
+            if (!locationName) {
+                try {
+                    const geoResponse = await fetch(
+                        `https://nominatim.openstreetmap.org/reverse?format=json&lat=${lat}&lon=${lon}&zoom=10`
+                    );
+                    const geoData = await geoResponse.json();
 
-                // Extract city, state, or country from response
-                if (geoData.address) {
-                    const addr = geoData.address;
-                    locationName = addr.city || addr.town || addr.village ||
-                                   addr.municipality || addr.county ||
-                                   addr.state || addr.country || 'Unknown';
+                    // Extract city, state, or country from response
+                    if (geoData.address) {
+                        const addr = geoData.address;
+                        locationName = addr.city || addr.town || addr.village ||
+                                       addr.municipality || addr.county ||
+                                       addr.state || addr.country || 'Unknown';
+                        localStorage.setItem(this.nameCacheKey(lat, lon), locationName);
+                    }
+                } catch (geoError) {
+                    console.log('Reverse geocoding failed, using coordinates:', geoError);
                 }
-            } catch (geoError) {
-                console.log('Reverse geocoding failed, using coordinates:', geoError);
             }
 
             const response = await fetch('/api/user-location/', {
@@ -51,6 +81,7 @@ class UserLocationTracker {
             });
             const data = await response.json();
             if (data.success) {
+                localStorage.setItem('lastSentLocation', JSON.stringify({lat, lon, at: Date.now()}));
                 console.log('Location updated successfully:', locationName);
             }
         } catch (error) {
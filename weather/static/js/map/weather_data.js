@@ -24,7 +24,7 @@ const WeatherData = {
             // Fetch all weather data in parallel
             const [currentData, forecastData, airQualityData] = await Promise.all([
                 this.fetchWeatherData(`${baseUrl}/weather?lat=${lat}&lon=${lng}&appid=${apiKey}&units=metric`),
-                this.fetchWeatherData(`${baseUrl}/forecast?lat=${lat}&lon=${lng}&appid=${apiKey}&units=metric`),
+                this.fetchForecast(lat, lng),
                 this.fetchAirQuality(lat, lng)
             ]);
 
@@ -46,6 +46,20 @@ const WeatherData = {
         return response.json();
     },
 
+    /**
+     * Fetch the server's cached forecast (daily and hourly from one upstream call per model cycle)
+     */
+    async fetchForecast(lat, lng) {
+        try {
+            const response = await fetch(`/api/weather/forecast/?lat=${lat}&lon=${lng}`);
+            const result = await response.json();
+            return result.success ? result.data : null;
+        } catch (error) {
+            console.warn('Forecast data not available:', error);
+            return null;
+        }
+    },
+
     /**
      * Fetch air quality data
      */
@@ -117,18 +131,18 @@ const WeatherData = {
         const container = document.getElementById('hourly-forecast');
         if (!container) return;
 
-        if (!forecastData?.list) {
+        if (!forecastData?.hourly?.length) {
             container.innerHTML = '<div class="text-xs text-gray-500">Forecast not available</div>';
             return;
         }
 
         container.innerHTML = '';
-        const forecasts = forecastData.list.slice(0, 8);
+        const forecasts = forecastData.hourly.slice(0, 8);
 
         forecasts.forEach(forecast => {
             const time = new Date(forecast.dt * 1000);
-            const temp = Math.round(forecast.main.temp);
-            const icon = this.getWeatherIcon(forecast.weather[0].main);
+            const temp = forecast.temperature;
+            const icon = this.getWeatherIcon(forecast.condition_main);
 
             const item = document.createElement('div');
             item.className = 'flex items-center justify-between text-xs py-1.5 px-2 hover:bg-blue-50 rounded transition-colors';
@@ -8,9 +8,10 @@
  * @param {number} temperature - Temperature in Celsius
  * @param {string} location - Location name
  * @param {string} weatherCondition - Weather condition (optional)
+ * @param {object} coordinates - {lat, lon} to compare with the location's normal (optional)
  * @returns {Promise<object>} Alert data from API
  */
-async function fetchTemperatureAlert(temperature, location, weatherCondition = null) {
+async function fetchTemperatureAlert(temperature, location, weatherCondition = null, coordinates = null) {
     try {
         const response = await fetch('/api/temperature-alert/', {
             method: 'POST',
@@ -20,7 +21,9 @@ async function fetchTemperatureAlert(temperature, location, weatherCondition = n
             body: JSON.stringify({
                 temperature: temperature,
                 location: location,
-                weather_condition: weatherCondition
+                weather_condition: weatherCondition,
+                lat: coordinates ? coordinates.lat : null,
+                lon: coordinates ? coordinates.lon : null
             })
         });
 
@@ -77,6 +80,10 @@ function showTemperatureAlertDialog(alertData) {
     tempDisplay.className = `text-3xl font-bold ${alertData.color.replace('bg-', 'text-')}`;
     tempDisplayBox.className = `bg-white rounded-lg p-3 border-2 text-center ${alertData.borderColor || alertData.color.replace('bg-', 'border-')}`;
     locationDisplay.textContent = alertData.location;
+    if (alertData.normal) {
+        const difference = alertData.normal.difference;
+        locationDisplay.textContent += ` · ${difference > 0 ? '+' : ''}${difference}°C vs usual (${alertData.normal.label})`;
+    }
 
     // Set message
     message.textContent = alertData.message;
@@ -157,12 +164,13 @@ async function closeTemperatureAlertDialog() {
  * @param {number} temperature - Temperature in Celsius
  * @param {string} location - Location name
  * @param {string} weatherCondition - Weather condition (optional)
+ * @param {object} coordinates - {lat, lon} of the location (optional)
  */
-async function checkAndShowTemperatureAlert(temperature, location, weatherCondition = null) {
+async function checkAndShowTemperatureAlert(temperature, location, weatherCondition = null, coordinates = null) {
     // Django session now handles whether alert should show
     // No need for sessionStorage - backend manages this
 
-    const alertData = await fetchTemperatureAlert(temperature, location, weatherCondition);
+    const alertData = await fetchTemperatureAlert(temperature, location, weatherCondition, coordinates);
     if (alertData) {
         showTemperatureAlertDialog(alertData);
     }
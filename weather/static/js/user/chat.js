@@ -109,7 +109,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
         // Check and show temperature alert dialog if extreme
         if (tempAlert.isExtreme) {
-            checkAndShowTemperatureAlert(tempValue, weatherData.location, weatherData.condition_main);
+            checkAndShowTemperatureAlert(tempValue, weatherData.location, weatherData.condition_main, weatherData.coordinates);
         }
 
         const weatherHtml = `
@@ -1,3 +1,798 @@
-from django.test import TestCase
+import json
+import math
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .checks import check_shared_cache
+from .models import ActivityLog, LogArchive, SystemLog, SystemLogRollup, UserLocation, WeatherCellStats, WeatherObservation
+from .services import (
+    activity_log_service, circuit_breaker_service, climatology_service, forecast_service, location_ingest_service, log_archive_service, log_export_service, log_rollup_service,
+    log_search_service, rate_limit_service, series_store_service, spatial_service,
+)
+from .utils import geohash
+from .utils.downsample import lttb, minmax_envelope
+from .utils.pagination import KeysetPaginator, decode_cursor, encode_cursor
+
+
+def setUpModule():
+    # models.py adds these User columns outside migrations (they exist in the
+    # production auth_user table), so the test database lacks them
+    with connection.cursor() as cursor:
+        columns = {column.name for column in connection.introspection.get_table_description(cursor, User._meta.db_table)}
+    with connection.schema_editor() as editor:
+        for name in ('profile_pic', 'middle_name'):
+            if name not in columns:
+                editor.add_field(User, User._meta.get_field(name))
+
+
+@override_settings(LOCATION_FLUSH_BATCH_SIZE=200, LOCATION_FLUSH_INTERVAL_SECONDS=5,
+                   LOCATION_MIN_MOVE_METERS=100, LOCATION_MIN_INTERVAL_SECONDS=300)
+class LocationIngestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        location_ingest_service._take_buffer()
+        # The timer is exercised by calling _timed_flush directly
+        patcher = mock.patch.object(location_ingest_service, '_schedule_flush')
+        self.schedule_flush = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(location_ingest_service._take_buffer)
+        self.user = User.objects.create_user('walker', 'walker@example.com', 'pw')
+
+    def test_accepted_update_is_buffered_and_written_by_timer(self):
+        self.assertTrue(location_ingest_service.submit_location(self.user, 14.6, 121.0, 'Manila'))
+        self.assertEqual(UserLocation.objects.count(), 0)
+        self.schedule_flush.assert_called()
+
+        location_ingest_service._timed_flush()
+        location = UserLocation.objects.get(user=self.user)
+        self.assertAlmostEqual(float(location.latitude), 14.6)
+        self.assertEqual(location.location_name, 'Manila')
+
+    def test_small_move_within_interval_is_dropped(self):
+        location_ingest_service.submit_location(self.user, 14.6, 121.0, 'Manila')
+        self.assertFalse(location_ingest_service.submit_location(self.user, 14.6001, 121.0001, 'Manila'))
+        self.assertEqual(location_ingest_service._take_buffer()[self.user.pk][:2], (14.6, 121.0))
+
+    def test_debounced_update_still_flushes_a_due_buffer(self):
+        location_ingest_service.submit_location(self.user, 14.6, 121.0, 'Manila')
+        location_ingest_service._buffer_started = time.time() - 6
+
+        self.assertFalse(location_ingest_service.submit_location(self.user, 14.6, 121.0, 'Manila'))
+        self.assertEqual(UserLocation.objects.filter(user=self.user).count(), 1)
+
+    @override_settings(LOCATION_FLUSH_BATCH_SIZE=2)
+    def test_full_batch_is_written_immediately(self):
+        other = User.objects.create_user('runner', 'runner@example.com', 'pw')
+        location_ingest_service.submit_location(self.user, 14.6, 121.0, 'Manila')
+        location_ingest_service.submit_location(other, 10.3, 123.9, 'Cebu')
+        self.assertEqual(UserLocation.objects.count(), 2)
+
+    def test_failed_write_is_requeued_behind_newer_updates(self):
+        location_ingest_service.submit_location(self.user, 14.6, 121.0, 'Manila')
+        with mock.patch.object(UserLocation.objects, 'bulk_create', side_effect=DatabaseError('down')):
+            self.assertEqual(location_ingest_service.flush(), 0)
+        self.assertIn(self.user.pk, location_ingest_service._buffer)
+
+        # A newer position buffered before the retry is not overwritten by the failed batch
+        location_ingest_service._buffer[self.user.pk] = (10.3, 123.9, 'Cebu')
+        location_ingest_service._requeue({self.user.pk: (14.6, 121.0, 'Manila')})
+        self.assertEqual(location_ingest_service.flush(), 1)
+        self.assertEqual(UserLocation.objects.get(user=self.user).location_name, 'Cebu')
+
+
+def _destination(lat, lon, bearing, distance_km):
+    """Point distance_km from (lat, lon) along a great circle at bearing degrees"""
+    phi, lam, theta = math.radians(lat), math.radians(lon), math.radians(bearing)
+    angular = distance_km / geohash.EARTH_RADIUS_KM
+    phi2 = math.asin(math.sin(phi) * math.cos(angular) + math.cos(phi) * math.sin(angular) * math.cos(theta))
+    lam2 = lam + math.atan2(math.sin(theta) * math.sin(angular) * math.cos(phi),
+                            math.cos(angular) - math.sin(phi) * math.sin(phi2))
+    return math.degrees(phi2), (math.degrees(lam2) + 540) % 360 - 180
+
+
+def _in_boxes(boxes, lat, lon):
+    return any(west <= lon <= east and south <= lat <= north for west, south, east, north in boxes)
+
+
+class GeohashTests(TestCase):
+    def test_encode_known_value_and_decode_round_trip(self):
+        self.assertEqual(geohash.encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        lat, lon = geohash.decode(geohash.encode(14.5995, 120.9842))
+        self.assertAlmostEqual(lat, 14.5995, places=4)
+        self.assertAlmostEqual(lon, 120.9842, places=4)
+
+    def test_prefix_upper_bound(self):
+        self.assertEqual(geohash.prefix_upper_bound('wdw'), 'wdx')
+        self.assertEqual(geohash.prefix_upper_bound('wdz'), 'we')
+        self.assertIsNone(geohash.prefix_upper_bound('zz'))
+
+    def test_radius_bbox_contains_circle_at_large_radius_and_high_latitude(self):
+        rng = random.Random(38)
+        for lat in (0.0, 45.0, 60.0, 70.0, -75.0):
+            for radius in (50, 500, 1000, 2000):
+                boxes = geohash.radius_bbox(lat, 30.0, radius)
+                for _ in range(500):
+                    point = _destination(lat, 30.0, rng.uniform(0, 360), radius * rng.random() ** 0.5 * 0.9999)
+                    self.assertTrue(_in_boxes(boxes, *point), (lat, radius, point))
+                # The box is tight: the circle's easternmost point is on its edge
+                if len(boxes) == 1 and boxes[0][2] < 180.0:
+                    east = max(_destination(lat, 30.0, bearing / 10, radius)[1] for bearing in range(3600))
+                    self.assertAlmostEqual(east, boxes[0][2], delta=0.01)
+
+    def test_radius_bbox_near_pole_spans_all_longitudes(self):
+        (west, south, east, north), = geohash.radius_bbox(85.0, 10.0, 600)
+        self.assertEqual((west, east, north), (-180.0, 180.0, 90.0))
+        # Just short of the pole the box is much wider than r / cos(lat) (51.8 degrees)
+        (west, south, east, north), = geohash.radius_bbox(80.0, 10.0, 1000)
+        self.assertLess(north, 90.0)
+        self.assertAlmostEqual((east - west) / 2, 64.2, delta=0.1)
+
+    def test_radius_bbox_splits_at_antimeridian(self):
+        boxes = geohash.radius_bbox(-17.7, 179.5, 200)
+        self.assertEqual(len(boxes), 2)
+        self.assertTrue(_in_boxes(boxes, -17.7, -179.5))
+        self.assertTrue(_in_boxes(boxes, -17.7, 179.9))
+
+    def test_covering_prefixes_cover_box(self):
+        rng = random.Random(7)
+        box = (120.5, 13.9, 121.6, 15.2)
+        prefixes = geohash.covering_prefixes(*box, max_cells=16)
+        self.assertLessEqual(len(prefixes), 16)
+        for _ in range(1000):
+            lat, lon = rng.uniform(box[1], box[3]), rng.uniform(box[0], box[2])
+            self.assertTrue(any(geohash.encode(lat, lon).startswith(prefix) for prefix in prefixes))
+
+
+class SpatialQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.centre = (65.0, 25.0)
+        # Easternmost point at 990 km: inside the circle, outside an r / cos(lat) box
+        self.east = max((_destination(*self.centre, bearing / 10, 990) for bearing in range(900)),
+                        key=lambda point: point[1])
+        self.far = _destination(*self.centre, 90.0, 1100)
+        for name, (lat, lon) in (('east', self.east), ('far', self.far)):
+            user = User.objects.create_user(name, f'{name}@example.com', 'pw')
+            UserLocation.objects.create(user=user, latitude=round(lat, 6), longitude=round(lon, 6))
+
+    def test_within_radius_keeps_users_near_the_box_edge(self):
+        results = spatial_service.within_radius(*self.centre, 1000)
+        self.assertEqual([location.user.username for location in results], ['east'])
+        self.assertAlmostEqual(results[0].distance_km, 990, delta=1)
+
+    def test_nearest_is_exact(self):
+        results = spatial_service.nearest(*self.centre, k=2, max_radius_km=2000)
+        self.assertEqual([location.user.username for location in results], ['east', 'far'])
+
+
+@override_settings(UPSTREAM_RATE_LIMITS={'openweather': {'per_minute': 60, 'burst': 3, 'max_wait': 0}})
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_burst_then_fail_fast(self):
+        for _ in range(3):
+            rate_limit_service.acquire('openweather', wait=0)
+        with self.assertRaises(rate_limit_service.RateLimitExceeded) as raised:
+            rate_limit_service.acquire('openweather', wait=0)
+        self.assertAlmostEqual(raised.exception.retry_after, 1.0, delta=0.1)
+
+    def test_tokens_refill_at_rate_up_to_burst(self):
+        key = rate_limit_service._state_key('openweather')
+        cache.set(key, (0.0, time.time() - 2, 0.0), None)
+        self.assertAlmostEqual(rate_limit_service.available_tokens('openweather'), 2.0, delta=0.1)
+        cache.set(key, (0.0, time.time() - 60, 0.0), None)
+        self.assertEqual(rate_limit_service.available_tokens('openweather'), 3.0)
+
+    def test_waits_for_a_token_within_wait(self):
+        cache.set(rate_limit_service._state_key('openweather'), (0.9, time.time(), 0.0), None)
+        started = time.monotonic()
+        rate_limit_service.acquire('openweather', wait=1)
+        self.assertGreater(time.monotonic() - started, 0.05)
+
+    def test_busy_lock_is_not_a_free_pass(self):
+        cache.add('ratelimit:openweather:lock', 1, 60)
+        with mock.patch.object(rate_limit_service, 'LOCK_ATTEMPTS', 2):
+            with self.assertRaises(rate_limit_service.UpstreamUnavailable):
+                rate_limit_service.acquire('openweather', wait=0.1)
+        self.assertEqual(rate_limit_service.available_tokens('openweather'), 3.0)
+
+    def test_throttled_bucket_is_empty_until_retry_after(self):
+        rate_limit_service.note_throttled('openweather', 30)
+        self.assertEqual(rate_limit_service.available_tokens('openweather'), 0.0)
+        self.assertTrue(rate_limit_service.is_quota_tight('openweather', 0.25))
+        with self.assertRaises(rate_limit_service.RateLimitExceeded) as raised:
+            rate_limit_service.acquire('openweather', wait=0)
+        self.assertGreater(raised.exception.retry_after, 29)
+
+    @override_settings(UPSTREAM_RATE_LIMITS={'openweather': {'per_minute': 0}})
+    def test_unlimited_bucket(self):
+        self.assertIsNone(rate_limit_service.available_tokens('openweather'))
+        self.assertFalse(rate_limit_service.is_quota_tight('openweather', 0.25))
+        rate_limit_service.acquire('openweather', wait=0)
+
+    def test_workers_draw_from_one_bucket(self):
+        # Separate cache clients share nothing in memory, like two worker processes
+        workers = [caches.create_connection('default') for _ in range(2)]
+        taken = 0
+        for attempt in range(6):
+            with mock.patch.object(rate_limit_service, 'cache', workers[attempt % 2]):
+                try:
+                    rate_limit_service.acquire('openweather', wait=0)
+                    taken += 1
+                except rate_limit_service.RateLimitExceeded:
+                    pass
+        self.assertEqual(taken, 3)
+
+    def test_per_process_cache_fails_the_check(self):
+        self.assertEqual(check_shared_cache(None), [])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.assertEqual([warning.id for warning in check_shared_cache(None)], ['weather.W001'])
+
+
+@override_settings(CIRCUIT_BREAKERS={'openweather': {'window_seconds': 60, 'min_requests': 4, 'failure_rate': 0.5,
+                                                    'slow_call_seconds': 5.0, 'open_seconds': 30}})
+class CircuitBreakerTests(TestCase):
+    name = 'openweather'
+
+    def setUp(self):
+        cache.clear()
+
+    def _state(self):
+        return circuit_breaker_service._get_state(self.name)['state']
+
+    def _open_and_wait(self):
+        for _ in range(4):
+            circuit_breaker_service.record(self.name, False, 0.1)
+        state = circuit_breaker_service._get_state(self.name)
+        # Pretend open_seconds have passed
+        cache.set(circuit_breaker_service._state_key(self.name), {**state, 'opened_at': time.time() - 31}, None)
+
+    def test_opens_at_failure_rate_after_min_requests(self):
+        circuit_breaker_service.record(self.name, True, 0.1)
+        circuit_breaker_service.record(self.name, False, 0.1)
+        circuit_breaker_service.record(self.name, False, 0.1)
+        self.assertEqual(self._state(), circuit_breaker_service.CLOSED)  # 3 < min_requests
+        circuit_breaker_service.record(self.name, True, 6.0)  # Slow counts as a failure
+        self.assertEqual(self._state(), circuit_breaker_service.OPEN)
+        with self.assertRaises(circuit_breaker_service.CircuitOpen):
+            circuit_breaker_service.before_call(self.name)
+
+    def test_counters_sum_across_calls(self):
+        for latency in (0.1, 0.2, 0.3):
+            circuit_breaker_service.record(self.name, True, latency)
+        stats = circuit_breaker_service.get_breaker_stats()[self.name]
+        self.assertEqual((stats['calls'], stats['failures'], stats['slow_calls']), (3, 0, 0))
+        self.assertEqual(stats['mean_latency_ms'], 200)
+
+    def test_single_trial_when_half_open(self):
+        self._open_and_wait()
+        trial = circuit_breaker_service.before_call(self.name)
+        self.assertIsNotNone(trial)
+        self.assertEqual(self._state(), circuit_breaker_service.HALF_OPEN)
+        with self.assertRaises(circuit_breaker_service.CircuitOpen):
+            circuit_breaker_service.before_call(self.name)
+
+        circuit_breaker_service.release_trial(self.name, trial)
+        self.assertIsNotNone(circuit_breaker_service.before_call(self.name))
+
+    def test_only_the_trial_call_changes_a_half_open_breaker(self):
+        self._open_and_wait()
+        trial = circuit_breaker_service.before_call(self.name)
+        # Calls in flight from before the breaker opened report back
+        circuit_breaker_service.record(self.name, True, 0.1)
+        circuit_breaker_service.record(self.name, False, 0.1, trial='stale')
+        self.assertEqual(self._state(), circuit_breaker_service.HALF_OPEN)
+
+        circuit_breaker_service.record(self.name, True, 0.1, trial)
+        self.assertEqual(self._state(), circuit_breaker_service.CLOSED)
+        self.assertIsNone(circuit_breaker_service.before_call(self.name))
+        self.assertEqual(circuit_breaker_service.get_breaker_stats()[self.name]['calls'], 0)
+
+    def test_failed_trial_reopens(self):
+        self._open_and_wait()
+        trial = circuit_breaker_service.before_call(self.name)
+        circuit_breaker_service.record(self.name, False, 0.1, trial)
+        self.assertEqual(self._state(), circuit_breaker_service.OPEN)
+        with self.assertRaises(circuit_breaker_service.CircuitOpen):
+            circuit_breaker_service.before_call(self.name)
+
+    def test_workers_share_one_breaker(self):
+        # Separate cache clients share nothing in memory, like two worker processes
+        first, second = [caches.create_connection('default') for _ in range(2)]
+        with mock.patch.object(circuit_breaker_service, 'cache', first):
+            for _ in range(4):
+                circuit_breaker_service.record(self.name, False, 0.1)
+        with mock.patch.object(circuit_breaker_service, 'cache', second):
+            self.assertEqual(circuit_breaker_service.get_breaker_stats()[self.name]['failures'], 4)
+            with self.assertRaises(circuit_breaker_service.CircuitOpen):
+                circuit_breaker_service.before_call(self.name)
+
+        self._open_and_wait()
+        with mock.patch.object(circuit_breaker_service, 'cache', first):
+            self.assertIsNotNone(circuit_breaker_service.before_call(self.name))
+        with mock.patch.object(circuit_breaker_service, 'cache', second):
+            with self.assertRaises(circuit_breaker_service.CircuitOpen):
+                circuit_breaker_service.before_call(self.name)
+
+
+class LogRollupRebuildTests(TestCase):
+    def setUp(self):
+        self.archived_day = datetime(2026, 1, 5, tzinfo=dt_timezone.utc)
+        self.hot_day = datetime(2026, 1, 7, tzinfo=dt_timezone.utc)
+        # Rows of the archived day only survive as rollups and an archive file
+        SystemLogRollup.objects.create(granularity='day', bucket_start=self.archived_day, level='error', event_count=7)
+        LogArchive.objects.create(log_type='system', month=date(2026, 1, 1),
+                                  first_timestamp=self.archived_day + timedelta(hours=1),
+                                  last_timestamp=self.archived_day + timedelta(hours=5),
+                                  first_id=1, last_id=7, row_count=7, path='system/2026-01.ndjson.gz')
+        for _ in range(2):
+            log = SystemLog.objects.create(level='error', message='boom', module='weather_api')
+            SystemLog.objects.filter(pk=log.pk).update(timestamp=self.hot_day + timedelta(hours=3))
+
+    def test_rebuild_keeps_rollups_of_archived_days(self):
+        written = log_rollup_service.rebuild_rollups(self.archived_day - timedelta(days=1), self.hot_day + timedelta(days=1))
+
+        self.assertEqual(written['clipped'], {'system': self.archived_day + timedelta(days=1)})
+        # Only the rebuilt range; the rows were also counted at their creation time by the signal
+        daily = dict(SystemLogRollup.objects.filter(granularity='day', level='error', bucket_start__lte=self.hot_day)
+                     .values_list('bucket_start', 'event_count'))
+        self.assertEqual(daily, {self.archived_day: 7, self.hot_day: 2})
+
+    def test_new_system_logs_are_rolled_up_as_written(self):
+        log = SystemLog.objects.create(level='warning', message='slow upstream', module='weather_api')
+        log.message = 'edited'
+        log.save()
+
+        buckets = dict(SystemLogRollup.objects.filter(level='warning').values_list('granularity', 'event_count'))
+        self.assertEqual(buckets, {'hour': 1, 'day': 1})
+
+
+class LogSearchCursorTests(TestCase):
+    def test_cursor_from_the_other_sort_is_rejected(self):
+        relevance_cursor = encode_cursor(1.25, 10)
+        recent_cursor = encode_cursor(datetime(2026, 1, 7, tzinfo=dt_timezone.utc), 10)
+        for sort, cursor in (('recent', relevance_cursor), ('relevance', recent_cursor), ('recent', 'garbage')):
+            with self.assertRaises(ValueError):
+                log_search_service.search_logs('system', 'boom', sort=sort, cursor=cursor)
+
+    def test_matching_cursor_is_accepted(self):
+        page = log_search_service.search_logs('system', 'boom', sort='relevance', cursor=encode_cursor(1.25, 10))
+        self.assertEqual(len(page), 0)
+        self.assertTrue(page.has_previous)
+
+
+class CurrentWeatherAPITests(TestCase):
+    def test_measurements_are_not_in_the_response(self):
+        user = User.objects.create_user('viewer', password='secret')
+        self.client.force_login(user)
+        service = mock.Mock()
+        service.get_current_weather.return_value = {
+            'success': True,
+            'data': {'current': {'temperature': 21}, 'measurements': {'dt': 1, 'temperature': 20.6}},
+        }
+        with mock.patch('weather.views.api.get_weather_service', return_value=service):
+            response = self.client.get(reverse('current_weather_api'), {'lat': '14.6', 'lon': '121.0'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'], {'current': {'temperature': 21}})
+
+
+class ArchivedExportTests(TestCase):
+    def setUp(self):
+        archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_dir.cleanup)
+        self.settings_override = override_settings(LOG_ARCHIVE_DIR=archive_dir.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        user = User.objects.create_user('ops', email='ops@example.com', password='secret')
+        base = datetime(2026, 1, 5, tzinfo=dt_timezone.utc)
+        self.ids = []
+        for hours in (1, 2, 50, 51):
+            log = SystemLog.objects.create(level='error', message='boom', module='weather_api', user=user)
+            SystemLog.objects.filter(pk=log.pk).update(timestamp=base + timedelta(hours=hours))
+            self.ids.append(log.pk)
+        log_archive_service.archive_logs('system', base + timedelta(days=1))
+
+    def _export(self, source='system', **filters):
+        stream = log_export_service.export_stream(source, 'ndjson', columns=['id', 'user__email'], archived=True,
+                                                  **filters)
+        return [json.loads(line) for line in stream]
+
+    def test_archived_rows_are_merged_newest_first(self):
+        self.assertEqual(SystemLog.objects.count(), 2)
+        rows = self._export()
+
+        self.assertEqual([row['id'] for row in rows], self.ids[::-1])
+        self.assertEqual({row['user__email'] for row in rows}, {'ops@example.com'})
+
+    def test_filters_apply_to_archived_rows(self):
+        self.assertEqual(self._export(activity='info'), [])
+
+    def test_sources_without_archives_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self._export('chat')
+
+    def test_exports_are_always_audited(self):
+        admin = User.objects.create_user('auditor', password='secret', is_staff=True)
+        self.client.force_login(admin)
+        with mock.patch('weather.services.activity_log_service.random.random', return_value=0.999):
+            response = self.client.get(reverse('admin_export_logs'), {'type': 'system', 'archived': '1'})
+        b''.join(response.streaming_content)
+
+        audit = ActivityLog.objects.get(user=admin)
+        self.assertEqual((audit.activity_type, audit.weight), ('data_export', 1.0))
+        self.assertTrue(audit.metadata['archived'])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        # Ties on the timestamp are broken by id
+        base = datetime(2026, 1, 5, tzinfo=dt_timezone.utc)
+        for index in range(7):
+            log = SystemLog.objects.create(level='info', message=f'row {index}', module='weather_api')
+            SystemLog.objects.filter(pk=log.pk).update(timestamp=base + timedelta(hours=index // 2))
+        self.ordered = list(SystemLog.objects.order_by('-timestamp', '-id').values_list('id', flat=True))
+
+    def test_cursor_round_trip(self):
+        moment = datetime(2026, 1, 5, 3, tzinfo=dt_timezone.utc)
+        self.assertEqual(decode_cursor(encode_cursor(moment, 12)), (moment.isoformat(), 12))
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+
+    def test_pages_walk_forward_and_back_without_gaps(self):
+        paginator = KeysetPaginator(SystemLog.objects.all(), 3)
+        pages, page = [], paginator.get_page()
+        while True:
+            pages.append([log.pk for log in page])
+            if not page.has_next:
+                break
+            page = paginator.get_page(after=page.next_cursor)
+
+        self.assertEqual(sum(pages, []), self.ordered)
+        self.assertFalse(paginator.get_page().has_previous)
+
+        back = paginator.get_page(before=page.previous_cursor)
+        self.assertEqual([log.pk for log in back], pages[-2])
+        self.assertTrue(back.has_next)
+
+    def test_new_rows_do_not_shift_later_pages(self):
+        paginator = KeysetPaginator(SystemLog.objects.all(), 3)
+        first = paginator.get_page()
+        SystemLog.objects.create(level='info', message='late', module='weather_api')
+
+        self.assertEqual([log.pk for log in paginator.get_page(after=first.next_cursor)], self.ordered[3:6])
+
+
+class DownsampleTests(TestCase):
+    @staticmethod
+    def _reference_lttb(x, y, points):
+        # Straight transcription of the published algorithm
+        every = (len(x) - 2) / (points - 2)
+        selected, a = [0], 0
+        for bucket in range(points - 2):
+            lo, hi = int(bucket * every) + 1, int((bucket + 1) * every) + 1
+            next_lo, next_hi = hi, min(int((bucket + 2) * every) + 1, len(x))
+            avg_x = sum(x[next_lo:next_hi]) / (next_hi - next_lo)
+            avg_y = sum(y[next_lo:next_hi]) / (next_hi - next_lo)
+            areas = [abs((x[a] - avg_x) * (y[i] - y[a]) - (x[a] - x[i]) * (avg_y - y[a])) for i in range(lo, hi)]
+            a = lo + areas.index(max(areas))
+            selected.append(a)
+        return selected + [len(x) - 1]
+
+    def test_lttb_matches_reference(self):
+        rng = np.random.default_rng(7)
+        x = np.cumsum(rng.integers(1, 600, 1000)) + 1_700_000_000
+        y = np.cumsum(rng.normal(size=1000))
+        for points in (3, 10, 97, 500):
+            self.assertEqual(lttb(x, y, points).tolist(), self._reference_lttb(x.tolist(), y.tolist(), points))
+
+    def test_lttb_keeps_spikes_and_short_series(self):
+        x = np.arange(500)
+        y = np.zeros(500)
+        y[123] = 40.0
+        self.assertIn(123, lttb(x, y, 20).tolist())
+        self.assertEqual(lttb(x[:5], y[:5], 10).tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(lttb(x, y, 2).tolist(), [0, 499])
+
+    def test_minmax_envelope_per_bucket(self):
+        x = np.array([0, 1, 2, 5, 6, 9])
+        y = np.array([3.0, -1.0, 4.0, 2.0, 8.0, 5.0])
+        result = minmax_envelope(x, y, np.array([0, 3, 5, 7, 10]))
+
+        self.assertEqual(result['count'].tolist(), [3, 0, 2, 1])
+        self.assertEqual(result['min'][[0, 2, 3]].tolist(), [-1.0, 2.0, 5.0])
+        self.assertEqual(result['max'][[0, 2, 3]].tolist(), [4.0, 8.0, 5.0])
+        self.assertEqual(result['mean'][[0, 2, 3]].tolist(), [2.0, 5.0, 5.0])
+        self.assertTrue(np.isnan(result['min'][1]) and np.isnan(result['mean'][1]))
+
+
+class ClimatologyStatsTests(TestCase):
+    cell = 'wdw4'
+
+    def _observations(self, temperatures, start):
+        return [
+            WeatherObservation(cell=self.cell, observed_at=start + timedelta(hours=index),
+                               temperature=round(value * 10), humidity=70)
+            for index, value in enumerate(temperatures)
+        ]
+
+    def test_welford_matches_statistics(self):
+        # Large offset with small spread: where the naive sum of squares loses precision
+        rng = random.Random(3)
+        values = [1e6 + rng.random() for _ in range(50)]
+        accumulator = [0, 0.0, 0.0]
+        for value in values:
+            climatology_service._add(accumulator, value)
+        self.assertEqual(accumulator[0], len(values))
+        self.assertAlmostEqual(accumulator[1], statistics.fmean(values), places=6)
+        self.assertAlmostEqual(climatology_service._std(accumulator[0], accumulator[2]), statistics.stdev(values),
+                               places=6)
+
+    def test_batches_equal_one_pass_and_replays_are_not_counted(self):
+        start = datetime(2026, 1, 5, tzinfo=dt_timezone.utc)
+        temperatures = [27.1, 29.4, 31.0, 30.2, 26.8, 25.5, 28.3]
+        observations = self._observations(temperatures, start)
+
+        self.assertEqual(climatology_service.update_stats(observations[:4]), 4)
+        self.assertEqual(climatology_service.update_stats(observations[2:]), 3)
+        self.assertEqual(climatology_service.update_stats(observations), 0)
+
+        stats = WeatherCellStats.objects.get(cell=self.cell, field='temperature')
+        self.assertEqual(stats.count, len(temperatures))
+        self.assertAlmostEqual(stats.mean, statistics.fmean(temperatures), places=9)
+        self.assertAlmostEqual(climatology_service._std(stats.count, stats.m2), statistics.stdev(temperatures),
+                               places=9)
+        self.assertEqual((stats.min_value, stats.max_value, stats.last_value), (25.5, 31.0, 28.3))
+        self.assertEqual(sum(slot[0] for slot in stats.hourly), len(temperatures))
+        # Fields missing from the readings get no stats row
+        self.assertFalse(WeatherCellStats.objects.filter(cell=self.cell, field='pressure').exists())
+
+
+class ForecastAggregationTests(TestCase):
+    # 2026-01-05 00:00 UTC
+    start = 1767571200
+
+    def _forecast(self, offset=8 * 3600):
+        slots = []
+        for index in range(16):
+            temperature = 20 + index % 8
+            slots.append({
+                'dt': self.start + index * forecast_service.SLOT_SECONDS,
+                'temperature': temperature, 'temp_min': temperature - 1, 'temp_max': temperature + 1,
+                'feels_like': temperature, 'humidity': 60 + index, 'pressure': 1010,
+                'wind_speed': index / 2, 'pop': index / 20, 'rain': 0.5 if index % 2 else None,
+                'condition': f'Slot {index}', 'condition_main': 'Clouds', 'icon': '04d',
+            })
+        slots[3]['temp_min'] = None  # Missing values don't poison the day's min
+        return {'location': {'timezone': offset}, 'slots': slots}
+
+    def test_daily_summary_groups_by_local_day(self):
+        forecast = self._forecast()
+        days = forecast_service.daily_summary(forecast)
+
+        # UTC+8: the first local day holds the 00:00-15:00 UTC slots (08:00-23:00 local)
+        self.assertEqual([(day['date'], day['slots']) for day in days],
+                         [('2026-01-05', 6), ('2026-01-06', 8), ('2026-01-07', 2)])
+        first = forecast['slots'][:6]
+        self.assertEqual(days[0]['temperature'], {
+            'min': min(slot['temp_min'] for slot in first if slot['temp_min'] is not None),
+            'max': max(slot['temp_max'] for slot in first),
+            'avg': round(sum(slot['temperature'] for slot in first) / 6),
+        })
+        self.assertEqual(days[0]['precipitation'], 1.5)
+        self.assertEqual(days[0]['precipitation_probability'], 25)
+        self.assertEqual(days[0]['wind_speed'], round(2.5 * 3.6))
+        # Local noon is 04:00 UTC; the nearest slot is 03:00 UTC (11:00 local)
+        self.assertEqual(days[0]['condition'], 'Slot 1')
+        self.assertEqual(len(forecast_service.daily_summary(forecast, days=2)), 2)
+
+    def test_hourly_starts_at_the_current_slot(self):
+        now = self.start + 4 * 3600
+        slots = forecast_service.hourly(self._forecast(offset=0), hours=7, now=now)
+
+        self.assertEqual([slot['time'] for slot in slots], ['03:00', '06:00', '09:00'])
+
+    @override_settings(WEATHER_FORECAST_CYCLE_GRACE=600, WEATHER_FORECAST_CACHE_TTL=10800)
+    def test_cycle_expiry_waits_for_the_next_model_run(self):
+        hour = 3600
+        self.assertEqual(forecast_service.cycle_expiry(self.start + hour), self.start + 3 * hour + 600)
+        # Inside the grace period the previous cycle is still the newest one
+        self.assertEqual(forecast_service.cycle_expiry(self.start + 3 * hour + 300), self.start + 3 * hour + 600)
+        self.assertEqual(forecast_service.cycle_expiry(self.start + 3 * hour + 900), self.start + 6 * hour + 600)
+        with override_settings(WEATHER_FORECAST_CACHE_TTL=600):
+            self.assertEqual(forecast_service.cycle_expiry(self.start + hour), self.start + hour + 600)
+
+
+class WarmWeatherCacheCommandTests(TestCase):
+    def test_warmer_refuses_a_per_process_cache(self):
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            with mock.patch('weather.management.commands.warm_weather_cache.warm_once') as warm_once:
+                with self.assertRaises(CommandError):
+                    call_command('warm_weather_cache', '--once')
+        warm_once.assert_not_called()
+
+
+class AdminUsersAPITests(TestCase):
+    def test_pages_follow_the_primary_key(self):
+        admin = User.objects.create_user('admin', password='secret', is_staff=True)
+        self.client.force_login(admin)
+        ids = [User.objects.create_user(f'user{index}', password='secret').pk for index in range(5)]
+
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 2, 'fields': 'username', **({'after': cursor} if cursor else {})}
+            with CaptureQueriesContext(connection) as queries:
+                body = self.client.get(reverse('admin_users_api'), params).json()
+            seen += [row['username'] for row in body['users']]
+            cursor = body['next_cursor']
+            if not cursor:
+                break
+
+        self.assertEqual(seen, [f'user{index}' for index in reversed(range(5))])
+        page_sql = next(query['sql'] for query in queries.captured_queries if 'ORDER BY' in query['sql'])
+        self.assertNotIn('date_joined', page_sql)
+        self.assertIn(f'< {ids[1]}', page_sql)
+
+
+class DeriveCurrentTests(TestCase):
+    start = 1767571200
+    slot = forecast_service.SLOT_SECONDS
+
+    def _forecast(self, *points):
+        # points: (temperature, humidity, wind_direction) per 3-hour slot
+        return {'slots': [
+            {'dt': self.start + index * self.slot, 'temperature': temperature, 'feels_like': temperature,
+             'humidity': humidity, 'pressure': 1010, 'wind_speed': 3.0, 'cloud_cover': 40,
+             'wind_direction': direction, 'rain': 0.6 * index, 'condition': f'Slot {index}'}
+            for index, (temperature, humidity, direction) in enumerate(points)
+        ]}
+
+    def test_interpolates_between_slots(self):
+        derived = forecast_service.derive_current(self._forecast((20, 60, 90), (26, 80, 90)), now=self.start + self.slot / 3)
+
+        self.assertAlmostEqual(derived['values']['temperature'], 22)
+        self.assertAlmostEqual(derived['values']['humidity'], 60 + 20 / 3)
+        self.assertEqual(derived['nearest']['condition'], 'Slot 0')
+        self.assertEqual(derived['slots'], [self.start, self.start + self.slot])
+        self.assertFalse(derived['corrected'])
+
+    def test_wind_direction_takes_the_shorter_arc(self):
+        for first, second, share, expected in ((350, 10, 0.5, 0), (10, 350, 0.5, 0), (350, 10, 0.25, 355),
+                                               (340, 20, 0.75, 10)):
+            derived = forecast_service.derive_current(self._forecast((20, 60, first), (20, 60, second)),
+                                                      now=self.start + self.slot * share)
+            self.assertAlmostEqual(derived['values']['wind_direction'] % 360, expected, msg=(first, second, share))
+
+    def test_outside_the_forecast_is_none(self):
+        forecast = self._forecast((20, 60, 0), (23, 60, 0), (26, 60, 0))
+        self.assertIsNone(forecast_service.derive_current(forecast, now=self.start - self.slot - 1))
+        self.assertIsNone(forecast_service.derive_current(forecast, now=self.start + 2 * self.slot + 1))
+        self.assertIsNone(forecast_service.derive_current({'slots': []}, now=self.start))
+        # Within a slot before the first one it is clamped to the first slot
+        early = forecast_service.derive_current(forecast, now=self.start - self.slot / 2)
+        self.assertEqual(early['values']['temperature'], 20)
+        self.assertEqual(forecast_service.derive_current(forecast, now=self.start + 2 * self.slot)
+                         ['values']['temperature'], 26)
+
+    def test_anchor_correction_scales_with_its_weight(self):
+        forecast = self._forecast((20, 90, 0), (26, 96, 0))
+        # The forecast said 20 °C / 90 % at the anchor's time; the reading was 23 °C / 100 %
+        anchor = {'dt': self.start, 'temperature': 23.0, 'humidity': 100, 'pressure': None}
+        now = self.start + self.slot / 2
+
+        for anchor_weight, expected in ((1.0, 26.0), (0.5, 24.5), (0.0, 23.0)):
+            derived = forecast_service.derive_current(forecast, now=now, anchor=anchor, anchor_weight=anchor_weight)
+            self.assertAlmostEqual(derived['values']['temperature'], expected)
+            self.assertEqual(derived['corrected'], anchor_weight > 0)
+
+        derived = forecast_service.derive_current(forecast, now=now, anchor=anchor, anchor_weight=1.0)
+        # 93 % forecast + 10 points of correction is clamped to 100 %
+        self.assertEqual(derived['values']['humidity'], 100)
+        # Pressure had no reading, so it stays as forecast
+        self.assertEqual(derived['values']['pressure'], 1010)
+
+
+class SeriesStoreTests(TestCase):
+    cell = 'wdw4'
+    start = 1767571200
+
+    def setUp(self):
+        series_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(series_dir.cleanup)
+        self.settings_override = override_settings(WEATHER_SERIES_DIR=series_dir.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def _read(self):
+        columns = series_store_service.read_columns(
+            self.cell, datetime.fromtimestamp(self.start, dt_timezone.utc),
+            datetime.fromtimestamp(self.start + 86400, dt_timezone.utc), ['temperature', 'humidity', 'pressure'])
+        return {name: column.tolist() for name, column in columns.items()}
+
+    def test_next_append_cuts_an_interrupted_tail(self):
+        series_store_service.append(self.cell, [(self.start, {'temperature': 271, 'humidity': 80}),
+                                                (self.start + 600, {'temperature': 275, 'humidity': 78})])
+        # A crash after some value columns were written but before the time column:
+        # whole values in one file, half a value in another, and one file not written at all
+        with open(series_store_service._column_path(self.cell, 'temperature'), 'ab') as f:
+            f.write(np.array([999, 999], dtype=series_store_service.VALUE_DTYPE).tobytes())
+        with open(series_store_service._column_path(self.cell, 'humidity'), 'ab') as f:
+            f.write(b'\x01')
+        series_store_service._column_path(self.cell, 'pressure').unlink()
+
+        self.assertEqual(self._read()['time'], [self.start, self.start + 600])
+        series_store_service.append(self.cell, [(self.start + 1200, {'temperature': 280, 'humidity': 75,
+                                                                     'pressure': 1009})])
+
+        missing = series_store_service.MISSING
+        self.assertEqual(self._read(), {
+            'time': [self.start, self.start + 600, self.start + 1200],
+            'temperature': [271, 275, 280],
+            'humidity': [80, 78, 75],
+            'pressure': [missing, missing, 1009],
+        })
+
+    def test_replayed_rows_append_nothing(self):
+        series_store_service.append(self.cell, [(self.start + 600, {'temperature': 275})])
+        sizes = {path.name: path.stat().st_size for path in series_store_service._cell_dir(self.cell).iterdir()}
+
+        self.assertEqual(series_store_service.append(self.cell, [(self.start, {'temperature': 271}),
+                                                                 (self.start + 600, {'temperature': 290})]), 0)
+        self.assertEqual({path.name: path.stat().st_size
+                          for path in series_store_service._cell_dir(self.cell).iterdir()}, sizes)
+        self.assertEqual(self._read()['temperature'], [275])
+
+
+@override_settings(ACTIVITY_LOG_SAMPLE_RATES={'api_call': 0.25, 'login': 0.0, 'map_view': 0.0})
+class ActivitySamplingTests(TestCase):
+    def setUp(self):
+        activity_log_service.clear_sample_rate_cache()
+        self.addCleanup(activity_log_service.clear_sample_rate_cache)
+        self.user = User.objects.create_user('sampled', password='secret')
+
+    def _log(self, activity_type, draw):
+        with mock.patch('weather.services.activity_log_service.random.random', return_value=draw):
+            return activity_log_service.log_activity(self.user, activity_type, 'event')
+
+    def test_always_logged_types_are_never_dropped(self):
+        for activity_type in sorted(activity_log_service.ALWAYS_LOGGED):
+            log = self._log(activity_type, 0.9999)
+            self.assertIsNotNone(log, activity_type)
+            self.assertEqual(log.weight, 1.0)
+        with self.assertRaises(ValueError):
+            activity_log_service.set_sample_rate('login', 0.1)
+
+    def test_sampled_rows_carry_the_inverse_rate(self):
+        self.assertIsNone(self._log('api_call', 0.25))
+        self.assertIsNone(self._log('map_view', 0.0))
+        kept = self._log('api_call', 0.2499)
+        self.assertEqual(kept.weight, 4.0)
+        # Unconfigured types are not sampled
+        self.assertEqual(self._log('chat', 0.9999).weight, 1.0)
+
+    def test_rollups_sum_weights_not_rows(self):
+        for draw in (0.1, 0.2, 0.9, 0.5, 0.0):
+            self._log('api_call', draw)
+        self.assertEqual(ActivityLog.objects.filter(activity_type='api_call').count(), 3)
+
+        now = datetime.now(dt_timezone.utc)
+        start, end = now - timedelta(days=1), now + timedelta(hours=1)
+        incremental = log_rollup_service.get_activity_stats(start, end, activity_type='api_call')
+        self.assertEqual(incremental['total'], 12)
+
+        log_rollup_service.rebuild_rollups(start, end)
+        self.assertEqual(log_rollup_service.get_activity_stats(start, end, activity_type='api_call')['total'], 12)
@@ -8,9 +8,17 @@ from .views import (
     DismissAlertAPIView,
     CurrentWeatherAPIView,
     WeatherForecastAPIView,
+    WeatherHistoryAPIView,
     SearchLocationsAPIView,
     TemperatureAlertAPIView,
+    UserLocationAPIView,
     AdminUserLocationsAPIView,
+    AdminNearbyUsersAPIView,
+    AdminUserWeatherAPIView,
+    AdminUpstreamStatusAPIView,
+    AdminUsersAPIView,
+    AdminUserSearchAPIView,
+    AdminLogSearchAPIView,
     AdminChatHistoryAPIView,
     SendWeatherAlertAPIView,
     UserNotificationsAPIView
@@ -38,6 +46,7 @@ urlpatterns = [
     path('admin-users/<int:user_id>/edit/', views.admin_edit_user, name='admin_edit_user'),
     path('admin-users/<int:user_id>/delete/', views.admin_delete_user, name='admin_delete_user'),
     path('admin-logs/', views.admin_logs, name='admin_logs'),
+    path('admin-logs/export/', views.admin_export_logs, name='admin_export_logs'),
     path('admin-profile/', views.admin_profile, name='admin_profile'),
     path('admin-profile/edit/', views.admin_profile_edit, name='admin_profile_edit'),
     path('admin-profile/remove-image/', views.admin_profile_remove_image, name='admin_profile_remove_image'),
@@ -52,15 +61,23 @@ urlpatterns = [
     # Weather API endpoints
     path('api/weather/current/', CurrentWeatherAPIView.as_view(), name='current_weather_api'),
     path('api/weather/forecast/', WeatherForecastAPIView.as_view(), name='weather_forecast_api'),
+    path('api/weather/history/', WeatherHistoryAPIView.as_view(), name='weather_history_api'),
     path('api/weather/search/', SearchLocationsAPIView.as_view(), name='search_locations_api'),
     path('api/temperature-alert/', TemperatureAlertAPIView.as_view(), name='temperature_alert_api'),
 
     # Admin API endpoints
     path('api/admin/user-locations/', AdminUserLocationsAPIView.as_view(), name='admin_user_locations_api'),
+    path('api/admin/user-locations/nearby/', AdminNearbyUsersAPIView.as_view(), name='admin_nearby_users_api'),
+    path('api/admin/user-weather/', AdminUserWeatherAPIView.as_view(), name='admin_user_weather_api'),
+    path('api/admin/upstream-status/', AdminUpstreamStatusAPIView.as_view(), name='admin_upstream_status_api'),
+    path('api/admin/users/', AdminUsersAPIView.as_view(), name='admin_users_api'),
+    path('api/admin/users/search/', AdminUserSearchAPIView.as_view(), name='admin_user_search_api'),
+    path('api/admin/logs/search/', AdminLogSearchAPIView.as_view(), name='admin_log_search_api'),
     path('api/admin/chat-history/', AdminChatHistoryAPIView.as_view(), name='admin_chat_history_api'),
     path('api/admin/send-weather-alert/', SendWeatherAlertAPIView.as_view(), name='send_weather_alert_api'),
 
     # User API endpoints
+    path('api/user-location/', UserLocationAPIView.as_view(), name='user_location_api'),
     path('api/notifications/', UserNotificationsAPIView.as_view(), name='user_notifications_api'),
 
     # User URLs
@@ -0,0 +1,51 @@
+"""
+Request Deadline Utilities
+A time budget created by a view and passed down to every upstream call the
+request makes, so chained lookups can't add up past what the client waits
+"""
+import time
+from typing import Optional
+
+import requests
+
+# Below this many seconds an upstream call is not worth starting
+MIN_CALL_SECONDS = 0.5
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The request's time budget ran out before an upstream call"""
+
+
+class Deadline:
+    """Absolute point in (monotonic) time by which a request must be answered"""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def allows(self, seconds: float) -> bool:
+        """Whether at least `seconds` are left, e.g. before an optional step"""
+        return self.remaining() >= seconds
+
+    def reserve(self, seconds: float) -> 'Deadline':
+        """A deadline `seconds` earlier, leaving that much for a later step"""
+        child = Deadline(0)
+        child.expires_at = self.expires_at - seconds
+        return child
+
+    def timeout(self, cap: Optional[float] = None, minimum: float = MIN_CALL_SECONDS) -> float:
+        """
+        Timeout for the next upstream call: the remaining budget, at most cap
+
+        Raises:
+            DeadlineExceeded: Less than `minimum` seconds are left
+        """
+        remaining = self.remaining()
+        if remaining < minimum:
+            raise DeadlineExceeded(f"Request deadline reached ({remaining:.1f}s left)")
+        return min(remaining, cap) if cap else remaining
+
+    def __repr__(self):
+        return f"Deadline(remaining={self.remaining():.2f}s)"
@@ -0,0 +1,89 @@
+"""
+Downsampling Utilities
+Reduce long time series to what a chart can draw: Largest-Triangle-Three-
+Buckets keeps the points that shape the line, min/max envelopes keep the
+extremes of fixed time buckets
+"""
+from typing import Dict
+
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps
+
+    The first and last points are always kept; the rest are split into
+    points - 2 buckets and from each the point forming the largest triangle
+    with the previously kept point and the next bucket's average is kept.
+
+    Args:
+        x: Ascending x values (e.g. epoch seconds), no NaN
+        y: Values, no NaN
+        points: Points to keep
+
+    Returns:
+        np.ndarray: Ascending indices into x and y
+    """
+    size = len(x)
+    if points >= size:
+        return np.arange(size)
+    if points < 3:
+        return np.array([0, size - 1][:max(points, 0)], dtype=np.int64)
+
+    x = x.astype('float64') - float(x[0])  # Keep products well inside float64 precision
+    y = y.astype('float64')
+    edges = np.linspace(1, size - 1, points - 1).astype(np.int64)  # points - 2 buckets
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:edges[-1]], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:edges[-1]], edges[:-1]) / counts
+    # Each bucket looks ahead to the next one's average; the last one to the final point
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+    a = 0
+    for bucket in range(points - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        area = np.abs(
+            (x[a] - next_x[bucket]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (next_y[bucket] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        selected[bucket + 1] = a
+    return selected
+
+
+def minmax_envelope(x: np.ndarray, y: np.ndarray, edges: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Min, max, mean and count of y per [edges[i], edges[i + 1]) bucket of x
+
+    Args:
+        x: Ascending x values, no NaN
+        y: Values, no NaN
+        edges: Ascending bucket edges (buckets = len(edges) - 1)
+
+    Returns:
+        dict: {'min', 'max', 'mean': float arrays, NaN for empty buckets; 'count': int array}
+    """
+    bounds = np.searchsorted(x, edges, side='left')
+    counts = np.diff(bounds)
+    buckets = len(counts)
+    result = {
+        'min': np.full(buckets, np.nan),
+        'max': np.full(buckets, np.nan),
+        'mean': np.full(buckets, np.nan),
+        'count': counts,
+    }
+    filled = counts > 0
+    if not filled.any():
+        return result
+
+    # reduceat segments run from one start to the next, so only non-empty buckets are passed
+    y = y[:bounds[-1]].astype('float64')
+    starts = bounds[:-1][filled]
+    result['min'][filled] = np.minimum.reduceat(y, starts)
+    result['max'][filled] = np.maximum.reduceat(y, starts)
+    result['mean'][filled] = np.add.reduceat(y, starts) / counts[filled]
+    return result
@@ -0,0 +1,152 @@
+"""
+Geohash Utilities
+Encode coordinates as geohash strings and cover bounding boxes with
+geohash prefix ranges, so plain B-tree indexes can answer spatial queries
+"""
+import math
+from typing import List, Optional, Tuple
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+DEFAULT_PRECISION = 9  # ~4.8m x 4.8m cells
+EARTH_RADIUS_KM = 6371.0088
+
+
+def encode(lat: float, lon: float, precision: int = DEFAULT_PRECISION) -> str:
+    """Geohash of a point"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # Geohash interleaves bits starting with longitude
+
+    while len(chars) < precision:
+        value_range, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            value_range[0] = mid
+        else:
+            bits <<= 1
+            value_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """(west, south, east, north) of a geohash cell"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        bits = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            value_range = lon_range if even else lat_range
+            mid = (value_range[0] + value_range[1]) / 2
+            if (bits >> shift) & 1:
+                value_range[0] = mid
+            else:
+                value_range[1] = mid
+            even = not even
+    return lon_range[0], lat_range[0], lon_range[1], lat_range[1]
+
+
+def decode(geohash: str) -> Tuple[float, float]:
+    """(lat, lon) of the centre of a geohash cell"""
+    west, south, east, north = bounds(geohash)
+    return (south + north) / 2, (west + east) / 2
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """(width, height) in degrees of a geohash cell at a precision"""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = math.floor(precision * 5 / 2)
+    return 360.0 / 2 ** lon_bits, 180.0 / 2 ** lat_bits
+
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Smallest geohash string greater than every string starting with prefix
+
+    Increments within the base32 alphabet (monotonic in both byte and
+    locale collation), so prefix matches become index range scans:
+    prefix <= geohash < upper. Returns None for an all-'z' prefix.
+    """
+    chars = list(prefix)
+    while chars:
+        index = BASE32.index(chars[-1])
+        if index < len(BASE32) - 1:
+            chars[-1] = BASE32[index + 1]
+            return ''.join(chars)
+        chars.pop()
+    return None
+
+
+def covering_prefixes(west: float, south: float, east: float, north: float, max_cells: int = 32) -> List[str]:
+    """
+    Geohash prefixes whose cells together cover a bounding box
+
+    Uses the longest prefix length that needs at most max_cells cells.
+    The box must not cross the antimeridian (split it first).
+    """
+    for precision in range(DEFAULT_PRECISION, 0, -1):
+        width, height = cell_size(precision)
+        columns = int((east - west) / width) + 2
+        rows = int((north - south) / height) + 2
+        if columns * rows <= max_cells or precision == 1:
+            break
+
+    prefixes = set()
+    lat = south
+    while True:
+        lon = west
+        while True:
+            prefixes.add(encode(min(lat, 90.0), min(lon, 180.0), precision))
+            if lon >= east:
+                break
+            lon = min(lon + width, east)
+        if lat >= north:
+            break
+        lat = min(lat + height, north)
+    return sorted(prefixes)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def radius_bbox(lat: float, lon: float, radius_km: float) -> List[Tuple[float, float, float, float]]:
+    """
+    Bounding box(es) (west, south, east, north) containing a circle
+
+    Returns two boxes when the circle crosses the antimeridian. The
+    longitude half-width is that of the circle's tangent meridians,
+    asin(sin(r) / cos(lat)) for angular radius r, which is wider than
+    r / cos(lat) at large radii and high latitudes.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    d_lat = math.degrees(angular)
+    south, north = max(lat - d_lat, -90.0), min(lat + d_lat, 90.0)
+    if north >= 90.0 or south <= -90.0:
+        return [(-180.0, south, 180.0, north)]  # Circle contains a pole
+
+    ratio = math.sin(angular) / math.cos(math.radians(lat))
+    if ratio >= 1.0:
+        return [(-180.0, south, 180.0, north)]
+    d_lon = math.degrees(math.asin(ratio))
+    west, east = lon - d_lon, lon + d_lon
+    if west < -180.0:
+        return [(west + 360.0, south, 180.0, north), (-180.0, south, east, north)]
+    if east > 180.0:
+        return [(west, south, 180.0, north), (-180.0, south, east - 360.0, north)]
+    return [(west, south, east, north)]
@@ -0,0 +1,128 @@
+"""
+Keyset (cursor) Pagination Utilities
+Pages through large tables on an indexed (field, id) key instead of OFFSET
+"""
+import base64
+import json
+import logging
+
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+
+def encode_cursor(value, pk) -> str:
+    """Encode a (field value, primary key) position as an opaque URL-safe cursor"""
+    raw = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value, pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """
+    Decode a cursor created by encode_cursor
+
+    Returns:
+        tuple: (raw field value, pk) or None if the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return value, int(pk)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        logger.warning(f"Ignoring malformed pagination cursor: {cursor!r}")
+        return None
+
+
+class KeysetPage:
+    """One page of keyset-paginated results"""
+
+    def __init__(self, items, has_next, has_previous, next_cursor=None, previous_cursor=None):
+        self.object_list = items
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset newest-first on (field, id)
+
+    Each page is a single index range scan of per_page + 1 rows, so deep
+    pages cost the same as the first one. Rows inserted while paging get
+    newer keys and never shift the pages an admin is walking through.
+    """
+
+    def __init__(self, queryset, per_page: int, field: str = 'timestamp'):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.field = field
+        self._model_field = queryset.model._meta.get_field(field)
+
+    def _position(self, cursor):
+        decoded = decode_cursor(cursor) if cursor else None
+        if not decoded:
+            return None
+        value, pk = decoded
+        try:
+            return self._model_field.to_python(value), pk
+        except Exception:
+            return None
+
+    def _cursor_for(self, obj) -> str:
+        return encode_cursor(getattr(obj, self.field), obj.pk)
+
+    def _beyond(self, op: str, value, pk) -> Q:
+        """Rows past a position in the op ('lt' older, 'gt' newer) direction"""
+        if self._model_field.primary_key:
+            return Q(**{f'pk__{op}': pk})  # Keyed on the primary key alone
+        field = self.field
+        return Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'pk__{op}': pk})
+
+    def get_page(self, after: str = None, before: str = None) -> KeysetPage:
+        """
+        Get the page of older rows after a cursor, or newer rows before one
+
+        Args:
+            after: Cursor of the last row on the previous (newer) page
+            before: Cursor of the first row on the next (older) page
+
+        Returns:
+            KeysetPage
+        """
+        field = self.field
+        after_pos = self._position(after)
+        before_pos = self._position(before) if not after_pos else None
+
+        if before_pos:
+            value, pk = before_pos
+            rows = list(self.queryset.filter(self._beyond('gt', value, pk)).order_by(field, 'pk')[:self.per_page + 1])
+            has_previous = len(rows) > self.per_page
+            items = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            queryset = self.queryset
+            if after_pos:
+                value, pk = after_pos
+                queryset = queryset.filter(self._beyond('lt', value, pk))
+            rows = list(queryset.order_by(f'-{field}', '-pk')[:self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            items = rows[:self.per_page]
+            has_previous = after_pos is not None
+
+        return KeysetPage(
+            items,
+            has_next=has_next and bool(items),
+            has_previous=has_previous and bool(items),
+            next_cursor=self._cursor_for(items[-1]) if items else None,
+            previous_cursor=self._cursor_for(items[0]) if items else None,
+        )
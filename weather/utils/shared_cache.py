@@ -0,0 +1,15 @@
+"""
+Shared Cache Utilities
+Rate limit buckets, circuit breakers and the weather cache warmer only work
+when every process reads and writes the same cache
+"""
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+
+# Backends that keep entries inside the process that wrote them (or not at all)
+NON_SHARED_BACKENDS = ('LocMemCache', 'DummyCache')
+
+
+def is_shared_cache(alias: str = DEFAULT_CACHE_ALIAS) -> bool:
+    """Whether entries written by one process are visible to the others"""
+    return not settings.CACHES[alias]['BACKEND'].endswith(NON_SHARED_BACKENDS)
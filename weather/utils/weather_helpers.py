@@ -5,11 +5,16 @@ Centralized weather data fetching and processing
 import requests
 import logging
 from django.conf import settings
+from typing import Optional
+
+from ..services.rate_limit_service import limited_request
+from .deadline import Deadline
 
 logger = logging.getLogger(__name__)
 
 
-def get_weather_for_chatbot(city: str = None, lat: float = None, lon: float = None) -> dict:
+def get_weather_for_chatbot(city: str = None, lat: float = None, lon: float = None,
+                            deadline: Optional[Deadline] = None) -> dict:
     """
     Fetch weather data from OpenWeather API for chatbot responses
 
@@ -17,6 +22,7 @@ def get_weather_for_chatbot(city: str = None, lat: float = None, lon: float = No
         city: City name (e.g., "London" or "London,UK")
         lat: Latitude coordinate
         lon: Longitude coordinate
+        deadline: Request deadline capping the call's timeout
 
     Returns:
         dict: Weather information with success status
@@ -43,7 +49,7 @@ def get_weather_for_chatbot(city: str = None, lat: float = None, lon: float = No
             return {'success': False, 'error': 'No location provided'}
 
         # Make API request
-        response = requests.get(base_url, params=params, timeout=5)
+        response = limited_request('openweather', 'GET', base_url, deadline=deadline, params=params, timeout=5)
         response.raise_for_status()
         data = response.json()
 
@@ -64,6 +70,7 @@ def get_weather_for_chatbot(city: str = None, lat: float = None, lon: float = No
             'success': True,
             'location': f"{data['name']}, {data['sys']['country']}",
             'temperature': f"{round(data['main']['temp'])}°C",
+            'temperature_value': data['main']['temp'],
             'feels_like': f"{round(data['main']['feels_like'])}°C",
             'condition': data['weather'][0]['description'].capitalize(),
             'condition_main': data['weather'][0]['main'],
@@ -130,13 +137,14 @@ def extract_location_from_message(message: str) -> str | None:
     return None
 
 
-def get_air_quality(lat: float, lon: float) -> dict:
+def get_air_quality(lat: float, lon: float, deadline: Optional[Deadline] = None) -> dict:
     """
     Fetch air quality data from OpenWeather API
 
     Args:
         lat: Latitude coordinate
         lon: Longitude coordinate
+        deadline: Request deadline capping the call's timeout
 
     Returns:
         dict: Air quality information
@@ -145,7 +153,7 @@ def get_air_quality(lat: float, lon: float) -> dict:
     url = f"https://api.openweathermap.org/data/2.5/air_pollution?lat={lat}&lon={lon}&appid={api_key}"
 
     try:
-        response = requests.get(url, timeout=5)
+        response = limited_request('openweather', 'GET', url, deadline=deadline, timeout=5)
         response.raise_for_status()
         data = response.json()
 
@@ -178,12 +186,13 @@ def _get_aqi_status(aqi: int) -> str:
     return statuses.get(aqi, 'Unknown')
 
 
-def get_geocode_from_location(location: str) -> dict:
+def get_geocode_from_location(location: str, deadline: Optional[Deadline] = None) -> dict:
     """
     Get coordinates from location name using OpenWeather Geocoding API
 
     Args:
         location: City name or location string
+        deadline: Request deadline capping the call's timeout
 
     Returns:
         dict: Coordinates with success status
@@ -192,7 +201,7 @@ def get_geocode_from_location(location: str) -> dict:
     url = f"https://api.openweathermap.org/geo/1.0/direct?q={location}&limit=1&appid={api_key}"
 
     try:
-        response = requests.get(url, timeout=5)
+        response = limited_request('openweather_geo', 'GET', url, deadline=deadline, timeout=5)
         response.raise_for_status()
         data = response.json()
 
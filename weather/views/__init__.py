@@ -21,6 +21,7 @@ from .admin import (
     admin_edit_user,
     admin_delete_user,
     admin_logs,
+    admin_export_logs,
     admin_profile,
     admin_profile_edit,
     admin_profile_remove_image,
@@ -50,10 +51,17 @@ from .api import (
     DismissAlertAPIView,
     CurrentWeatherAPIView,
     WeatherForecastAPIView,
+    WeatherHistoryAPIView,
     SearchLocationsAPIView,
     TemperatureAlertAPIView,
     UserLocationAPIView,
     AdminUserLocationsAPIView,
+    AdminNearbyUsersAPIView,
+    AdminUserWeatherAPIView,
+    AdminUpstreamStatusAPIView,
+    AdminUsersAPIView,
+    AdminUserSearchAPIView,
+    AdminLogSearchAPIView,
     AdminChatHistoryAPIView,
     SendWeatherAlertAPIView,
     UserNotificationsAPIView,
@@ -74,6 +82,7 @@ __all__ = [
     'admin_edit_user',
     'admin_delete_user',
     'admin_logs',
+    'admin_export_logs',
     'admin_profile',
     'admin_profile_edit',
     'admin_profile_remove_image',
@@ -97,10 +106,17 @@ __all__ = [
     'DismissAlertAPIView',
     'CurrentWeatherAPIView',
     'WeatherForecastAPIView',
+    'WeatherHistoryAPIView',
     'SearchLocationsAPIView',
     'TemperatureAlertAPIView',
     'UserLocationAPIView',
     'AdminUserLocationsAPIView',
+    'AdminNearbyUsersAPIView',
+    'AdminUserWeatherAPIView',
+    'AdminUpstreamStatusAPIView',
+    'AdminUsersAPIView',
+    'AdminUserSearchAPIView',
+    'AdminLogSearchAPIView',
     'AdminChatHistoryAPIView',
     'SendWeatherAlertAPIView',
     'UserNotificationsAPIView',
@@ -6,11 +6,17 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.db import models
-from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.contrib import messages
 from datetime import timedelta
+from urllib.parse import urlencode
 from ..models import ActivityLog, SystemLog, UserLocation, ChatMessage
+from ..services.activity_log_service import log_activity
+from ..services.dashboard_service import get_dashboard_stats, get_user_stats, invalidate_dashboard_stats
+from ..services.log_archive_service import ArchiveAwarePaginator
+from ..services.log_export_service import EXPORT_FORMATS, export_filename, export_stream, filter_logs
+from ..services.log_rollup_service import get_activity_stats, get_system_log_stats
+from ..utils.pagination import KeysetPaginator
 
 
 def admin_dashboard(request):
@@ -18,56 +24,16 @@ def admin_dashboard(request):
     if not (request.user.is_authenticated and (request.user.is_staff or request.user.is_superuser)):
         return redirect('signin')
 
-    User = get_user_model()
-    from ..models import UserLocation
-
-    # Get stats
-    total_users = User.objects.filter(is_superuser=False).count()
-
-    # Get currently active users (logged in within last 24 hours and not logged out)
-    # Exclude superusers/admins
-    from django.db.models import Max, Q
-
-    # Only consider activities from last 24 hours
-    last_24_hours = timezone.now() - timedelta(days=1)
-
-    # Get last login/logout activity for each NON-ADMIN user in last 24 hours
-    last_activities = ActivityLog.objects.filter(
-        activity_type__in=['login', 'logout'],
-        timestamp__gte=last_24_hours,
-        user__is_superuser=False  # Exclude admins
-    ).values('user').annotate(
-        last_time=Max('timestamp')
-    )
-
-    # Count users whose last activity was login (not logout) within 24 hours
-    active_users = 0
-    for activity in last_activities:
-        last_log = ActivityLog.objects.filter(
-            user_id=activity['user'],
-            timestamp=activity['last_time']
-        ).first()
-        if last_log and last_log.activity_type == 'login':
-            active_users += 1
-
-    active_today = active_users
-
-    # Get recent activity (last 5 activities from last 24 hours)
-    recent_activities = ActivityLog.objects.filter(
-        timestamp__gte=timezone.now() - timedelta(days=1)
-    ).select_related('user').order_by('-timestamp')[:5]
-
-    # Get user locations with real-time data
-    user_locations = UserLocation.objects.filter(
-        user__is_superuser=False
-    ).select_related('user').order_by('-updated_at')[:5]
+    # Stats are computed with set-based queries and cached briefly
+    stats = get_dashboard_stats()
 
     context = {
-        'users_count': total_users,
-        'active_sessions': active_today,
+        'users_count': stats['users_count'],
+        'active_sessions': stats['active_sessions'],
         'alerts_count': 0,  # We can add this later if needed
-        'recent_activities': recent_activities,
-        'user_locations': user_locations,
+        'recent_activities': stats['recent_activities'],
+        'user_locations': stats['user_locations'],
+        'weather_trends': stats['weather_trends'],
     }
     return render(request, 'admin/dashboard_home.html', context)
 
@@ -96,34 +62,26 @@ def admin_users(request):
         return redirect('signin')
 
     User = get_user_model()
-    from ..models import UserLocation
 
     # Get all users excluding staff/admin with their locations
     all_users = User.objects.filter(
         is_staff=False,
         is_superuser=False
-    ).select_related('current_location').order_by('-date_joined')
+    ).select_related('current_location')
 
-    # Calculate stats
-    total_users = all_users.count()
-    active_users = all_users.filter(is_active=True).count()
+    # Counters come from one cached aggregate query
+    stats = get_user_stats()
 
-    # Users who joined today
-    today = timezone.now().date()
-    new_today = all_users.filter(date_joined__date=today).count()
-
-    # Inactive users (not logged in for 30+ days or inactive accounts)
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    inactive_users = all_users.filter(
-        models.Q(last_login__lt=thirty_days_ago) | models.Q(is_active=False)
-    ).count()
+    # First 25 users; the table loads further pages from the users API by cursor
+    first_page = KeysetPaginator(all_users, 25, field='id').get_page()
 
     context = {
-        'total_users': total_users,
-        'active_users': active_users,
-        'new_today': new_today,
-        'inactive_users': inactive_users,
-        'users': all_users[:25],  # First 25 users for initial load
+        'total_users': stats['total_users'],
+        'active_users': stats['active_users'],
+        'new_today': stats['new_today'],
+        'inactive_users': stats['inactive_users'],
+        'users': first_page.object_list,
+        'next_cursor': first_page.next_cursor if first_page.has_next else '',
     }
     return render(request, 'admin/users.html', context)
 
@@ -138,85 +96,133 @@ def admin_logs(request):
     activity_filter = request.GET.get('activity', 'all')
     user_filter = request.GET.get('user', 'all')
     date_filter = request.GET.get('date', '7')  # days
+    include_archived = request.GET.get('archived') == '1'
 
     # Date range
     days = int(date_filter) if date_filter.isdigit() else 7
-    start_date = timezone.now() - timedelta(days=days)
+    end_date = timezone.now()
+    start_date = end_date - timedelta(days=days)
 
     if log_type == 'activity':
-        # Activity Logs
-        logs = ActivityLog.objects.filter(timestamp__gte=start_date).select_related('user')
-
-        # Filter by activity type
-        if activity_filter != 'all':
-            logs = logs.filter(activity_type=activity_filter)
-
-        # Filter by user
-        if user_filter != 'all' and user_filter.isdigit():
-            logs = logs.filter(user_id=user_filter)
-
-        # Get statistics
-        total_activities = logs.count()
-        unique_users = logs.values('user').distinct().count()
-
-        # Activity breakdown
-        activity_breakdown = logs.values('activity_type').annotate(
-            count=models.Count('id')
-        ).order_by('-count')
-
-        stats = {
-            'total': total_activities,
-            'unique_users': unique_users,
-            'breakdown': activity_breakdown,
-        }
+        # Activity Logs filtered by activity type and user (shared with the export)
+        logs = filter_logs('activity', activity_filter, user_filter, start=start_date).select_related('user')
+
+        # Statistics come from the pre-aggregated rollups, not the raw rows
+        stats = get_activity_stats(
+            start_date,
+            end_date,
+            activity_type=activity_filter if activity_filter != 'all' else None,
+            user_id=int(user_filter) if user_filter.isdigit() else None
+        )
     else:
-        # System Logs
-        logs = SystemLog.objects.filter(timestamp__gte=start_date)
+        # System Logs filtered by level
+        logs = filter_logs('system', activity_filter, start=start_date)
 
-        # Filter by level
+        stats = get_system_log_stats(
+            start_date,
+            end_date,
+            level=activity_filter if activity_filter != 'all' else None
+        )
+
+    # Keyset pagination on (timestamp, id) - no COUNT(*) and no OFFSET scans
+    if include_archived:
+        # Also read rows already moved to the compressed archive files
+        archive_filters = {}
         if activity_filter != 'all':
-            logs = logs.filter(level=activity_filter)
-
-        # Get statistics
-        total_logs = logs.count()
-        errors = logs.filter(level='error').count()
-        warnings = logs.filter(level='warning').count()
-
-        # Log level breakdown
-        level_breakdown = logs.values('level').annotate(
-            count=models.Count('id')
-        ).order_by('-count')
-
-        stats = {
-            'total': total_logs,
-            'errors': errors,
-            'warnings': warnings,
-            'breakdown': level_breakdown,
-        }
+            archive_filters['activity_type' if log_type == 'activity' else 'level'] = activity_filter
+        if log_type == 'activity' and user_filter.isdigit():
+            archive_filters['user_id'] = int(user_filter)
+        paginator = ArchiveAwarePaginator(
+            logs, 10,
+            log_type='activity' if log_type == 'activity' else 'system',
+            start=start_date,
+            end=end_date,
+            filters=archive_filters
+        )
+    else:
+        paginator = KeysetPaginator(logs, 10)  # 10 logs per page
+    logs_page = paginator.get_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before')
+    )
 
-    # Pagination
-    paginator = Paginator(logs, 10)  # 10 logs per page
-    page_number = request.GET.get('page', 1)
-    logs_page = paginator.get_page(page_number)
+    # Filters carried over to the next/previous page links
+    filter_query = urlencode({
+        'type': log_type,
+        'activity': activity_filter,
+        'user': user_filter,
+        'date': date_filter,
+        'archived': '1' if include_archived else '',
+    })
 
-    # Get all users for filter dropdown
+    # Only the selected user is loaded; others are found through the search API
     User = get_user_model()
-    all_users = User.objects.filter(is_active=True).order_by('email')
+    selected_user = User.objects.filter(id=user_filter).only('id', 'email').first() if user_filter.isdigit() else None
 
     context = {
         'logs': logs_page,
+        'filter_query': filter_query,
         'log_type': log_type,
         'activity_filter': activity_filter,
         'user_filter': user_filter,
         'date_filter': date_filter,
+        'include_archived': include_archived,
         'stats': stats,
-        'all_users': all_users,
+        'selected_user': selected_user,
         'activity_types': ActivityLog.ACTIVITY_TYPES,
         'log_levels': SystemLog.LOG_LEVELS,
     }
     return render(request, 'admin/logs.html', context)
 
 
+def admin_export_logs(request):
+    """
+    Stream logs as CSV or NDJSON with the same filters as the logs page
+
+    Query params: type (activity, system, chat, alerts), activity, user,
+    date (days), format (csv, ndjson), columns (comma separated), gzip=1,
+    archived=1 (also stream rows moved to the log archive)
+    """
+    if not (request.user.is_authenticated and (request.user.is_staff or request.user.is_superuser)):
+        return redirect('signin')
+
+    log_type = request.GET.get('type', 'activity')
+    export_format = request.GET.get('format', 'csv')
+    compress = request.GET.get('gzip') == '1'
+    include_archived = request.GET.get('archived') == '1'
+    date_filter = request.GET.get('date', '7')
+    start_date = timezone.now() - timedelta(days=int(date_filter)) if date_filter.isdigit() else None
+
+    try:
+        stream = export_stream(
+            log_type,
+            export_format,
+            columns=request.GET.get('columns', '').split(','),
+            compress=compress,
+            archived=include_archived,
+            activity=request.GET.get('activity', 'all'),
+            user=request.GET.get('user', 'all'),
+            start=start_date
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    response = StreamingHttpResponse(
+        stream,
+        content_type='application/gzip' if compress else EXPORT_FORMATS[export_format]
+    )
+    filename = export_filename(log_type, export_format, compress, timezone.now())
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+    log_activity(
+        request.user,
+        'data_export',
+        f"Exported {log_type} logs as {export_format}",
+        metadata={'type': log_type, 'format': export_format, 'date': date_filter, 'archived': include_archived}
+    )
+    return response
+
+
 def admin_profile(request):
     """Admin profile page"""
     if not (request.user.is_authenticated and (request.user.is_staff or request.user.is_superuser)):
@@ -395,9 +401,10 @@ def admin_edit_user(request, user_id):
             user.set_password(new_password)
 
         user.save()
+        invalidate_dashboard_stats()
 
         # Log the action
-        ActivityLog.objects.create(
+        log_activity(
             user=request.user,
             activity_type='user_edit',
             description=f'Edited user: {user.username}'
@@ -430,7 +437,7 @@ def admin_delete_user(request, user_id):
         username = user.username
 
         # Log the action before deleting
-        ActivityLog.objects.create(
+        log_activity(
             user=request.user,
             activity_type='user_delete',
             description=f'Deleted user: {username}'
@@ -438,6 +445,7 @@ def admin_delete_user(request, user_id):
 
         # Delete the user
         user.delete()
+        invalidate_dashboard_stats()
 
         return JsonResponse({'success': True, 'message': f'User {username} deleted successfully'})
     except User.DoesNotExist:
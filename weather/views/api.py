@@ -2,6 +2,7 @@
 API Views for Weather Application
 Using Django's class-based views for better organization
 """
+from django.conf import settings
 from django.http import JsonResponse
 from django.views import View
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -10,8 +11,9 @@ from django.views.decorators.csrf import csrf_exempt
 import json
 import logging
 
-from ..services.chatbot_service import WeatherChatbotService
+from ..services.chatbot_service import MIN_LOOKUP_SECONDS, WeatherChatbotService
 from ..services.weather_service import get_weather_service
+from ..utils.deadline import Deadline
 from ..utils.weather_helpers import (
     extract_location_from_message,
     get_weather_for_chatbot,
@@ -47,6 +49,8 @@ class ChatbotAPIView(LoginRequiredMixin, View):
             "is_admin": false  # optional - indicates admin user
         }
         """
+        # Every upstream call below shares this budget
+        deadline = Deadline(getattr(settings, 'CHATBOT_DEADLINE_SECONDS', 20))
         try:
             data = json.loads(request.body)
             user_message = data.get('message', '').strip()
@@ -77,7 +81,8 @@ class ChatbotAPIView(LoginRequiredMixin, View):
                 current_weather_data=current_weather_data,
                 user_locations=user_locations if is_admin else None,
                 user_weather_data=user_weather_data,
-                is_admin=is_admin
+                is_admin=is_admin,
+                deadline=deadline
             )
 
             if result['success']:
@@ -101,7 +106,8 @@ class ChatbotAPIView(LoginRequiredMixin, View):
                 return self._build_success_response(
                     result,
                     user_message,
-                    current_weather_data
+                    current_weather_data,
+                    deadline
                 )
             else:
                 return self._build_fallback_response(result)
@@ -127,7 +133,7 @@ class ChatbotAPIView(LoginRequiredMixin, View):
             pass
         return None
 
-    def _build_success_response(self, result, user_message, current_weather_data):
+    def _build_success_response(self, result, user_message, current_weather_data, deadline=None):
         """Build successful response with weather data if available"""
         response_data = {
             'success': True,
@@ -151,21 +157,24 @@ class ChatbotAPIView(LoginRequiredMixin, View):
             if not location:
                 location = extract_location_from_message(user_message)
 
-            if location:
-                weather_info = self._fetch_weather_info(location)
+            # The weather card is optional: skip it when the budget is nearly gone
+            if location and (deadline is None or deadline.allows(MIN_LOOKUP_SECONDS)):
+                weather_info = self._fetch_weather_info(location, deadline)
                 if weather_info and weather_info['success']:
                     response_data['weather_info'] = weather_info
 
         return JsonResponse(response_data)
 
-    def _fetch_weather_info(self, location):
+    def _fetch_weather_info(self, location, deadline=None):
         """Fetch weather info for a location with fallback"""
-        weather_info = get_weather_for_chatbot(city=location)
+        weather_info = get_weather_for_chatbot(city=location, deadline=deadline)
 
         if not weather_info['success']:
-            # Try with common country suffixes
+            # Try with common country suffixes while the request has time left
             for suffix in [',US', ',PH', ',JP', ',UK', ',CA']:
-                weather_info = get_weather_for_chatbot(city=f'{location}{suffix}')
+                if deadline and not deadline.allows(MIN_LOOKUP_SECONDS):
+                    break
+                weather_info = get_weather_for_chatbot(city=f'{location}{suffix}', deadline=deadline)
                 if weather_info['success']:
                     break
 
@@ -242,18 +251,19 @@ class WeatherDataAPIView(LoginRequiredMixin, View):
                 'error': 'City name or coordinates required'
             }, status=400)
 
+        deadline = Deadline(getattr(settings, 'WEATHER_REQUEST_DEADLINE_SECONDS', 8))
         try:
             # Get weather data using Django utility
             if lat and lon:
-                weather_data = get_weather_for_chatbot(lat=float(lat), lon=float(lon))
+                weather_data = get_weather_for_chatbot(lat=float(lat), lon=float(lon), deadline=deadline)
             else:
-                weather_data = get_weather_for_chatbot(city=city)
+                weather_data = get_weather_for_chatbot(city=city, deadline=deadline)
 
             if weather_data['success']:
-                # Get air quality data if coordinates available
-                if weather_data.get('coordinates'):
+                # Get air quality data if coordinates available and there is time left
+                if weather_data.get('coordinates') and deadline.allows(MIN_LOOKUP_SECONDS):
                     coords = weather_data['coordinates']
-                    air_quality = get_air_quality(coords['lat'], coords['lon'])
+                    air_quality = get_air_quality(coords['lat'], coords['lon'], deadline=deadline)
                     weather_data['air_quality'] = air_quality
 
                 return JsonResponse(weather_data)
@@ -386,6 +396,9 @@ class CurrentWeatherAPIView(LoginRequiredMixin, View):
 
             # Get weather data
             result = weather_service.get_current_weather(city=city, lat=lat, lon=lon)
+            if result.get('success'):
+                # Raw readings are for the observation store, not the client
+                result['data'].pop('measurements', None)
             return JsonResponse(result)
 
         except Exception as e:
@@ -461,6 +474,79 @@ class WeatherForecastAPIView(LoginRequiredMixin, View):
             }, status=500)
 
 
+class WeatherHistoryAPIView(LoginRequiredMixin, View):
+    """
+    API endpoint for stored weather observations of a location
+    Served from stored observations, never from the upstream API, and
+    downsampled so the response size is bounded whatever the range
+    """
+
+    MAX_DAYS = 366
+
+    def get(self, request, *args, **kwargs):
+        """
+        Get observation history
+
+        Query params:
+            lat, lon: Coordinates (or cell: a weather cell)
+            days: Days back from now (default 7), or
+            start, end: ISO datetimes
+            fields: Comma-separated observation fields (default: all)
+            points: Most points per field (default 500, at most 2000)
+            method: 'lttb' (default) or 'minmax'
+        """
+        from datetime import timedelta
+        from django.utils import timezone
+        from django.utils.dateparse import parse_datetime
+        from ..services.history_service import DEFAULT_POINTS, get_downsampled_history
+        from ..services.weather_cache_service import cell_for
+
+        try:
+            cell = request.GET.get('cell')
+            if not cell:
+                try:
+                    cell = cell_for(float(request.GET['lat']), float(request.GET['lon']))
+                except (KeyError, ValueError):
+                    return JsonResponse({
+                        'success': False,
+                        'error': 'lat and lon (or cell) are required'
+                    }, status=400)
+
+            end = timezone.now()
+            if request.GET.get('start'):
+                start = parse_datetime(request.GET['start'])
+                end = parse_datetime(request.GET['end']) if request.GET.get('end') else end
+                if not start or not end:
+                    return JsonResponse({'success': False, 'error': 'Invalid start or end'}, status=400)
+                start, end = (value if timezone.is_aware(value) else timezone.make_aware(value) for value in (start, end))
+            else:
+                try:
+                    days = int(request.GET.get('days', 7))
+                except ValueError:
+                    return JsonResponse({'success': False, 'error': 'days must be an integer'}, status=400)
+                start = end - timedelta(days=min(max(days, 1), self.MAX_DAYS))
+            start = max(start, end - timedelta(days=self.MAX_DAYS))
+
+            fields = [field for field in request.GET.get('fields', '').split(',') if field] or None
+            try:
+                history = get_downsampled_history(
+                    cell, start, end, fields,
+                    points=int(request.GET.get('points', DEFAULT_POINTS)),
+                    method=request.GET.get('method', 'lttb'),
+                )
+            except ValueError as e:
+                return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+            return JsonResponse({'success': True, 'cell': cell, **history})
+
+        except Exception as e:
+            logger.error(f"Weather history API error: {str(e)}")
+            return JsonResponse({
+                'success': False,
+                'error': 'Internal server error'
+            }, status=500)
+
+
 class SearchLocationsAPIView(LoginRequiredMixin, View):
     """
     API endpoint to search for locations
@@ -551,11 +637,22 @@ class TemperatureAlertAPIView(LoginRequiredMixin, View):
             # Initialize temperature alert service
             alert_service = TemperatureAlertService()
 
+            # Compare with the location's normal when coordinates are sent
+            normal = None
+            if data.get('lat') is not None and data.get('lon') is not None:
+                try:
+                    from ..services.climatology_service import compare_to_normal
+                    from ..services.weather_cache_service import cell_for
+                    normal = compare_to_normal(cell_for(data['lat'], data['lon']), float(temperature))
+                except (TypeError, ValueError):
+                    pass
+
             # Get AI-generated recommendations
             alert_data = alert_service.get_ai_recommendations(
                 temperature=float(temperature),
                 location=location,
-                weather_condition=weather_condition
+                weather_condition=weather_condition,
+                normal=normal
             )
 
             if alert_data:
@@ -594,56 +691,548 @@ class UserLocationAPIView(LoginRequiredMixin, View):
     def post(self, request):
         """Update user location"""
         try:
-            from ..models import UserLocation
+            from ..services.location_ingest_service import submit_location
             data = json.loads(request.body)
             lat = data.get('latitude')
             lon = data.get('longitude')
             location_name = data.get('location_name', '')
 
-            UserLocation.objects.update_or_create(
-                user=request.user,
-                defaults={
-                    'latitude': lat,
-                    'longitude': lon,
-                    'location_name': location_name
-                }
-            )
-            return JsonResponse({'success': True})
+            # Small moves within the debounce window are dropped; accepted
+            # updates are written in batches (see location_ingest_service)
+            accepted = submit_location(request.user, lat, lon, location_name)
+            return JsonResponse({'success': True, 'accepted': accepted})
+        except (TypeError, ValueError) as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
         except Exception as e:
             logger.error(f"User location update error: {e}")
             return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 
 class AdminUserLocationsAPIView(LoginRequiredMixin, View):
-    """API to get all active user locations for admin map"""
+    """
+    API to get non-admin user locations for the admin map
+
+    Supports a viewport bounding box, an updated_since cursor so polls only
+    return rows that changed, and ETag / If-None-Match revalidation.
+    """
+
+    FIELDS = ('user_id', 'user__email', 'user__username', 'latitude', 'longitude', 'location_name', 'updated_at')
 
     def get(self, request):
-        """Get all user locations"""
+        """
+        Get user locations
+
+        Query params:
+            bbox: 'west,south,east,north' in degrees (optional)
+            zoom: Map zoom; up to MAP_MAX_CLUSTER_ZOOM grid clusters are returned
+                  instead of individual users (optional)
+            updated_since: 'cursor' from a previous response; only newer rows are returned
+        """
+        if not (request.user.is_staff or request.user.is_superuser):
+            return JsonResponse({'error': 'Unauthorized'}, status=403)
+
+        try:
+            from django.db.models import Count, Max
+            from django.http import HttpResponseNotModified
+            from django.utils.dateparse import parse_datetime
+            from django.utils.http import quote_etag
+            from ..models import UserLocation
+            from ..services.location_cluster_service import max_cluster_zoom
+            from ..services.location_ingest_service import flush
+            from ..services.spatial_service import bbox_q
+
+            # Write this process's buffered location updates before reading
+            flush()
+
+            bbox = self._parse_bbox(request.GET.get('bbox'))
+            if request.GET.get('bbox') and bbox is None:
+                return JsonResponse({'success': False, 'error': 'bbox must be west,south,east,north'}, status=400)
+
+            zoom = request.GET.get('zoom', '')
+            if zoom.isdigit() and int(zoom) <= max_cluster_zoom():
+                return self._clusters(request, int(zoom), bbox)
+
+            # Only show regular users (not superusers/admins)
+            locations = UserLocation.objects.filter(user__is_superuser=False)
+            if bbox:
+                # Geohash prefix ranges on the indexed column, then the exact box
+                locations = locations.filter(bbox_q(*bbox))
+
+            updated_since = parse_datetime(request.GET.get('updated_since', '') or '')
+            if updated_since:
+                locations = locations.filter(updated_at__gt=updated_since)
+
+            # Cheap aggregate first: unchanged data answers 304 without loading rows
+            state = locations.aggregate(latest=Max('updated_at'), total=Count('id'))
+            etag = quote_etag(
+                f"{state['latest'].timestamp() if state['latest'] else 0}-{state['total']}-"
+                f"{request.GET.get('bbox', '')}-{request.GET.get('updated_since', '')}"
+            )
+            if request.headers.get('If-None-Match') == etag:
+                response = HttpResponseNotModified()
+                response['ETag'] = etag
+                return response
+
+            rows = locations.order_by('updated_at').values_list(*self.FIELDS)
+            response = JsonResponse({
+                'success': True,
+                'mode': 'points',
+                'max_cluster_zoom': max_cluster_zoom(),
+                'incremental': updated_since is not None,
+                'locations': [
+                    {
+                        'id': user_id,
+                        'email': email,
+                        'username': username,
+                        'latitude': float(latitude),
+                        'longitude': float(longitude),
+                        'location_name': location_name,
+                        'updated_at': updated_at.isoformat()
+                    }
+                    for user_id, email, username, latitude, longitude, location_name, updated_at in rows
+                ],
+                # Pass back as updated_since on the next poll
+                'cursor': (state['latest'] or updated_since).isoformat() if (state['latest'] or updated_since) else None,
+            })
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+            return response
+        except Exception as e:
+            logger.error(f"Admin user locations API error: {e}")
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+    def _clusters(self, request, zoom, bbox):
+        """Pre-aggregated grid clusters for zoomed-out views"""
+        from django.db.models import Count, Max
+        from django.http import HttpResponseNotModified
+        from django.utils.http import quote_etag
+        from ..services.location_cluster_service import cells_in_bbox, get_clusters, max_cluster_zoom
+
+        state = cells_in_bbox(zoom, bbox).aggregate(latest=Max('updated_at'), total=Count('id'))
+        etag = quote_etag(
+            f"z{zoom}-{state['latest'].timestamp() if state['latest'] else 0}-{state['total']}-"
+            f"{request.GET.get('bbox', '')}"
+        )
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+
+        response = JsonResponse({
+            'success': True,
+            'mode': 'clusters',
+            'zoom': zoom,
+            'max_cluster_zoom': max_cluster_zoom(),
+            'clusters': get_clusters(zoom, bbox),
+        })
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def _parse_bbox(self, value):
+        """Parse 'west,south,east,north' into floats, or None"""
+        if not value:
+            return None
+        try:
+            west, south, east, north = (float(part) for part in value.split(','))
+        except ValueError:
+            return None
+        if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+            return None
+        return west, south, east, north
+
+
+class AdminNearbyUsersAPIView(LoginRequiredMixin, View):
+    """
+    Spatial lookups over user locations: radius, bounding box or k-nearest
+    Backed by the geohash index on UserLocation
+    """
+
+    MAX_RESULTS = 500
+
+    def get(self, request):
+        """
+        Find users by position
+
+        Query params (one mode):
+            lat, lon, radius_km: Users within the radius, nearest first
+            lat, lon, k: The k nearest users (max_radius_km optional)
+            bbox: 'west,south,east,north'
+        """
+        if not (request.user.is_staff or request.user.is_superuser):
+            return JsonResponse({'error': 'Unauthorized'}, status=403)
+
+        try:
+            from ..services.spatial_service import nearest, within_bbox, within_radius
+
+            params = request.GET
+            if params.get('bbox'):
+                bbox = AdminUserLocationsAPIView()._parse_bbox(params['bbox'])
+                if bbox is None:
+                    return JsonResponse({'success': False, 'error': 'bbox must be west,south,east,north'}, status=400)
+                results = list(within_bbox(*bbox)[:self.MAX_RESULTS])
+            else:
+                try:
+                    lat = float(params['lat'])
+                    lon = float(params['lon'])
+                except (KeyError, ValueError):
+                    return JsonResponse({'success': False, 'error': 'lat and lon are required'}, status=400)
+                if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                    return JsonResponse({'success': False, 'error': 'lat/lon out of range'}, status=400)
+
+                if params.get('k'):
+                    k = min(max(int(params['k']), 1), self.MAX_RESULTS)
+                    max_radius = float(params['max_radius_km']) if params.get('max_radius_km') else None
+                    results = nearest(lat, lon, k=k, max_radius_km=max_radius)
+                else:
+                    radius = min(float(params.get('radius_km', 10)), 20038.0)
+                    results = within_radius(lat, lon, radius, limit=self.MAX_RESULTS)
+
+            return JsonResponse({
+                'success': True,
+                'users': [
+                    {
+                        'id': location.user_id,
+                        'username': location.user.username,
+                        'email': location.user.email,
+                        'latitude': float(location.latitude),
+                        'longitude': float(location.longitude),
+                        'location_name': location.location_name,
+                        'distance_km': getattr(location, 'distance_km', None),
+                    }
+                    for location in results
+                ],
+            })
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        except Exception as e:
+            logger.error(f"Admin nearby users API error: {e}")
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+class AdminUserWeatherAPIView(LoginRequiredMixin, View):
+    """
+    Current weather for admin-map users, batched server-side
+
+    Users sharing a weather cell share one cached upstream call, so the
+    browser never calls OpenWeatherMap (or sees the API key).
+    """
+
+    MAX_USERS = 5000
+
+    def get(self, request):
+        """
+        Get weather for users
+
+        Query params (one of):
+            user_ids: Comma-separated user ids
+            bbox: 'west,south,east,north' (all non-admin users in the viewport)
+
+        Response 'cells' rows follow 'fields'; 'users' maps each user id to a
+        row index. Users listed in 'pending' have no cached weather yet and
+        can be asked for again on the next poll.
+        """
         if not (request.user.is_staff or request.user.is_superuser):
             return JsonResponse({'error': 'Unauthorized'}, status=403)
 
         try:
             from ..models import UserLocation
+            from ..services.map_weather_service import weather_for_locations
+            from ..services.spatial_service import bbox_q
+
+            locations = UserLocation.objects.filter(user__is_superuser=False)
+            if request.GET.get('user_ids'):
+                try:
+                    user_ids = [int(part) for part in request.GET['user_ids'].split(',') if part.strip()]
+                except ValueError:
+                    return JsonResponse({'success': False, 'error': 'user_ids must be comma-separated integers'}, status=400)
+                locations = locations.filter(user_id__in=user_ids[:self.MAX_USERS])
+            elif request.GET.get('bbox'):
+                bbox = AdminUserLocationsAPIView()._parse_bbox(request.GET['bbox'])
+                if bbox is None:
+                    return JsonResponse({'success': False, 'error': 'bbox must be west,south,east,north'}, status=400)
+                locations = locations.filter(bbox_q(*bbox))
+            else:
+                return JsonResponse({'success': False, 'error': 'user_ids or bbox is required'}, status=400)
+
+            rows = [
+                (user_id, float(latitude), float(longitude), geohash)
+                for user_id, latitude, longitude, geohash in locations.values_list(
+                    'user_id', 'latitude', 'longitude', 'geohash'
+                )[:self.MAX_USERS]
+            ]
+            payload = weather_for_locations(rows)
+            response = JsonResponse({'success': True, **payload})
+            response['Cache-Control'] = 'private, no-cache'
+            return response
+        except Exception as e:
+            logger.error(f"Admin user weather API error: {e}")
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+class AdminUpstreamStatusAPIView(LoginRequiredMixin, View):
+    """
+    API for the health of upstream integrations (staff only)
+    Circuit breaker states, rate limiter consumption and weather cache warmer coverage
+    """
+
+    def get(self, request):
+        """Breaker states, per-bucket rate limit counters and the last warmer pass"""
+        if not (request.user.is_staff or request.user.is_superuser):
+            return JsonResponse({'error': 'Unauthorized'}, status=403)
+
+        try:
+            from ..services.circuit_breaker_service import get_breaker_stats
+            from ..services.rate_limit_service import get_rate_limit_stats
+            from ..services.weather_warmer_service import get_warmer_stats
+
+            return JsonResponse({
+                'success': True,
+                'circuit_breakers': get_breaker_stats(),
+                'warmer': get_warmer_stats(),
+                'rate_limits': get_rate_limit_stats(),
+            })
+        except Exception as e:
+            logger.error(f"Upstream status API error: {e}")
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+class AdminUsersAPIView(LoginRequiredMixin, View):
+    """
+    API to page through non-admin users for the admin users table
+    Cursor paginated on id (join order, the primary key index) so deep pages
+    never use OFFSET or sort the user table
+    """
+
+    # Requested field name -> columns it needs
+    FIELDS = {
+        'id': ['id'],
+        'username': ['username'],
+        'email': ['email'],
+        'first_name': ['first_name'],
+        'last_name': ['last_name'],
+        'is_active': ['is_active'],
+        'date_joined': ['date_joined'],
+        'last_login': ['last_login'],
+        'location': ['current_location__location_name', 'current_location__latitude', 'current_location__longitude'],
+    }
+    DEFAULT_FIELDS = ['id', 'username', 'email', 'is_active', 'last_login', 'location']
+    MAX_LIMIT = 100
+
+    def get(self, request):
+        """
+        Get one page of users
+
+        Query params:
+            after / before: Cursors from a previous response
+            limit: Page size (default 25, max 100)
+            fields: Comma separated subset of FIELDS
+            status: 'active' or 'inactive' (optional)
+        """
+        if not (request.user.is_staff or request.user.is_superuser):
+            return JsonResponse({'error': 'Unauthorized'}, status=403)
+
+        try:
             from django.contrib.auth import get_user_model
+            from ..utils.pagination import KeysetPaginator
             User = get_user_model()
 
-            locations = []
-            for loc in UserLocation.objects.select_related('user').all():
-                if not loc.user.is_superuser:  # Only show regular users (not superusers/admins)
-                    locations.append({
-                        'email': loc.user.email,
-                        'username': loc.user.username,
-                        'latitude': float(loc.latitude),
-                        'longitude': float(loc.longitude),
-                        'location_name': loc.location_name,
-                        'updated_at': loc.updated_at.isoformat()
-                    })
-
-            return JsonResponse({'success': True, 'locations': locations})
+            try:
+                limit = min(max(int(request.GET.get('limit', 25)), 1), self.MAX_LIMIT)
+            except ValueError:
+                limit = 25
+
+            fields = [f for f in request.GET.get('fields', '').split(',') if f in self.FIELDS] or self.DEFAULT_FIELDS
+
+            # Only load the columns the requested fields need
+            columns = {'id'}
+            for field in fields:
+                columns.update(self.FIELDS[field])
+
+            users = User.objects.filter(is_staff=False, is_superuser=False)
+            status = request.GET.get('status')
+            if status == 'active':
+                users = users.filter(is_active=True)
+            elif status == 'inactive':
+                users = users.filter(is_active=False)
+            if 'location' in fields:
+                users = users.select_related('current_location')
+            users = users.only(*columns)
+
+            page = KeysetPaginator(users, limit, field='id').get_page(
+                after=request.GET.get('after'),
+                before=request.GET.get('before')
+            )
+
+            return JsonResponse({
+                'success': True,
+                'users': [self._serialize(user, fields) for user in page],
+                'next_cursor': page.next_cursor if page.has_next else None,
+                'previous_cursor': page.previous_cursor if page.has_previous else None,
+            })
         except Exception as e:
-            logger.error(f"Admin user locations API error: {e}")
+            logger.error(f"Admin users API error: {e}")
             return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
+    def _serialize(self, user, fields):
+        """Build the JSON row for a user with only the requested fields"""
+        data = {}
+        for field in fields:
+            if field == 'location':
+                location = getattr(user, 'current_location', None)
+                data['location'] = {
+                    'name': location.location_name,
+                    'latitude': float(location.latitude),
+                    'longitude': float(location.longitude),
+                } if location else None
+            else:
+                value = getattr(user, field)
+                data[field] = value.isoformat() if hasattr(value, 'isoformat') else value
+        return data
+
+
+class AdminUserSearchAPIView(AdminUsersAPIView):
+    """
+    Typeahead search over username, email, name and location
+    Backed by the indexed user_search_index table
+    """
+    MAX_LIMIT = 50
+
+    def get(self, request):
+        """
+        Search users
+
+        Query params:
+            q: Search text (prefix and fuzzy matching per word)
+            limit: Max results (default 10, max 50)
+            include_staff: '1' to include staff and superusers
+            fields: Comma separated subset of FIELDS
+        """
+        if not (request.user.is_staff or request.user.is_superuser):
+            return JsonResponse({'error': 'Unauthorized'}, status=403)
+
+        try:
+            from ..services.user_search_service import search_users
+
+            try:
+                limit = min(max(int(request.GET.get('limit', 10)), 1), self.MAX_LIMIT)
+            except ValueError:
+                limit = 10
+            fields = [f for f in request.GET.get('fields', '').split(',') if f in self.FIELDS] or self.DEFAULT_FIELDS
+
+            users = search_users(
+                request.GET.get('q', ''),
+                limit=limit,
+                include_staff=request.GET.get('include_staff') == '1'
+            )
+
+            return JsonResponse({
+                'success': True,
+                'users': [self._serialize(user, fields) for user in users],
+            })
+        except Exception as e:
+            logger.error(f"Admin user search error: {e}")
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+class AdminLogSearchAPIView(LoginRequiredMixin, View):
+    """
+    Ranked full-text search over activity logs, system logs and admin chat history
+    """
+
+    MAX_LIMIT = 100
+
+    def get(self, request):
+        """
+        Search one log source
+
+        Query params:
+            q: Search text
+            source: 'activity' (default), 'system' or 'chat'
+            days: Only the last N days (optional)
+            start / end: ISO datetimes (optional, override days)
+            type: Activity type or log level (optional)
+            user: User id (optional)
+            sort: 'relevance' (default) or 'recent'
+            cursor: next_cursor from a previous response
+            limit: Page size (default 20, max 100)
+        """
+        if not (request.user.is_staff or request.user.is_superuser):
+            return JsonResponse({'error': 'Unauthorized'}, status=403)
+
+        try:
+            from datetime import timedelta
+            from django.utils import timezone
+            from django.utils.dateparse import parse_datetime
+            from ..services.log_search_service import search_logs
+
+            source = request.GET.get('source', 'activity')
+            try:
+                limit = min(max(int(request.GET.get('limit', 20)), 1), self.MAX_LIMIT)
+            except ValueError:
+                limit = 20
+
+            start = parse_datetime(request.GET.get('start', '')) if request.GET.get('start') else None
+            end = parse_datetime(request.GET.get('end', '')) if request.GET.get('end') else None
+            days = request.GET.get('days', '')
+            if not start and days.isdigit():
+                start = timezone.now() - timedelta(days=int(days))
+
+            user_id = request.GET.get('user', '')
+            page = search_logs(
+                source,
+                request.GET.get('q', ''),
+                start=start,
+                end=end,
+                filters={
+                    'type': request.GET.get('type'),
+                    'user': int(user_id) if user_id.isdigit() else None,
+                },
+                sort=request.GET.get('sort', 'relevance'),
+                cursor=request.GET.get('cursor'),
+                limit=limit
+            )
+
+            return JsonResponse({
+                'success': True,
+                'results': [self._serialize(source, obj) for obj in page],
+                'next_cursor': page.next_cursor,
+                'has_next': page.has_next,
+            })
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        except Exception as e:
+            logger.error(f"Admin log search error: {e}")
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+    def _serialize(self, source, obj):
+        row = {
+            'id': obj.id,
+            'timestamp': obj.timestamp.isoformat(),
+            'rank': obj.search_rank,
+        }
+        if source == 'chat':
+            row.update({
+                'admin': obj.admin_user.username,
+                'session_id': obj.session_id,
+                'message': obj.message,
+                'response': obj.response,
+            })
+        elif source == 'system':
+            row.update({
+                'level': obj.level,
+                'module': obj.module,
+                'message': obj.message,
+                'user': obj.user.email if obj.user else None,
+            })
+        else:
+            row.update({
+                'activity_type': obj.activity_type,
+                'description': obj.description,
+                'user': obj.user.email if obj.user else None,
+            })
+        return row
+
 
 class AdminChatHistoryAPIView(LoginRequiredMixin, View):
     """API to get and manage admin chat history"""
@@ -6,6 +6,8 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 
+from ..services.presence_service import mark_login, mark_logout
+
 
 def home(request):
     """Landing page"""
@@ -36,6 +38,7 @@ def signin(request):
 
         if user is not None:
             login(request, user)
+            mark_login(user)
             # Redirect based on user type
             if user.is_staff or user.is_superuser:
                 return redirect('admin_dashboard')
@@ -117,7 +120,7 @@ def user_logout(request):
     """User logout"""
     # Log the logout activity BEFORE logging out (only for regular users, not superusers/admins)
     if request.user.is_authenticated and not request.user.is_superuser:
-        from ..models import ActivityLog
+        from ..services.activity_log_service import log_activity
 
         # Get client IP address
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -131,7 +134,7 @@ def user_logout(request):
 
         # Create logout log
         try:
-            ActivityLog.objects.create(
+            log_activity(
                 user=request.user,
                 activity_type='logout',
                 description=f'User {request.user.email} logged out',
@@ -142,6 +145,9 @@ def user_logout(request):
         except Exception as e:
             print(f"Failed to log logout activity: {e}")
 
+    if request.user.is_authenticated:
+        mark_logout(request.user)
+
     logout(request)
     messages.success(request, 'You have been logged out successfully')
     return redirect('signin')
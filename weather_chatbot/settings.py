@@ -65,6 +65,8 @@ MIDDLEWARE = [
     'weather.middleware.WeatherDataMiddleware',
     # Activity logging middleware for real-time tracking
     'weather.middleware.ActivityLoggingMiddleware',
+    # Throttled last-seen updates for the user presence table
+    'weather.middleware.UserPresenceMiddleware',
 ]
 
 ROOT_URLCONF = 'weather_chatbot.urls'
@@ -167,6 +169,148 @@ OPENWEATHER_BASE_URL = config('OPENWEATHER_BASE_URL', default='https://api.openw
 # Windy API Configuration
 WINDY_API_KEY = config('WINDY_API_KEY', default='')
 
+# Activity Log Sampling
+# Fraction of events written per activity type; kept rows carry weight = 1 / rate.
+# login, logout, signup, settings_change and data_export are always logged.
+# Override at runtime through the ActivitySamplingRate admin.
+ACTIVITY_LOG_SAMPLE_RATES = {
+    'weather_query': config('ACTIVITY_LOG_WEATHER_QUERY_RATE', default=0.1, cast=float),
+    'api_call': config('ACTIVITY_LOG_API_CALL_RATE', default=0.1, cast=float),
+}
+
+# Admin dashboard stats cache lifetime (seconds)
+ADMIN_DASHBOARD_CACHE_TTL = config('ADMIN_DASHBOARD_CACHE_TTL', default=30, cast=int)
+
+# User presence: minimum minutes between last-seen writes per user
+PRESENCE_TOUCH_INTERVAL_MINUTES = config('PRESENCE_TOUCH_INTERVAL_MINUTES', default=5, cast=int)
+
+# Log Rollups
+# Activity and system log rollups are updated as rows are written. Rows written around the
+# ORM (bulk inserts, raw SQL) are only counted by `manage.py rebuild_log_rollups`; schedule it
+# daily, e.g. cron: 15 0 * * * python manage.py rebuild_log_rollups --days 2
+
+# Log Retention
+# Rows older than this are moved to gzipped NDJSON files by `manage.py archive_logs`
+LOG_RETENTION_DAYS = config('LOG_RETENTION_DAYS', default=90, cast=int)
+LOG_ARCHIVE_DIR = Path(config('LOG_ARCHIVE_DIR', default=str(BASE_DIR / 'log_archive')))
+
+# Admin Map Clustering
+# Up to this zoom the user-locations API returns grid clusters; above it, individual users
+MAP_MAX_CLUSTER_ZOOM = config('MAP_MAX_CLUSTER_ZOOM', default=12, cast=int)
+
+# User Location Ingestion
+# Updates closer than LOCATION_MIN_MOVE_METERS to the last accepted position
+# and within LOCATION_MIN_INTERVAL_SECONDS of it are dropped; accepted ones
+# are buffered and bulk-upserted by a timer LOCATION_FLUSH_INTERVAL_SECONDS after the first one
+LOCATION_MIN_MOVE_METERS = config('LOCATION_MIN_MOVE_METERS', default=100, cast=int)
+LOCATION_MIN_INTERVAL_SECONDS = config('LOCATION_MIN_INTERVAL_SECONDS', default=300, cast=int)
+LOCATION_FLUSH_BATCH_SIZE = config('LOCATION_FLUSH_BATCH_SIZE', default=200, cast=int)
+LOCATION_FLUSH_INTERVAL_SECONDS = config('LOCATION_FLUSH_INTERVAL_SECONDS', default=5, cast=int)
+
+# Cache
+# Shared by every process: the weather cache warmer, upstream rate limit buckets and circuit
+# breakers rely on it. The default database cache's table is created by the migrations;
+# Redis also works. A per-process backend (LocMemCache) fails check weather.W001
+CACHE_BACKEND = config('CACHE_BACKEND', default='django.core.cache.backends.db.DatabaseCache')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default='weather_cache'),
+    }
+}
+# Culling backends default to 300 entries, fewer than one entry per weather cell and kind
+if CACHE_BACKEND.endswith(('LocMemCache', 'DatabaseCache', 'FileBasedCache')):
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=20000, cast=int)}
+
+# Shared Weather Cache
+# Upstream weather is fetched and cached per geohash cell (precision 4 is ~39 x 20 km),
+# so nearby users share one OpenWeatherMap call
+WEATHER_CELL_PRECISION = config('WEATHER_CELL_PRECISION', default=4, cast=int)
+WEATHER_CACHE_TTL = config('WEATHER_CACHE_TTL', default=600, cast=int)
+# Forecasts expire at the provider's next 3-hourly model run (00, 03 ... UTC) plus this grace,
+# and at most WEATHER_FORECAST_CACHE_TTL after fetching
+WEATHER_FORECAST_CACHE_TTL = config('WEATHER_FORECAST_CACHE_TTL', default=10800, cast=int)
+WEATHER_FORECAST_CYCLE_GRACE = config('WEATHER_FORECAST_CYCLE_GRACE', default=600, cast=int)
+WEATHER_AIR_QUALITY_CACHE_TTL = config('WEATHER_AIR_QUALITY_CACHE_TTL', default=3600, cast=int)
+# Expired entries stay this much longer to be served (marked stale) when upstream is rate limited
+WEATHER_STALE_TTL = config('WEATHER_STALE_TTL', default=21600, cast=int)
+WEATHER_FETCH_CONCURRENCY = config('WEATHER_FETCH_CONCURRENCY', default=8, cast=int)
+# Most cells one admin map request may fetch upstream; the rest fill on later polls
+MAP_WEATHER_MAX_FETCHES = config('MAP_WEATHER_MAX_FETCHES', default=48, cast=int)
+
+# Derived Current Weather
+# Current weather is interpolated from a cached forecast instead of calling /weather while the
+# cell's last real reading is under WEATHER_DERIVED_CURRENT_MAX_AGE seconds old (it corrects the
+# forecast), when the OpenWeather bucket is down to WEATHER_DERIVED_CURRENT_QUOTA_RESERVE of its
+# burst, or when the upstream is unavailable. Such responses are marked 'derived'
+WEATHER_DERIVED_CURRENT = config('WEATHER_DERIVED_CURRENT', default=True, cast=bool)
+WEATHER_DERIVED_CURRENT_MAX_AGE = config('WEATHER_DERIVED_CURRENT_MAX_AGE', default=1800, cast=int)
+WEATHER_DERIVED_CURRENT_QUOTA_RESERVE = config('WEATHER_DERIVED_CURRENT_QUOTA_RESERVE', default=0.25, cast=float)
+
+# Weather Cache Warmer (`manage.py warm_weather_cache`)
+# Cached cells are refreshed once WEATHER_WARM_REFRESH_AT of their TTL has passed,
+# spending at most WEATHER_WARM_CALLS_PER_MINUTE upstream calls. It refuses to start on a
+# per-process CACHE_BACKEND, whose entries the web workers would never see
+WEATHER_WARM_CALLS_PER_MINUTE = config('WEATHER_WARM_CALLS_PER_MINUTE', default=30, cast=int)
+WEATHER_WARM_REFRESH_AT = config('WEATHER_WARM_REFRESH_AT', default=0.8, cast=float)
+
+# Weather History
+# 'database' reads history from the weather_observations table; 'columnar' also keeps
+# per-cell memory-mapped column files in WEATHER_SERIES_DIR and reads from them.
+# Rebuild the files from the table with `manage.py rebuild_weather_series`
+WEATHER_SERIES_STORE = config('WEATHER_SERIES_STORE', default='database')
+WEATHER_SERIES_DIR = Path(config('WEATHER_SERIES_DIR', default=str(BASE_DIR / 'weather_series')))
+
+# Upstream Rate Limits
+# Token buckets kept in the cache: per_minute refill, burst size, and how long interactive
+# calls may queue (seconds) before failing to stale data/fallbacks. They are shared by all
+# workers through the shared cache
+UPSTREAM_RATE_LIMITS = {
+    'openweather': {
+        'per_minute': config('OPENWEATHER_CALLS_PER_MINUTE', default=60, cast=int),
+        'burst': config('OPENWEATHER_BURST', default=20, cast=int),
+        'max_wait': config('OPENWEATHER_MAX_WAIT', default=2.0, cast=float),
+    },
+    'openweather_geo': {
+        'per_minute': config('OPENWEATHER_GEO_CALLS_PER_MINUTE', default=60, cast=int),
+        'burst': config('OPENWEATHER_GEO_BURST', default=10, cast=int),
+        'max_wait': config('OPENWEATHER_MAX_WAIT', default=2.0, cast=float),
+    },
+    'groq': {
+        'per_minute': config('GROQ_REQUESTS_PER_MINUTE', default=30, cast=int),
+        'burst': config('GROQ_BURST', default=5, cast=int),
+        'max_wait': config('GROQ_MAX_WAIT', default=5.0, cast=float),
+    },
+}
+
+# Request Deadlines
+# Total seconds a request may spend on chained upstream calls; the chatbot keeps
+# CHATBOT_LLM_MIN_SECONDS of its budget for the Groq call
+CHATBOT_DEADLINE_SECONDS = config('CHATBOT_DEADLINE_SECONDS', default=20, cast=float)
+CHATBOT_LLM_MIN_SECONDS = config('CHATBOT_LLM_MIN_SECONDS', default=3, cast=float)
+WEATHER_REQUEST_DEADLINE_SECONDS = config('WEATHER_REQUEST_DEADLINE_SECONDS', default=8, cast=float)
+
+# Circuit Breakers
+# An upstream's breaker opens when at least min_requests calls in window_seconds were made
+# and failure_rate of them failed or took longer than slow_call_seconds; after open_seconds
+# one trial call decides whether it closes again
+CIRCUIT_BREAKERS = {
+    'openweather': {
+        'window_seconds': 60,
+        'min_requests': config('OPENWEATHER_BREAKER_MIN_REQUESTS', default=10, cast=int),
+        'failure_rate': config('OPENWEATHER_BREAKER_FAILURE_RATE', default=0.5, cast=float),
+        'slow_call_seconds': config('OPENWEATHER_BREAKER_SLOW_SECONDS', default=5.0, cast=float),
+        'open_seconds': config('OPENWEATHER_BREAKER_OPEN_SECONDS', default=30, cast=int),
+    },
+    'groq': {
+        'window_seconds': 60,
+        'min_requests': config('GROQ_BREAKER_MIN_REQUESTS', default=5, cast=int),
+        'failure_rate': config('GROQ_BREAKER_FAILURE_RATE', default=0.5, cast=float),
+        'slow_call_seconds': config('GROQ_BREAKER_SLOW_SECONDS', default=15.0, cast=float),
+        'open_seconds': config('GROQ_BREAKER_OPEN_SECONDS', default=60, cast=int),
+    },
+}
+
 # Django Allauth Configuration
 AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',